@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Employee, Asset, Handover, HandoverAsset, WelcomePack
+from .models import Employee, Asset, Handover, HandoverAsset, WelcomePack, AzureSyncState, AzureSyncRun, AzureSyncJob, AssetCleanupRecord
 
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
@@ -65,3 +65,32 @@ class WelcomePackAdmin(admin.ModelAdmin):
     search_fields = ['employee__name', 'employee_email', 'it_contact_person']
     ordering = ['-generated_at']
     readonly_fields = ['generated_at', 'email_sent_at']
+
+@admin.register(AzureSyncState)
+class AzureSyncStateAdmin(admin.ModelAdmin):
+    list_display = ['key', 'updated_at']
+    search_fields = ['key']
+    ordering = ['key']
+    readonly_fields = ['updated_at']
+
+@admin.register(AzureSyncRun)
+class AzureSyncRunAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'status', 'phase', 'attempts', 'finished_at']
+    list_filter = ['status', 'phase']
+    ordering = ['-started_at']
+    readonly_fields = ['started_at', 'updated_at', 'finished_at']
+
+@admin.register(AzureSyncJob)
+class AzureSyncJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'requested_by', 'created_at', 'started_at', 'finished_at']
+    list_filter = ['status']
+    ordering = ['-created_at']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'updated_at']
+
+@admin.register(AssetCleanupRecord)
+class AssetCleanupRecordAdmin(admin.ModelAdmin):
+    list_display = ['asset_name', 'employee_name', 'employee_status', 'previous_status', 'created_at']
+    list_filter = ['employee_status', 'created_at']
+    search_fields = ['asset_name', 'employee_name']
+    ordering = ['-created_at']
+    readonly_fields = ['created_at']
@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class AssetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'assets'
+
+    def ready(self):
+        from django.core import checks
+        from django.db.models.signals import post_migrate
+
+        from . import signals  # noqa: F401
+        from .checks import check_shared_cache
+        from .search import ensure_search_indexes
+
+        checks.register(check_shared_cache, checks.Tags.caches)
+        post_migrate.connect(create_cache_table, sender=self)
+        post_migrate.connect(ensure_search_indexes, sender=self)
+
+
+def create_cache_table(sender, using='default', **kwargs):
+    """Create the DatabaseCache table on migrate, createcachetable skips tables that exist"""
+    from django.core.management import call_command
+
+    call_command('createcachetable', database=using, verbosity=0)
@@ -0,0 +1,225 @@
+"""
+Declarative asset category listings shared by the category pages
+"""
+
+from datetime import date, timedelta
+
+from django.db.models import Count, Q
+
+from .asset_stats import cached_asset_stats
+from .models import Asset
+from .pagination import KeysetPaginator
+from .search import search_filter
+
+# Ages at which assets count as old and as needing attention
+OLD_ASSET_AGE = timedelta(days=365*3)
+ATTENTION_ASSET_AGE = timedelta(days=365*2)
+
+
+class AssetListing:
+    """One asset category page: which assets it lists and the statistics shown above them
+
+    base_filter is a Q, or a callable taking today's date and the view's URL
+    arguments and returning one. counts maps context names to the Q each one
+    counts (None counts every asset), and total names the count used as the
+    pagination total. distributions maps context names to the field each
+    one groups by. filters maps query parameters to the lookups they filter on,
+    and the search parameter goes through the asset search index.
+    Statistics come from one grouped query, cached per filter set until assets
+    change, and pages are read with keyset pagination over ordering.
+    """
+
+    def __init__(self, name, base_filter, counts, total, distributions=None, filters=None,
+                 ordering=('name', 'id'), per_page=10):
+        self.name = name
+        self.base_filter = base_filter
+        self.counts = counts
+        self.total = total
+        self.distributions = distributions or {'asset_type_stats': 'asset_type'}
+        self.filters = filters or {'asset_type': 'asset_type'}
+        self.ordering = ordering
+        self.per_page = per_page
+
+    def active_filters(self, params):
+        """Return the non-empty filter and search parameters from a QueryDict or dict"""
+        names = [*self.filters, 'search']
+        return {name: params[name] for name in names if params.get(name)}
+
+    def get_queryset(self, filters, today=None, **base_args):
+        """Assets in this category narrowed by the active filters"""
+        base_filter = self.base_filter
+        if callable(base_filter):
+            base_filter = base_filter(today or date.today(), **base_args)
+
+        assets = Asset.objects.filter(base_filter).select_related('assigned_to')
+        for name, lookup in self.filters.items():
+            if filters.get(name):
+                assets = assets.filter(**{lookup: filters[name]})
+
+        if filters.get('search'):
+            assets = assets.filter(search_filter(Asset, filters['search']))
+        return assets
+
+    def compute_stats(self, assets):
+        """Every count and distribution from one query grouped by the distribution fields"""
+        counts = {
+            name: Count('id', filter=condition) if condition is not None else Count('id')
+            for name, condition in self.counts.items()
+        }
+        fields = list(dict.fromkeys(self.distributions.values()))
+        grouped = assets.order_by().values(*fields).annotate(**counts)
+
+        stats = dict.fromkeys(self.counts, 0)
+        totals = {field: {} for field in fields}
+        for row in grouped:
+            for name in self.counts:
+                stats[name] += row[name]
+            for field in fields:
+                totals[field][row[field]] = totals[field].get(row[field], 0) + row[self.total]
+
+        for name, field in self.distributions.items():
+            stats[name] = [
+                {field: value, 'count': count}
+                for value, count in sorted(totals[field].items(), key=lambda item: -item[1])
+            ]
+        return stats
+
+    def get_stats(self, filters, **base_args):
+        """Statistics for a filter set, cached until assets change or the day (and so the age cut-offs) rolls over"""
+        today = date.today()
+        signature = {'today': today.isoformat(), 'args': base_args, 'filters': filters}
+        return cached_asset_stats(
+            f'asset_listing:{self.name}', signature,
+            lambda: self.compute_stats(self.get_queryset(filters, today, **base_args)),
+        )
+
+    def get_context(self, request, **base_args):
+        """Template context for a page of this listing: the page, its statistics and the active filters"""
+        filters = self.active_filters(request.GET)
+        stats = self.get_stats(filters, **base_args)
+
+        paginator = KeysetPaginator(
+            self.get_queryset(filters, **base_args), self.ordering, self.per_page, count=stats[self.total]
+        )
+        page_obj = paginator.get_page(request.GET.get('cursor'))
+
+        return {
+            'assets': page_obj,
+            **stats,
+            **{f'{name}_filter': filters.get(name) for name in self.filters},
+            'search_query': filters.get('search'),
+            **base_args,
+        }
+
+
+ASSET_LISTINGS = {
+    'unassigned': AssetListing(
+        'unassigned',
+        # Assets with no assigned_to or status = available
+        Q(assigned_to__isnull=True) | Q(status='available'),
+        counts={
+            'total_unassigned': None,
+            'available_unassigned': Q(status='available'),
+            'maintenance_unassigned': Q(status='maintenance'),
+            'lost_unassigned': Q(status='lost'),
+        },
+        total='total_unassigned',
+    ),
+    'assigned': AssetListing(
+        'assigned',
+        Q(assigned_to__isnull=False, status='assigned'),
+        counts={'total_assigned': None},
+        total='total_assigned',
+        distributions={'department_stats': 'assigned_to__department', 'asset_type_stats': 'asset_type'},
+        filters={
+            'employee': 'assigned_to__id',
+            'asset_type': 'asset_type',
+            'department': 'assigned_to__department',
+        },
+    ),
+    'maintenance': AssetListing(
+        'maintenance',
+        Q(status='maintenance'),
+        counts={
+            'total_maintenance': None,
+            'assigned_maintenance': Q(assigned_to__isnull=False),
+            'unassigned_maintenance': Q(assigned_to__isnull=True),
+        },
+        total='total_maintenance',
+    ),
+    'lost': AssetListing(
+        'lost',
+        Q(status='lost'),
+        counts={
+            'total_lost': None,
+            'assigned_lost': Q(assigned_to__isnull=False),
+            'unassigned_lost': Q(assigned_to__isnull=True),
+        },
+        total='total_lost',
+    ),
+    'retired': AssetListing(
+        'retired',
+        Q(status='retired'),
+        counts={
+            'total_retired': None,
+            'assigned_retired': Q(assigned_to__isnull=False),
+            'unassigned_retired': Q(assigned_to__isnull=True),
+        },
+        total='total_retired',
+    ),
+    'old': AssetListing(
+        'old',
+        lambda today: Q(purchase_date__lte=today - OLD_ASSET_AGE),
+        counts={
+            'total_old': None,
+            'assigned_old': Q(assigned_to__isnull=False),
+            'unassigned_old': Q(assigned_to__isnull=True),
+        },
+        total='total_old',
+    ),
+    'healthy': AssetListing(
+        'healthy',
+        # Good health scores (80%+), an indexed range on the stored score
+        Q(health_score__gte=80),
+        counts={
+            'total_healthy': None,
+            'assigned_healthy': Q(assigned_to__isnull=False),
+            'unassigned_healthy': Q(assigned_to__isnull=True),
+        },
+        total='total_healthy',
+    ),
+    'new': AssetListing(
+        'new',
+        # Available assets not assigned to anyone, newest first
+        Q(assigned_to__isnull=True, status='available'),
+        counts={
+            'total_new': None,
+            'assigned_new': Q(assigned_to__isnull=False),
+            'unassigned_new': Q(assigned_to__isnull=True),
+        },
+        total='total_new',
+        ordering=('-created_at', '-id'),
+    ),
+    'attention': AssetListing(
+        'attention',
+        # 2+ years old by purchase date, oldest first
+        lambda today: Q(purchase_date__lte=today - ATTENTION_ASSET_AGE),
+        counts={
+            'total_attention': None,
+            'assigned_attention': Q(assigned_to__isnull=False),
+            'unassigned_attention': Q(assigned_to__isnull=True),
+        },
+        total='total_attention',
+        ordering=('purchase_date', 'id'),
+    ),
+    'department': AssetListing(
+        'department',
+        lambda today, department: Q(assigned_to__department=department, status__in=['assigned', 'maintenance']),
+        counts={
+            'total_assets': None,
+            'assigned_assets': Q(status='assigned'),
+            'maintenance_assets': Q(status='maintenance'),
+        },
+        total='total_assets',
+    ),
+}
@@ -0,0 +1,109 @@
+"""
+Cached summary statistics for the asset list
+"""
+
+import hashlib
+import json
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Asset
+from .search import search_filter
+
+# Bumped on every asset change, so all cached filter combinations expire together. It lives
+# in the shared default cache, so a bump in the sync worker or one gunicorn worker reaches all
+ASSET_STATS_VERSION_KEY = 'asset_stats:version'
+
+# Query parameters that narrow the statistics, matching the asset list's filters
+ASSET_STATS_FILTERS = ['status', 'asset_type', 'search']
+
+
+def stats_filters(params):
+    """Return the non-empty asset list filters from a QueryDict or dict"""
+    return {name: params[name].strip() for name in ASSET_STATS_FILTERS if (params.get(name) or '').strip()}
+
+
+def filter_assets(assets, filters):
+    """Apply asset list filters (status, asset_type, search) to an Asset queryset"""
+    if filters.get('status'):
+        assets = assets.filter(status=filters['status'])
+    if filters.get('asset_type'):
+        assets = assets.filter(asset_type=filters['asset_type'])
+    if filters.get('search'):
+        assets = assets.filter(search_filter(Asset, filters['search']))
+    return assets
+
+
+def compute_asset_stats(filters=None):
+    """Compute asset list statistics with one conditional aggregate and one grouped count"""
+    today = date.today()
+    assets = filter_assets(Asset.objects.all(), filters or {})
+
+    counts = assets.aggregate(
+        total_assets=Count('id'),
+        available_assets=Count('id', filter=Q(status='available')),
+        assigned_assets=Count('id', filter=Q(status='assigned')),
+        maintenance_assets=Count('id', filter=Q(status='maintenance')),
+        lost_assets=Count('id', filter=Q(status='lost')),
+        new_assets=Count('id', filter=Q(assigned_to__isnull=True, status='available')),
+        # Assets older than 3 years, also shown as maintenance alerts
+        old_assets=Count('id', filter=Q(purchase_date__lte=today - timedelta(days=365*3))),
+        # Recently added assets (last 7 days)
+        recent_assets=Count('id', filter=Q(created_at__gte=today - timedelta(days=7))),
+    )
+    counts['maintenance_alerts'] = counts['old_assets']
+
+    # Both distributions come from one count grouped by asset type and department
+    type_counts = {}
+    department_counts = {}
+    grouped = assets.order_by().values('asset_type', 'assigned_to__department').annotate(count=Count('id'))
+    for row in grouped:
+        type_counts[row['asset_type']] = type_counts.get(row['asset_type'], 0) + row['count']
+        if row['assigned_to__department'] is not None:
+            department = row['assigned_to__department']
+            department_counts[department] = department_counts.get(department, 0) + row['count']
+
+    return {
+        **counts,
+        'department_stats': [
+            {'assigned_to__department': department, 'count': count}
+            for department, count in sorted(department_counts.items(), key=lambda item: -item[1])
+        ],
+        'asset_type_stats': [
+            {'asset_type': asset_type, 'count': count}
+            for asset_type, count in sorted(type_counts.items(), key=lambda item: -item[1])
+        ],
+    }
+
+
+def get_asset_stats(filters=None):
+    """Return asset list statistics for a set of filters, cached until assets change or ASSET_STATS_CACHE_TTL passes"""
+    filters = filters or {}
+    return cached_asset_stats('asset_stats', filters, lambda: compute_asset_stats(filters))
+
+
+def cached_asset_stats(namespace, filters, compute):
+    """Return compute(), cached per namespace and filter set until assets change or ASSET_STATS_CACHE_TTL passes"""
+    version = cache.get(ASSET_STATS_VERSION_KEY)
+    if version is None:
+        version = invalidate_asset_stats()
+
+    signature = hashlib.sha256(json.dumps(filters, sort_keys=True).encode()).hexdigest()[:16]
+    cache_key = f'{namespace}:{version}:{signature}'
+
+    stats = cache.get(cache_key)
+    if stats is None:
+        stats = compute()
+        cache.set(cache_key, stats, settings.ASSET_STATS_CACHE_TTL)
+    return stats
+
+
+def invalidate_asset_stats():
+    """Expire every cached set of asset statistics, returning the new version"""
+    version = time.time_ns()
+    cache.set(ASSET_STATS_VERSION_KEY, version, None)
+    return version
@@ -1,35 +1,381 @@
 import requests
 import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
 from django.utils import timezone
-from .models import Employee, Asset
+from .models import Employee, Asset, AzureSyncState, AzureSyncRun, AssetCleanupRecord
+from .asset_stats import invalidate_asset_stats
+from .dashboard_counters import refresh_dashboard_counters
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class DeltaTokenExpired(Exception):
+    """Raised when Graph no longer accepts a stored delta link and a full resync is required"""
+
+
+class SyncInProgress(Exception):
+    """Raised when another process is still driving a sync run, a second sync would race it"""
+
+
+# Microsoft Graph accepts at most 20 sub-requests per $batch call
+GRAPH_BATCH_LIMIT = 20
+
+# Largest $top the users, devices and deletedItems collections accept
+GRAPH_PAGE_SIZE = 999
+
+# Throttled (429) and transient server errors are retried with exponential backoff and full jitter
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 30
+
+USER_DEVICE_SELECT = 'id,displayName,deviceId,manufacturer,model,operatingSystem,operatingSystemVersion'
+
+USER_SELECT = 'id,displayName,mail,userPrincipalName,department,jobTitle,employeeId,accountEnabled,deletedDateTime'
+DEVICE_SELECT = 'id,displayName,deviceId,manufacturer,model,operatingSystem,operatingSystemVersion,approximateLastSignInDateTime,registeredOwners,deviceCategory,deviceOwnership'
+SYNCED_OPERATING_SYSTEMS = ['Windows', 'macOS', 'iOS', 'Android']
+
+# Assets assigned to employees in these states are unassigned by cleanup_orphaned_assets
+ORPHANING_EMPLOYEE_STATUSES = ['inactive', 'deleted']
+
+# AzureSyncState keys for the persisted delta links
+USERS_DELTA_KEY = 'users_delta_link'
+DEVICES_DELTA_KEY = 'devices_delta_link'
+SYNC_SUMMARY_KEY = 'sync_summary'
+
+# Model fields written by the sync, preloaded so bulk_update never hits deferred fields
+EMPLOYEE_SYNC_FIELDS = ['name', 'email', 'department', 'azure_ad_id', 'azure_ad_username', 'job_title',
+                        'employee_id', 'last_azure_sync', 'avatar_url', 'updated_at']
+ASSET_SYNC_FIELDS = ['name', 'asset_type', 'serial_number', 'model', 'manufacturer', 'azure_ad_id',
+                     'operating_system', 'os_version', 'status', 'assigned_to', 'last_azure_sync',
+                     'azure_last_signin', 'purchase_date', 'updated_at']
+
+
+class GraphPage(list):
+    """One page of a Graph collection, with the link to the page after it (None on the last page)"""
+    
+    def __init__(self, items, next_link=None):
+        super().__init__(items)
+        self.next_link = next_link
+
+
+class GraphRequestStats:
+    """Thread-safe per-endpoint latency, retry and error counters for Graph requests"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+    
+    def record(self, endpoint, elapsed, retries, failed):
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                'calls': 0, 'retries': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0,
+            })
+            stats['calls'] += 1
+            stats['retries'] += retries
+            stats['errors'] += 1 if failed else 0
+            stats['total_time'] += elapsed
+            stats['max_time'] = max(stats['max_time'], elapsed)
+    
+    def summary(self):
+        """Return per-endpoint stats, slowest endpoints (by total time) first"""
+        with self.lock:
+            return [
+                {
+                    'endpoint': endpoint,
+                    'calls': stats['calls'],
+                    'retries': stats['retries'],
+                    'errors': stats['errors'],
+                    'total_time': round(stats['total_time'], 2),
+                    'avg_ms': round(stats['total_time'] / stats['calls'] * 1000, 1),
+                    'max_ms': round(stats['max_time'] * 1000, 1),
+                }
+                for endpoint, stats in sorted(self.endpoints.items(), key=lambda item: -item[1]['total_time'])
+            ]
+
+
+class GraphTokenProvider:
+    """
+    Process-wide Graph access token cache shared through Django's cache framework.
+    
+    Tokens are refreshed proactively once they are within REFRESH_MARGIN_SECONDS of
+    expiry. Only one worker refreshes at a time (a thread lock within the process and
+    a cache.add() lock across processes); the others keep using the still-valid token
+    or wait briefly for the new one instead of stampeding the token endpoint. If the
+    shared cache is unavailable, tokens are kept in local memory.
+    """
+    
+    REFRESH_MARGIN_SECONDS = 300
+    LOCK_TIMEOUT_SECONDS = 30
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local_tokens = {}
+    
+    def _get_cached(self, key):
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.debug(f"Token cache unavailable, using local memory: {e}")
+            cached = None
+        return cached or self.local_tokens.get(key)
+    
+    def _set_cached(self, key, value, timeout):
+        self.local_tokens[key] = value
+        try:
+            cache.set(key, value, timeout)
+        except Exception as e:
+            logger.debug(f"Token cache unavailable, using local memory: {e}")
+    
+    def _acquire_refresh_lock(self, lock_key):
+        try:
+            return cache.add(lock_key, True, self.LOCK_TIMEOUT_SECONDS)
+        except Exception:
+            # Without a shared cache the thread lock is the only coordination available
+            return True
+    
+    def _release_refresh_lock(self, lock_key):
+        try:
+            cache.delete(lock_key)
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _is_valid(cached, margin=0):
+        return bool(cached) and time.time() < cached['expires_at'] - margin
+    
+    def get_token(self, key, request_token):
+        """Return a cached access token, calling request_token() for a new one when needed
+        
+        request_token must return Graph's token response data ('access_token', 'expires_in') or None.
+        """
+        cached = self._get_cached(key)
+        if self._is_valid(cached, self.REFRESH_MARGIN_SECONDS):
+            return cached['access_token']
+        
+        with self.lock:
+            # Another thread may have refreshed the token while we waited for the lock
+            cached = self._get_cached(key)
+            if self._is_valid(cached, self.REFRESH_MARGIN_SECONDS):
+                return cached['access_token']
+            
+            lock_key = f"{key}:refresh"
+            acquired = self._acquire_refresh_lock(lock_key)
+            if not acquired:
+                # Another process is refreshing: keep using the current token while it lasts
+                if self._is_valid(cached):
+                    return cached['access_token']
+                
+                deadline = time.monotonic() + self.LOCK_TIMEOUT_SECONDS
+                while time.monotonic() < deadline:
+                    time.sleep(0.2)
+                    cached = self._get_cached(key)
+                    if self._is_valid(cached):
+                        return cached['access_token']
+                logger.warning("Timed out waiting for another worker to refresh the Azure AD token")
+            
+            try:
+                token_data = request_token()
+                if not token_data:
+                    return cached['access_token'] if self._is_valid(cached) else None
+                
+                expires_in = int(token_data.get('expires_in', 3600))
+                value = {
+                    'access_token': token_data['access_token'],
+                    'expires_at': time.time() + expires_in,
+                }
+                self._set_cached(key, value, expires_in)
+                return value['access_token']
+            finally:
+                if acquired:
+                    self._release_refresh_lock(lock_key)
+
+
+# Shared by every AzureADIntegration instance in this process
+token_provider = GraphTokenProvider()
+
+
+class SyncContext:
+    """Graph data shared by the phases of one full sync, so it is only fetched once per run"""
+    
+    def __init__(self):
+        # Azure AD user ID -> IDs of the devices registered to that user
+        self.user_devices = {}
+        # Set once the employee phase has read every user from the first page on
+        self.users_complete = False
+    
+    def add_user_devices(self, user_details):
+        """Record the devices from fetch_user_details results"""
+        for user_id, details in user_details.items():
+            self.user_devices[user_id] = [device['id'] for device in details.get('devices', []) if device.get('id')]
+
+
+class SyncReconciler:
+    """
+    Reconciles Azure AD objects against existing rows of one model in memory.
+    
+    Existing rows are loaded once and indexed by their unique lookup fields. New
+    objects and per-field diffs are collected and written by save(): inserts with
+    chunked bulk_create, and updates grouped so that rows receiving identical changes
+    (typically just last_azure_sync) share one UPDATE ... WHERE id IN (...). Like the
+    per-row saves it replaces, updates only overwrite fields with truthy values, and
+    unique-field conflicts skip the object instead of failing the whole batch.
+    """
+    
+    def __init__(self, model, unique_fields, sync_fields, now):
+        self.model = model
+        self.unique_fields = unique_fields
+        self.attnames = {field: model._meta.get_field(field).attname for field in sync_fields}
+        self.now = now
+        self.index = {field: {} for field in unique_fields}
+        self.to_create = {}
+        self.to_update = {}
+        
+        for obj in model.objects.only('id', *sync_fields):
+            self._add_to_index(obj)
+    
+    def _add_to_index(self, obj):
+        for field in self.unique_fields:
+            value = getattr(obj, field)
+            if value is not None:
+                self.index[field][value] = obj
+    
+    def _remove_from_index(self, obj):
+        for field in self.unique_fields:
+            value = getattr(obj, field)
+            if self.index[field].get(value) is obj:
+                del self.index[field][value]
+    
+    def _check_unique(self, obj, data):
+        for field in self.unique_fields:
+            value = data.get(field)
+            # Updates skip falsy values, creates write them as-is
+            if value is None or (obj is not None and not value):
+                continue
+            other = self.index[field].get(value)
+            if other is not None and other is not obj:
+                raise ValueError(f"{self.model.__name__} with {field} '{value}' already exists")
+    
+    @staticmethod
+    def _raw_value(value):
+        return value.pk if isinstance(value, models.Model) else value
+    
+    def find(self, **lookups):
+        """Return the first pending or existing object matching one of the truthy lookups, in order"""
+        for field, value in lookups.items():
+            if value and value in self.index[field]:
+                return self.index[field][value]
+        return None
+    
+    def create(self, data):
+        self._check_unique(None, data)
+        obj = self.model(**data)
+        self.to_create[obj.pk] = obj
+        self._add_to_index(obj)
+        return obj
+    
+    def update(self, obj, data):
+        self._check_unique(obj, data)
+        self._remove_from_index(obj)
+        
+        changes = {}
+        for field, value in data.items():
+            if value and getattr(obj, self.attnames[field]) != self._raw_value(value):
+                setattr(obj, field, value)
+                changes[field] = value
+        
+        self._add_to_index(obj)
+        
+        # Objects created earlier in this run are inserted with their latest values
+        if changes and obj.pk not in self.to_create:
+            self.to_update.setdefault(obj.pk, (obj, {}))[1].update(changes)
+        return obj
+    
+    def save(self, batch_size):
+        """Write all collected creates and updates; call inside a transaction"""
+        if self.to_create:
+            self.model.objects.bulk_create(list(self.to_create.values()), batch_size=batch_size)
+        
+        # Group rows by their exact change set
+        groups = {}
+        for obj, changes in self.to_update.values():
+            changes['updated_at'] = self.now
+            key = tuple(sorted((field, self._raw_value(value)) for field, value in changes.items()))
+            groups.setdefault(key, []).append((obj, changes))
+        
+        individual_objects = []
+        individual_fields = set()
+        for members in groups.values():
+            if len(members) == 1:
+                obj, changes = members[0]
+                individual_objects.append(obj)
+                individual_fields.update(changes)
+                continue
+            
+            changes = members[0][1]
+            pks = [obj.pk for obj, _ in members]
+            for i in range(0, len(pks), batch_size):
+                self.model.objects.filter(pk__in=pks[i:i + batch_size]).update(**changes)
+        
+        if individual_objects:
+            for obj in individual_objects:
+                obj.updated_at = self.now
+            self.model.objects.bulk_update(individual_objects, sorted(individual_fields), batch_size=batch_size)
+        
+        # Written objects are now existing rows for any later page of the same sync
+        self.to_create = {}
+        self.to_update = {}
+
+
 class AzureADIntegration:
     """
     Azure Active Directory integration for syncing employee data and device assignments
     """
     
-    def __init__(self):
+    def __init__(self, max_workers=None):
         self.tenant_id = getattr(settings, 'AZURE_TENANT_ID', None)
         self.client_id = getattr(settings, 'AZURE_CLIENT_ID', None)
         self.client_secret = getattr(settings, 'AZURE_CLIENT_SECRET', None)
-        self.access_token = None
-        self.token_expires_at = None
+        self.graph_url = getattr(settings, 'AZURE_GRAPH_URL', 'https://graph.microsoft.com/v1.0').rstrip('/')
+        self.login_url = getattr(settings, 'AZURE_LOGIN_URL', 'https://login.microsoftonline.com').rstrip('/')
+        self.max_workers = max_workers or getattr(settings, 'AZURE_SYNC_WORKERS', 8)
+        self.max_retries = getattr(settings, 'AZURE_SYNC_MAX_RETRIES', 5)
+        self.use_batch = getattr(settings, 'AZURE_SYNC_USE_BATCH', True)
+        self.bulk_batch_size = getattr(settings, 'AZURE_SYNC_BULK_BATCH_SIZE', 500)
+        self.timeout = (
+            getattr(settings, 'AZURE_GRAPH_CONNECT_TIMEOUT', 5),
+            getattr(settings, 'AZURE_GRAPH_READ_TIMEOUT', 30),
+        )
+        self.last_fetch_stats = None
+        self.request_stats = GraphRequestStats()
+        
+        # One keep-alive connection pool per host (Graph and login), sized for the fetch workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(self.max_workers, 10))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
     def get_access_token(self):
-        """Get access token for Azure AD API"""
-        if self.access_token and self.token_expires_at and timezone.now() < self.token_expires_at:
-            return self.access_token
-            
+        """Get access token for Azure AD API from the process-wide token cache"""
         if not all([self.tenant_id, self.client_id, self.client_secret]):
             logger.error("Azure AD credentials not configured")
             return None
-            
-        token_url = f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token"
+        
+        cache_key = f"azure_ad_token:{self.tenant_id}:{self.client_id}"
+        return token_provider.get_token(cache_key, self.request_access_token)
+    
+    def request_access_token(self):
+        """Request a new client-credentials token; returns the token response data or None"""
+        token_url = f"{self.login_url}/{self.tenant_id}/oauth2/v2.0/token"
         
         data = {
             'grant_type': 'client_credentials',
@@ -39,16 +385,12 @@ class AzureADIntegration:
         }
         
         try:
-            response = requests.post(token_url, data=data)
+            response = self.graph_request('POST', token_url, None, data=data)
             response.raise_for_status()
             
-            token_data = response.json()
-            self.access_token = token_data['access_token']
-            self.token_expires_at = timezone.now() + timedelta(seconds=token_data['expires_in'] - 300)  # 5 min buffer
+            return response.json()
             
-            return self.access_token
-            
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Failed to get Azure AD access token: {e}")
             return None
     
@@ -63,103 +405,200 @@ class AzureADIntegration:
             'Content-Type': 'application/json'
         }
     
-    def get_users(self, include_disabled=False):
-        """Get all users from Azure AD"""
-        headers = self.get_headers()
-        if not headers:
-            return []
-            
-        url = "https://graph.microsoft.com/v1.0/users"
-        params = {
-            '$select': 'id,displayName,mail,userPrincipalName,department,jobTitle,employeeId,accountEnabled,deletedDateTime',
-            '$filter': 'accountEnabled eq true' if not include_disabled else None
-        }
-        
-        # Remove None values from params
-        params = {k: v for k, v in params.items() if v is not None}
+    def graph_get(self, url, headers, params=None):
+        """GET a Graph resource, waiting out throttled (429) responses using Retry-After"""
+        return self.graph_request('GET', url, headers, params=params)
+    
+    def graph_request(self, method, url, headers, **kwargs):
+        """Send a request over the pooled session with timeouts
         
-        users = []
+        Throttled (429) responses, transient 5xx errors and connection failures are
+        retried with backoff. Latency, retries and errors are recorded per endpoint.
+        """
+        endpoint = self.endpoint_name(url)
+        started = time.monotonic()
+        retries = 0
+        failed = True
         
         try:
-            while url:
-                response = requests.get(url, headers=headers, params=params)
-                response.raise_for_status()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self.backoff_delay(attempt)
+                    logger.warning(f"Graph request to {endpoint} failed ({e}), retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                        failed = response.status_code in RETRY_STATUS_CODES
+                        return response
+                    delay = self.backoff_delay(attempt, response.headers.get('Retry-After'))
+                    logger.warning(f"Graph request to {endpoint} returned {response.status_code}, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
                 
-                data = response.json()
-                users.extend(data.get('value', []))
+                retries += 1
+                time.sleep(delay)
+        finally:
+            self.request_stats.record(endpoint, time.monotonic() - started, retries, failed)
+    
+    def backoff_delay(self, attempt, retry_after=None):
+        """Seconds to wait before a retry: Graph's Retry-After if given, otherwise exponential backoff with full jitter"""
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    
+    def endpoint_name(self, url):
+        """Collapse a request URL into an endpoint label, e.g. /users/{id}/registeredDevices"""
+        if url.startswith(self.login_url) and '/oauth2/' in url:
+            return '/oauth2/token'
+        
+        path = urlsplit(url).path
+        graph_path = urlsplit(self.graph_url).path
+        if path.startswith(graph_path):
+            path = path[len(graph_path):]
+        
+        segments = path.strip('/').split('/')
+        for i in range(1, len(segments)):
+            if segments[i - 1] in ('users', 'devices') and segments[i] not in ('delta', '$count'):
+                segments[i] = '{id}'
+        return '/' + '/'.join(segments)
+    
+    def get_page(self, url, headers, params=None):
+        """Get one page of a Graph collection as parsed JSON"""
+        response = self.graph_get(url, headers, params)
+        response.raise_for_status()
+        return response.json()
+    
+    def iter_pages(self, url, params=None):
+        """Yield each page of a paginated Graph collection as a GraphPage
+        
+        The next page is fetched in the background while the caller processes the
+        current one. Request errors are raised to the caller, so a partially read
+        collection is never mistaken for a complete one. Each page carries its
+        next_link, which can be passed back as start_url to resume after it.
+        """
+        headers = self.get_headers()
+        if not headers:
+            raise requests.exceptions.RequestException("Azure AD credentials not configured")
+        
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            next_page = prefetcher.submit(self.get_page, url, headers, params)
+            while next_page:
+                data = next_page.result()
                 
                 # Handle pagination
-                url = data.get('@odata.nextLink')
-                params = {}  # Clear params for subsequent requests
+                next_link = data.get('@odata.nextLink')
+                next_page = prefetcher.submit(self.get_page, next_link, headers) if next_link else None
                 
+                yield GraphPage(data.get('value', []), next_link)
+    
+    def iter_user_pages(self, include_disabled=False, start_url=None):
+        """Yield pages of users from Azure AD, optionally resuming from a page's next_link"""
+        if start_url:
+            return self.iter_pages(start_url)
+        
+        params = {
+            '$select': USER_SELECT,
+            '$top': GRAPH_PAGE_SIZE,
+        }
+        if not include_disabled:
+            params['$filter'] = 'accountEnabled eq true'
+        
+        return self.iter_pages(f"{self.graph_url}/users", params)
+    
+    def iter_deleted_user_pages(self):
+        """Yield pages of recently deleted users from Azure AD (last 30 days)"""
+        params = {
+            '$select': 'id,displayName,mail,userPrincipalName,deletedDateTime',
+            '$top': GRAPH_PAGE_SIZE,
+        }
+        return self.iter_pages(f"{self.graph_url}/directory/deletedItems/microsoft.graph.user", params)
+    
+    def iter_device_pages(self, start_url=None):
+        """Yield pages of devices from Azure AD, optionally resuming from a page's next_link"""
+        if start_url:
+            return self.iter_pages(start_url)
+        
+        params = {
+            '$select': DEVICE_SELECT,
+            '$filter': ' or '.join(f"operatingSystem eq '{os_name}'" for os_name in SYNCED_OPERATING_SYSTEMS),
+            '$top': GRAPH_PAGE_SIZE,
+        }
+        return self.iter_pages(f"{self.graph_url}/devices", params)
+    
+    def get_users(self, include_disabled=False):
+        """Get all users from Azure AD"""
+        try:
+            return [user for page in self.iter_user_pages(include_disabled) for user in page]
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to get users from Azure AD: {e}")
             return []
-            
-        return users
     
     def get_deleted_users(self):
         """Get recently deleted users from Azure AD (last 30 days)"""
-        headers = self.get_headers()
-        if not headers:
-            return []
-            
-        url = "https://graph.microsoft.com/v1.0/directory/deletedItems/microsoft.graph.user"
-        params = {
-            '$select': 'id,displayName,mail,userPrincipalName,deletedDateTime'
-        }
-        
-        deleted_users = []
-        
         try:
-            while url:
-                response = requests.get(url, headers=headers, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                deleted_users.extend(data.get('value', []))
-                
-                # Handle pagination
-                url = data.get('@odata.nextLink')
-                params = {}
-                
+            return [user for page in self.iter_deleted_user_pages() for user in page]
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to get deleted users from Azure AD: {e}")
             return []
-            
-        return deleted_users
     
     def get_devices(self):
         """Get all devices from Azure AD"""
+        try:
+            return [device for page in self.iter_device_pages() for device in page]
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to get devices from Azure AD: {e}")
+            return []
+    
+    def get_latest_delta_link(self, resource, select):
+        """Get a delta link for users or devices that only reports changes made from now on"""
         headers = self.get_headers()
         if not headers:
-            return []
-            
-        url = "https://graph.microsoft.com/v1.0/devices"
+            return None
+        
+        url = f"{self.graph_url}/{resource}/delta"
         params = {
-            '$select': 'id,displayName,deviceId,manufacturer,model,operatingSystem,operatingSystemVersion,approximateLastSignInDateTime,registeredOwners,deviceCategory,deviceOwnership',
-            '$filter': 'operatingSystem eq \'Windows\' or operatingSystem eq \'macOS\' or operatingSystem eq \'iOS\' or operatingSystem eq \'Android\''
+            '$select': select,
+            '$deltatoken': 'latest'
         }
         
-        devices = []
-        
         try:
-            while url:
-                response = requests.get(url, headers=headers, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                devices.extend(data.get('value', []))
-                
-                # Handle pagination
-                url = data.get('@odata.nextLink')
-                params = {}
-                
+            response = self.graph_get(url, headers, params)
+            response.raise_for_status()
+            return response.json().get('@odata.deltaLink')
+            
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get devices from Azure AD: {e}")
-            return []
+            logger.error(f"Failed to get latest {resource} delta link from Azure AD: {e}")
+            return None
+    
+    def get_delta_changes(self, delta_link):
+        """Follow a stored delta link and return (changed objects, next delta link)
+        
+        Raises DeltaTokenExpired if Graph rejects the link, and lets other request
+        errors propagate so the stored link is not advanced past unprocessed changes.
+        """
+        headers = self.get_headers()
+        if not headers:
+            raise requests.exceptions.RequestException("Azure AD credentials not configured")
+        
+        url = delta_link
+        changes = []
+        
+        while url:
+            response = self.graph_get(url, headers)
+            if response.status_code in (400, 410):
+                # 410 Gone / syncStateNotFound: the token is too old or otherwise invalid
+                raise DeltaTokenExpired(f"Delta link rejected with status {response.status_code}")
+            response.raise_for_status()
             
-        return devices
+            data = response.json()
+            changes.extend(data.get('value', []))
+            
+            url = data.get('@odata.nextLink')
+            if not url:
+                return changes, data.get('@odata.deltaLink')
+        
+        return changes, None
     
     def get_user_devices(self, user_id):
         """Get devices assigned to a specific user"""
@@ -167,13 +606,13 @@ class AzureADIntegration:
         if not headers:
             return []
             
-        url = f"https://graph.microsoft.com/v1.0/users/{user_id}/registeredDevices"
+        url = f"{self.graph_url}/users/{user_id}/registeredDevices"
         params = {
-            '$select': 'id,displayName,deviceId,manufacturer,model,operatingSystem,operatingSystemVersion'
+            '$select': USER_DEVICE_SELECT
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self.graph_get(url, headers, params)
             response.raise_for_status()
             
             data = response.json()
@@ -190,13 +629,13 @@ class AzureADIntegration:
             return None
             
         # Check if user has a photo
-        photo_url = f"https://graph.microsoft.com/v1.0/users/{user_id}/photo"
+        photo_url = f"{self.graph_url}/users/{user_id}/photo"
         
         try:
-            response = requests.get(photo_url, headers=headers)
+            response = self.graph_get(photo_url, headers)
             if response.status_code == 200:
                 # User has a photo, return the URL
-                return f"https://graph.microsoft.com/v1.0/users/{user_id}/photo/$value"
+                return f"{self.graph_url}/users/{user_id}/photo/$value"
             elif response.status_code == 404:
                 # User doesn't have a photo
                 logger.debug(f"No photo found for user {user_id}")
@@ -211,19 +650,36 @@ class AzureADIntegration:
     
     def get_user_photo_data(self, user_id):
         """Get user's profile photo data (binary) from Azure AD"""
+        result = self.get_user_photo(user_id)
+        if result is None:
+            return None
+        
+        status, content, etag, content_type = result
+        return content if status == 200 else None
+    
+    def get_user_photo(self, user_id, etag=None):
+        """Get user's profile photo from Azure AD, revalidating against a previous ETag if given
+        
+        Returns (status, content, etag, content_type) where status is 200, 304 or 404,
+        or None if the request failed.
+        """
         headers = self.get_headers()
         if not headers:
             return None
             
-        photo_url = f"https://graph.microsoft.com/v1.0/users/{user_id}/photo/$value"
+        photo_url = f"{self.graph_url}/users/{user_id}/photo/$value"
+        if etag:
+            headers = {**headers, 'If-None-Match': etag}
         
         try:
-            response = requests.get(photo_url, headers=headers)
+            response = self.graph_get(photo_url, headers)
             if response.status_code == 200:
-                return response.content
+                return 200, response.content, response.headers.get('ETag'), response.headers.get('Content-Type', 'image/jpeg')
+            elif response.status_code == 304:
+                return 304, None, etag, None
             elif response.status_code == 404:
                 logger.debug(f"No photo found for user {user_id}")
-                return None
+                return 404, None, None, None
             else:
                 logger.warning(f"Unexpected status code {response.status_code} when getting photo for user {user_id}")
                 return None
@@ -232,146 +688,241 @@ class AzureADIntegration:
             logger.error(f"Failed to get photo for user {user_id}: {e}")
             return None
     
-    def sync_employees_with_devices(self):
-        """Sync employees from Azure AD with their devices automatically assigned"""
-        azure_users = self.get_users()
-        azure_deleted_users = self.get_deleted_users()
+    def graph_batch(self, sub_requests):
+        """Send up to GRAPH_BATCH_LIMIT sub-requests in one JSON $batch call
+        
+        Returns a dict of sub-request ID to its response ({'status', 'headers', 'body'}).
+        Sub-requests missing from the result failed as a whole and should be retried singly.
+        """
+        headers = self.get_headers()
+        if not headers:
+            return {}
+        
+        try:
+            response = self.graph_request('POST', f"{self.graph_url}/$batch", headers, json={'requests': sub_requests})
+            response.raise_for_status()
+            
+            data = response.json()
+            return {item['id']: item for item in data.get('responses', [])}
+            
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Graph $batch request with {len(sub_requests)} sub-requests failed: {e}")
+            return {}
+    
+    def fetch_user_details_batch(self, user_ids):
+        """Fetch photo and device information for up to GRAPH_BATCH_LIMIT / 2 users in one $batch call
+        
+        Any sub-request that fails (throttled, server error, missing) falls back to a single call.
+        """
+        sub_requests = []
+        for user_id in user_ids:
+            sub_requests.append({'id': f'{user_id}:photo', 'method': 'GET', 'url': f'/users/{user_id}/photo'})
+            sub_requests.append({'id': f'{user_id}:devices', 'method': 'GET',
+                                 'url': f'/users/{user_id}/registeredDevices?$select={USER_DEVICE_SELECT}'})
         
+        responses = self.graph_batch(sub_requests)
+        
+        details = {}
+        for user_id in user_ids:
+            photo_response = responses.get(f'{user_id}:photo', {})
+            if photo_response.get('status') == 200:
+                photo_url = f"{self.graph_url}/users/{user_id}/photo/$value"
+            elif photo_response.get('status') == 404:
+                photo_url = None
+            else:
+                photo_url = self.get_user_photo_url(user_id)
+            
+            devices_response = responses.get(f'{user_id}:devices', {})
+            if devices_response.get('status') == 200:
+                devices = (devices_response.get('body') or {}).get('value', [])
+            else:
+                devices = self.get_user_devices(user_id)
+            
+            details[user_id] = {'photo_url': photo_url, 'devices': devices}
+        
+        return details
+    
+    def fetch_user_details_single(self, user_ids):
+        """Fetch photo and device information with one request per user and resource"""
+        return {
+            user_id: {
+                'photo_url': self.get_user_photo_url(user_id),
+                'devices': self.get_user_devices(user_id),
+            }
+            for user_id in user_ids
+        }
+    
+    def fetch_user_details(self, users):
+        """Fetch photo and device information for many users concurrently
+        
+        Returns a dict keyed by Azure AD user ID with 'photo_url' and 'devices'.
+        Timing information is stored in self.last_fetch_stats.
+        """
+        user_ids = [user['id'] for user in users if user.get('id')]
+        
+        # Fetch the token once up front so workers don't race to request it
+        self.get_access_token()
+        
+        # Each user needs two sub-requests (photo and devices) in a $batch envelope
+        if self.use_batch:
+            chunk_size = GRAPH_BATCH_LIMIT // 2
+            fetch_chunk = self.fetch_user_details_batch
+        else:
+            chunk_size = 1
+            fetch_chunk = self.fetch_user_details_single
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+        
+        def fetch(chunk):
+            started = time.monotonic()
+            chunk_details = fetch_chunk(chunk)
+            return chunk_details, time.monotonic() - started
+        
+        details = {}
+        serial_time = 0.0
+        started = time.monotonic()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for chunk_details, elapsed in executor.map(fetch, chunks):
+                details.update(chunk_details)
+                serial_time += elapsed
+        
+        wall_time = time.monotonic() - started
+        self.last_fetch_stats = {
+            'users': len(user_ids),
+            'workers': self.max_workers,
+            'batched': self.use_batch,
+            'wall_time': round(wall_time, 2),
+            'serial_time': round(serial_time, 2),
+            'speedup': round(serial_time / wall_time, 1) if wall_time > 0 else 1.0,
+        }
+        
+        logger.info(f"Fetched details for {len(user_ids)} users in {wall_time:.2f}s "
+                    f"with {self.max_workers} workers ({self.last_fetch_stats['speedup']}x speedup)")
+        return details
+    
+    def sync_employees_with_devices(self, run=None, context=None):
+        """Sync employees from Azure AD with their devices automatically assigned
+        
+        Users are processed page by page as they arrive from Graph. With an
+        AzureSyncRun, progress is checkpointed after every page, the run's cursor
+        is resumed from, and Graph errors are raised so the run can resume later.
+        With a SyncContext, each user's devices are kept for later phases.
+        """
         # Get all local employees with Azure AD IDs
-        local_employees = Employee.objects.filter(azure_ad_id__isnull=False)
+        local_azure_ids = set(Employee.objects.filter(azure_ad_id__isnull=False).values_list('azure_ad_id', flat=True))
         
-        # Create sets for comparison
-        azure_user_ids = {user['id'] for user in azure_users}
-        azure_deleted_user_ids = {user['id'] for user in azure_deleted_users}
-        local_azure_ids = {emp.azure_ad_id for emp in local_employees}
+        now = timezone.now()
+        employees = self.employee_reconciler(now)
+        assets = self.asset_reconciler(now)
         
+        azure_user_ids = set()
         synced_count = 0
         updated_count = 0
-        disabled_count = 0
-        deleted_count = 0
         devices_synced = 0
         devices_assigned = 0
+        users_complete = True
+        
+        # Users seen before a resume are not known, so a resumed run can't tell who was disabled
+        resumed = bool(run and run.cursor)
         
         # Process active Azure users
+        try:
+            for page in self.iter_user_pages(start_url=run.cursor if run else None):
+                azure_user_ids.update(user['id'] for user in page)
+                page_synced, page_updated, page_devices_synced, page_devices_assigned = self.upsert_employees(page, employees, assets, context)
+                if run:
+                    # Upserts are idempotent, so a crash before this checkpoint only repeats the page
+                    run.checkpoint(page.next_link, azure_users=len(page), employees_synced=page_synced, employees_updated=page_updated,
+                                   user_devices_synced=page_devices_synced, user_devices_assigned=page_devices_assigned)
+                synced_count += page_synced
+                updated_count += page_updated
+                devices_synced += page_devices_synced
+                devices_assigned += page_devices_assigned
+        except requests.exceptions.RequestException as e:
+            if run:
+                raise
+            logger.error(f"Failed to get users from Azure AD: {e}")
+            users_complete = False
+        
+        if context:
+            context.users_complete = users_complete and not resumed
+        
+        azure_deleted_users = self.get_deleted_users()
+        azure_deleted_user_ids = {user['id'] for user in azure_deleted_users}
+        
+        # Handle disabled users (users that exist locally but not in active Azure users)
+        if users_complete and not resumed:
+            disabled_local_ids = local_azure_ids - azure_user_ids - azure_deleted_user_ids
+            disabled_count = self.mark_employees(disabled_local_ids, 'inactive')
+        else:
+            # A partial user list would make every unseen employee look disabled
+            reason = "the sync was resumed part way through" if resumed else "the Azure AD user list is incomplete"
+            logger.warning(f"Skipping disabled employee detection because {reason}")
+            disabled_count = 0
+        
+        # Handle deleted users
+        deleted_count = self.mark_employees(azure_deleted_user_ids, 'deleted')
+        if run:
+            run.checkpoint(employees_disabled=disabled_count, employees_deleted=deleted_count)
+        
+        self.refresh_asset_health_scores(run.started_at if run else now)
+        
+        logger.info(f"Azure AD sync completed: {synced_count} new, {updated_count} updated, {disabled_count} disabled, {deleted_count} deleted, {devices_synced} devices synced, {devices_assigned} devices assigned")
+        return synced_count, updated_count, disabled_count, deleted_count, devices_synced, devices_assigned
+    
+    def upsert_employees(self, azure_users, employees=None, assets=None, context=None):
+        """Create or update employees and their registered devices from Azure AD user objects
+        
+        Existing rows are preloaded and matched in memory, and all changes are written
+        with chunked bulk_create/bulk_update calls inside a single transaction. Pass the
+        same reconcilers for every page of a sync so existing rows are only loaded once.
+        """
+        # Fetch photos and devices for all users concurrently
+        user_details = self.fetch_user_details(azure_users)
+        if context:
+            context.add_user_devices(user_details)
+        
+        now = timezone.now()
+        if employees is None:
+            employees = self.employee_reconciler(now)
+        if assets is None:
+            assets = self.asset_reconciler(now)
+        
+        synced_count = 0
+        updated_count = 0
+        devices_synced = 0
+        devices_assigned = 0
+        
         for user in azure_users:
             try:
-                # Map Azure AD user to Employee model
-                email = user.get('mail', '')
-                if not email:
-                    email = user.get('userPrincipalName', '')
+                details = user_details.get(user.get('id'), {})
+                employee_data = self.build_employee_data(user, details.get('photo_url'), now)
                 
-                department = user.get('department', '')
-                if not department:
-                    department = 'IT'
-                
-                # Get user's profile photo URL
-                photo_url = self.get_user_photo_url(user.get('id'))
-                
-                employee_data = {
-                    'name': user.get('displayName', ''),
-                    'email': email,
-                    'department': department,
-                    'azure_ad_id': user.get('id'),
-                    'azure_ad_username': user.get('userPrincipalName', ''),
-                    'job_title': user.get('jobTitle', ''),
-                    'employee_id': user.get('employeeId', ''),
-                    'last_azure_sync': timezone.now(),
-                }
-                
-                # Add photo URL if available, otherwise use professional placeholder
-                if photo_url:
-                    employee_data['avatar_url'] = photo_url
-                else:
-                    # Always use professional placeholder when no Azure AD photo is available
-                    from assets.templatetags.employee_filters import get_professional_avatar_url, is_generic_avatar
-                    
-                    # Create a mock employee object for the placeholder function
-                    class MockEmployee:
-                        def __init__(self, name):
-                            self.name = name
-                    
-                    mock_employee = MockEmployee(employee_data['name'])
-                    employee_data['avatar_url'] = get_professional_avatar_url(mock_employee)
-                
-                # Check if employee already exists
-                existing_employee = None
-                if employee_data['azure_ad_id']:
-                    existing_employee = Employee.objects.filter(azure_ad_id=employee_data['azure_ad_id']).first()
-                
-                if not existing_employee and employee_data['email']:
-                    existing_employee = Employee.objects.filter(email=employee_data['email']).first()
+                # Match on Azure AD ID first, then fall back to email
+                existing_employee = employees.find(azure_ad_id=employee_data['azure_ad_id'], email=employee_data['email'])
                 
                 if existing_employee:
-                    # Update existing employee
-                    for field, value in employee_data.items():
-                        if hasattr(existing_employee, field) and value:
-                            setattr(existing_employee, field, value)
-                    existing_employee.save()
+                    employee = employees.update(existing_employee, employee_data)
                     updated_count += 1
-                    employee = existing_employee
                 else:
-                    # Create new employee
-                    employee = Employee.objects.create(**employee_data)
+                    employee = employees.create(employee_data)
                     synced_count += 1
                 
                 # Sync devices for this employee
-                user_devices = self.get_user_devices(user.get('id'))
-                for device in user_devices:
+                for device in details.get('devices', []):
                     try:
-                        # Determine asset type based on operating system
-                        os_type = device.get('operatingSystem', '')
-                        if os_type in ['Windows', 'macOS']:
-                            asset_type = 'laptop'
-                        elif os_type in ['iOS', 'Android']:
-                            asset_type = 'phone'
-                        else:
-                            asset_type = 'other'
-                        
-                        # Create asset data
-                        asset_data = {
-                            'name': device.get('displayName', f"{employee.name}'s {asset_type.title()}"),
-                            'asset_type': asset_type,
-                            'serial_number': device.get('deviceId', f"AZURE_{device.get('id', '')}"),
-                            'model': device.get('model', ''),
-                            'manufacturer': device.get('manufacturer', ''),
-                            'azure_ad_id': device.get('id'),
-                            'operating_system': device.get('operatingSystem', ''),
-                            'os_version': device.get('operatingSystemVersion', ''),
-                            'status': 'assigned',
-                            'assigned_to': employee,
-                            'last_azure_sync': timezone.now(),
-                        }
-                        
-                        # Store Azure AD last sign-in date if available
-                        if device.get('approximateLastSignInDateTime'):
-                            try:
-                                from datetime import datetime
-                                signin_date = datetime.fromisoformat(device['approximateLastSignInDateTime'].replace('Z', '+00:00'))
-                                asset_data['azure_last_signin'] = signin_date
-                            except (ValueError, TypeError):
-                                pass  # Skip if date format is invalid
+                        asset_data = self.build_asset_data(device, now, employee=employee)
                         
-                        # Set purchase_date to first Azure sync date if not already set
-                        # This ensures health calculations use the correct date
-                        if not asset_data.get('purchase_date'):
-                            asset_data['purchase_date'] = timezone.now().date()
-                        
-                        # Check if asset already exists
-                        existing_asset = None
+                        # Match on Azure AD ID when present, otherwise on serial number
                         if asset_data['azure_ad_id']:
-                            existing_asset = Asset.objects.filter(azure_ad_id=asset_data['azure_ad_id']).first()
-                        elif asset_data['serial_number']:
-                            existing_asset = Asset.objects.filter(serial_number=asset_data['serial_number']).first()
+                            existing_asset = assets.find(azure_ad_id=asset_data['azure_ad_id'])
+                        else:
+                            existing_asset = assets.find(serial_number=asset_data['serial_number'])
                         
                         if existing_asset:
-                            # Update existing asset
-                            for field, value in asset_data.items():
-                                if hasattr(existing_asset, field) and value:
-                                    setattr(existing_asset, field, value)
-                            existing_asset.save()
+                            assets.update(existing_asset, asset_data)
                         else:
-                            # Create new asset
-                            Asset.objects.create(**asset_data)
+                            assets.create(asset_data)
                             devices_synced += 1
                         
                         devices_assigned += 1
@@ -384,208 +935,459 @@ class AzureADIntegration:
                 logger.error(f"Error syncing employee {user.get('displayName', 'Unknown')}: {e}")
                 continue
         
-        # Handle disabled users (users that exist locally but not in active Azure users)
-        disabled_local_ids = local_azure_ids - azure_user_ids - azure_deleted_user_ids
-        for azure_id in disabled_local_ids:
+        # Employees must exist before the assets that reference them
+        with transaction.atomic():
+            employees.save(self.bulk_batch_size)
+            assets.save(self.bulk_batch_size)
+        
+        return synced_count, updated_count, devices_synced, devices_assigned
+    
+    def employee_reconciler(self, now):
+        return SyncReconciler(Employee, ['azure_ad_id', 'email'], EMPLOYEE_SYNC_FIELDS, now)
+    
+    def asset_reconciler(self, now):
+        return SyncReconciler(Asset, ['azure_ad_id', 'serial_number'], ASSET_SYNC_FIELDS, now)
+    
+    def build_employee_data(self, user, photo_url, now):
+        """Map an Azure AD user object to Employee field values"""
+        email = user.get('mail', '')
+        if not email:
+            email = user.get('userPrincipalName', '')
+        
+        department = user.get('department', '')
+        if not department:
+            department = 'IT'
+        
+        employee_data = {
+            'name': user.get('displayName', ''),
+            'email': email,
+            'department': department,
+            'azure_ad_id': user.get('id'),
+            'azure_ad_username': user.get('userPrincipalName', ''),
+            'job_title': user.get('jobTitle', ''),
+            'employee_id': user.get('employeeId', ''),
+            'last_azure_sync': now,
+        }
+        
+        # Add photo URL if available, otherwise use professional placeholder
+        if photo_url:
+            employee_data['avatar_url'] = photo_url
+        else:
+            # Always use professional placeholder when no Azure AD photo is available
+            from assets.templatetags.employee_filters import get_professional_avatar_url
+            
+            # Create a mock employee object for the placeholder function
+            class MockEmployee:
+                def __init__(self, name):
+                    self.name = name
+            
+            mock_employee = MockEmployee(employee_data['name'])
+            employee_data['avatar_url'] = get_professional_avatar_url(mock_employee)
+        
+        return employee_data
+    
+    def build_asset_data(self, device, now, employee=None):
+        """Map an Azure AD device object to Asset field values
+        
+        Devices registered to a user are assigned to that employee.
+        """
+        # Determine asset type based on operating system
+        os_type = device.get('operatingSystem', '')
+        if os_type in ['Windows', 'macOS']:
+            asset_type = 'laptop'
+        elif os_type in ['iOS', 'Android']:
+            asset_type = 'phone'
+        else:
+            asset_type = 'other'
+        
+        if employee:
+            asset_data = {
+                'name': device.get('displayName', f"{employee.name}'s {asset_type.title()}"),
+                'serial_number': device.get('deviceId', f"AZURE_{device.get('id', '')}"),
+            }
+        else:
+            asset_data = {
+                'name': device.get('displayName', ''),
+                'serial_number': device.get('deviceId', ''),
+            }
+        
+        asset_data.update({
+            'asset_type': asset_type,
+            'model': device.get('model', ''),
+            'manufacturer': device.get('manufacturer', ''),
+            'azure_ad_id': device.get('id'),
+            'operating_system': device.get('operatingSystem', ''),
+            'os_version': device.get('operatingSystemVersion', ''),
+        })
+        
+        if employee:
+            asset_data.update({
+                'status': 'assigned',
+                'assigned_to': employee,
+                'last_azure_sync': now,
+            })
+        
+        # Store Azure AD last sign-in date if available
+        if device.get('approximateLastSignInDateTime'):
             try:
-                employee = Employee.objects.filter(azure_ad_id=azure_id).first()
-                if employee:
-                    # Mark as disabled but don't delete
-                    employee.status = 'inactive'
-                    employee.last_azure_sync = timezone.now()
-                    employee.save()
-                    disabled_count += 1
-                    logger.info(f"Marked employee {employee.name} as inactive (disabled in Azure AD)")
-            except Exception as e:
-                logger.error(f"Error handling disabled employee with Azure ID {azure_id}: {e}")
+                signin_date = datetime.fromisoformat(device['approximateLastSignInDateTime'].replace('Z', '+00:00'))
+                asset_data['azure_last_signin'] = signin_date
+            except (ValueError, TypeError):
+                pass  # Skip if date format is invalid
         
-        # Handle deleted users
-        for deleted_user in azure_deleted_users:
+        # Set purchase_date to first Azure sync date if not already set
+        # This ensures health calculations use the correct date
+        if not asset_data.get('purchase_date'):
+            asset_data['purchase_date'] = now.date()
+        
+        return asset_data
+    
+    def mark_employees(self, azure_ids, status):
+        """Mark employees as inactive (disabled) or deleted in Azure AD, without deleting them locally"""
+        reason = 'disabled' if status == 'inactive' else 'deleted'
+        azure_ids = [azure_id for azure_id in azure_ids if azure_id]
+        marked_count = 0
+        now = timezone.now()
+        
+        for i in range(0, len(azure_ids), self.bulk_batch_size):
+            chunk = azure_ids[i:i + self.bulk_batch_size]
             try:
-                azure_id = deleted_user.get('id')
-                employee = Employee.objects.filter(azure_ad_id=azure_id).first()
-                if employee:
-                    # Mark as deleted but don't physically delete
-                    employee.status = 'deleted'
-                    employee.last_azure_sync = timezone.now()
-                    employee.save()
-                    deleted_count += 1
-                    logger.info(f"Marked employee {employee.name} as deleted (deleted in Azure AD)")
+                employees = Employee.objects.filter(azure_ad_id__in=chunk)
+                names = list(employees.values_list('name', flat=True))
+                marked_count += employees.update(status=status, last_azure_sync=now, updated_at=now)
+                
+                for name in names:
+                    logger.info(f"Marked employee {name} as {status} ({reason} in Azure AD)")
             except Exception as e:
-                logger.error(f"Error handling deleted employee {deleted_user.get('displayName', 'Unknown')}: {e}")
+                logger.error(f"Error handling {len(chunk)} {reason} employees: {e}")
         
-        logger.info(f"Azure AD sync completed: {synced_count} new, {updated_count} updated, {disabled_count} disabled, {deleted_count} deleted, {devices_synced} devices synced, {devices_assigned} devices assigned")
-        return synced_count, updated_count, disabled_count, deleted_count, devices_synced, devices_assigned
+        return marked_count
     
     def sync_employees_with_changes(self):
         """Legacy sync method - now calls the enhanced version with devices"""
         return self.sync_employees_with_devices()
     
-    def sync_devices(self):
-        """Sync devices from Azure AD to local database"""
-        devices = self.get_devices()
+    def sync_devices(self, run=None):
+        """Sync devices from Azure AD to local database, page by page as they arrive
+        
+        With an AzureSyncRun, progress is checkpointed after every page the same
+        way as sync_employees_with_devices.
+        """
+        now = timezone.now()
+        assets = self.asset_reconciler(now)
+        synced_count = 0
+        updated_count = 0
+        
+        try:
+            for page in self.iter_device_pages(start_url=run.cursor if run else None):
+                page_synced, page_updated = self.upsert_devices(page, assets)
+                if run:
+                    run.checkpoint(page.next_link, standalone_devices_synced=page_synced,
+                                   standalone_devices_updated=page_updated)
+                synced_count += page_synced
+                updated_count += page_updated
+        except requests.exceptions.RequestException as e:
+            if run:
+                raise
+            logger.error(f"Failed to get devices from Azure AD: {e}")
+        
+        self.refresh_asset_health_scores(run.started_at if run else now)
+        
+        logger.info(f"Azure AD device sync completed: {synced_count} new devices, {updated_count} updated")
+        return synced_count, updated_count
+    
+    def upsert_devices(self, devices, assets=None):
+        """Create or update standalone assets from Azure AD device objects using bulk writes"""
+        now = timezone.now()
+        if assets is None:
+            assets = self.asset_reconciler(now)
+        
         synced_count = 0
         updated_count = 0
         
         for device in devices:
             try:
-                # Map Azure AD device to Asset model
-                os_type = device.get('operatingSystem', '')
-                if os_type in ['Windows', 'macOS']:
-                    asset_type = 'laptop'
-                elif os_type in ['iOS', 'Android']:
-                    asset_type = 'phone'
-                else:
-                    asset_type = 'other'
-                
-                asset_data = {
-                    'name': device.get('displayName', ''),
-                    'asset_type': asset_type,
-                    'serial_number': device.get('deviceId', ''),
-                    'model': device.get('model', ''),
-                    'manufacturer': device.get('manufacturer', ''),
-                    'azure_ad_id': device.get('id'),
-                    'operating_system': device.get('operatingSystem', ''),
-                    'os_version': device.get('operatingSystemVersion', ''),
-                }
-                
-                # Store Azure AD last sign-in date if available
-                if device.get('approximateLastSignInDateTime'):
-                    try:
-                        from datetime import datetime
-                        signin_date = datetime.fromisoformat(device['approximateLastSignInDateTime'].replace('Z', '+00:00'))
-                        asset_data['azure_last_signin'] = signin_date
-                    except (ValueError, TypeError):
-                        pass  # Skip if date format is invalid
-                
-                # Set purchase_date to first Azure sync date if not already set
-                # This ensures health calculations use the correct date
-                if not asset_data.get('purchase_date'):
-                    asset_data['purchase_date'] = timezone.now().date()
+                asset_data = self.build_asset_data(device, now)
                 
-                # Check if asset already exists
-                existing_asset = None
+                # Match on Azure AD ID when present, otherwise on serial number
                 if asset_data['azure_ad_id']:
-                    existing_asset = Asset.objects.filter(azure_ad_id=asset_data['azure_ad_id']).first()
-                elif asset_data['serial_number']:
-                    existing_asset = Asset.objects.filter(serial_number=asset_data['serial_number']).first()
+                    existing_asset = assets.find(azure_ad_id=asset_data['azure_ad_id'])
+                else:
+                    existing_asset = assets.find(serial_number=asset_data['serial_number'])
                 
                 if existing_asset:
-                    # Update existing asset
-                    for field, value in asset_data.items():
-                        if hasattr(existing_asset, field) and value:
-                            setattr(existing_asset, field, value)
-                    existing_asset.save()
+                    assets.update(existing_asset, asset_data)
                     updated_count += 1
                 else:
-                    # Create new asset
-                    Asset.objects.create(**asset_data)
+                    assets.create(asset_data)
                     synced_count += 1
                     
             except Exception as e:
                 logger.error(f"Error syncing device {device.get('displayName', 'Unknown')}: {e}")
                 continue
         
-        logger.info(f"Azure AD device sync completed: {synced_count} new devices, {updated_count} updated")
+        with transaction.atomic():
+            assets.save(self.bulk_batch_size)
+        
         return synced_count, updated_count
     
-    def sync_device_assignments(self):
-        """Sync device assignments from Azure AD"""
-        users = self.get_users()
-        assignment_count = 0
+    def sync_device_assignments(self, run=None, context=None):
+        """Sync device assignments from Azure AD
         
-        for user in users:
-            try:
-                user_id = user.get('id')
-                if not user_id:
-                    continue
-                
-                # Get devices assigned to this user
-                user_devices = self.get_user_devices(user_id)
-                
-                # Find the employee
-                employee = Employee.objects.filter(azure_ad_id=user_id).first()
-                if not employee:
-                    continue
-                
-                # Update device assignments
-                for device in user_devices:
-                    asset = Asset.objects.filter(azure_ad_id=device.get('id')).first()
-                    if asset and asset.assigned_to != employee:
-                        asset.assigned_to = employee
-                        asset.status = 'assigned'
-                        asset.save()
-                        assignment_count += 1
-                        
-            except Exception as e:
-                logger.error(f"Error syncing device assignments for user {user.get('displayName', 'Unknown')}: {e}")
-                continue
+        With a SyncContext from a complete employee phase, no Graph calls are made:
+        the devices fetched by that phase are diffed against local assignments.
+        Otherwise users are paged through again and their devices fetched in
+        batches. With an AzureSyncRun, progress is checkpointed after every page.
+        """
+        employee_ids = dict(Employee.objects.filter(azure_ad_id__isnull=False).values_list('azure_ad_id', 'id'))
+        asset_assignments = {
+            azure_id: (asset_id, assigned_to_id)
+            for asset_id, azure_id, assigned_to_id in Asset.objects.filter(azure_ad_id__isnull=False)
+                .values_list('id', 'azure_ad_id', 'assigned_to_id')
+        }
+        
+        if context and context.users_complete:
+            assignment_count = self.assign_user_devices(context.user_devices, employee_ids, asset_assignments)
+            if run:
+                run.checkpoint(assignments_updated=assignment_count)
+            
+            logger.info(f"Azure AD device assignment sync completed: {assignment_count} assignments updated")
+            return assignment_count
+        
+        assignment_count = 0
+        try:
+            for page in self.iter_user_pages(start_url=run.cursor if run else None):
+                page_context = SyncContext()
+                page_context.add_user_devices(self.fetch_user_details(page))
+                page_count = self.assign_user_devices(page_context.user_devices, employee_ids, asset_assignments)
+                assignment_count += page_count
+                if run:
+                    run.checkpoint(page.next_link, assignments_updated=page_count)
+        except requests.exceptions.RequestException as e:
+            if run:
+                raise
+            logger.error(f"Failed to get users from Azure AD: {e}")
         
         logger.info(f"Azure AD device assignment sync completed: {assignment_count} assignments updated")
         return assignment_count
     
-    def cleanup_orphaned_assets(self):
-        """Clean up assets that are no longer assigned to active employees"""
+    def assign_user_devices(self, user_devices, employee_ids, asset_assignments):
+        """Assign devices to their users' employee records in one bulk update, returning the number changed
+        
+        employee_ids maps Azure AD user IDs to employee pks and asset_assignments maps
+        Azure AD device IDs to (asset pk, assigned employee pk); the latter is kept
+        up to date so it can be reused across calls.
+        """
+        now = timezone.now()
+        changed = []
+        
+        for user_id, device_ids in user_devices.items():
+            employee_id = employee_ids.get(user_id)
+            if not employee_id:
+                continue
+            
+            for device_id in device_ids:
+                asset_id, assigned_to_id = asset_assignments.get(device_id, (None, None))
+                if asset_id and assigned_to_id != employee_id:
+                    changed.append(Asset(pk=asset_id, assigned_to_id=employee_id, status='assigned', updated_at=now))
+                    asset_assignments[device_id] = (asset_id, employee_id)
+        
+        if changed:
+            with transaction.atomic():
+                Asset.objects.bulk_update(changed, ['assigned_to', 'status', 'updated_at'], batch_size=self.bulk_batch_size)
+            invalidate_asset_stats()
+            refresh_dashboard_counters(Asset)
+        
+        return len(changed)
+    
+    def refresh_asset_health_scores(self, since):
+        """Store health scores for assets the sync wrote since a time, as bulk writes bypass Asset.save()"""
+        refreshed = Asset.objects.filter(updated_at__gte=since).refresh_health_scores()
+        logger.info(f"Refreshed health scores of {refreshed} synced assets")
+        # Bulk writes don't send the signals that expire cached asset statistics or move the dashboard
+        # counters either. Both live in the shared cache, so this reaches the web workers too
+        invalidate_asset_stats()
+        refresh_dashboard_counters(Asset)
+        return refreshed
+    
+    def cleanup_orphaned_assets(self, dry_run=False, run=None):
+        """Clean up assets that are no longer assigned to active employees
+        
+        Affected assets are read and locked once, recorded in AssetCleanupRecord and
+        unassigned with chunked UPDATEs of exactly the recorded rows. With dry_run,
+        they are only read, without a transaction or locks, and the number of assets
+        that would be unassigned is returned.
+        """
         # Get all assets assigned to inactive/deleted employees
-        orphaned_assets = Asset.objects.filter(
-            assigned_to__status__in=['inactive', 'deleted']
-        )
+        orphaned_assets = Asset.objects.filter(assigned_to__status__in=ORPHANING_EMPLOYEE_STATUSES)
+        fields = ('id', 'name', 'status', 'assigned_to_id', 'assigned_to__name', 'assigned_to__status')
+        
+        if dry_run:
+            # A preview takes no locks, so it never holds up the sync or users editing assets
+            orphans = list(orphaned_assets.values_list(*fields))
+            for asset_id, asset_name, status, employee_id, employee_name, employee_status in orphans:
+                logger.info(f"Would unassign asset {asset_name} from {employee_status} employee {employee_name}")
+            logger.info(f"Cleanup dry run: {len(orphans)} assets would be unassigned from inactive employees")
+            return len(orphans)
+        
+        with transaction.atomic():
+            # Lock the rows and update exactly those, so the audit records match what the UPDATE changes
+            orphans = list(orphaned_assets.select_for_update(of=('self',)).values_list(*fields))
+            
+            if not orphans:
+                logger.info("Cleanup completed: 0 assets unassigned from inactive employees")
+                return 0
+            
+            AssetCleanupRecord.objects.bulk_create([
+                AssetCleanupRecord(
+                    asset_id=asset_id, asset_name=asset_name, previous_status=status,
+                    employee_id=employee_id, employee_name=employee_name, employee_status=employee_status,
+                    sync_run=run,
+                )
+                for asset_id, asset_name, status, employee_id, employee_name, employee_status in orphans
+            ], batch_size=self.bulk_batch_size)
+            
+            asset_ids = [asset_id for asset_id, *_ in orphans]
+            now = timezone.now()
+            cleanup_count = 0
+            for i in range(0, len(asset_ids), self.bulk_batch_size):
+                cleanup_count += Asset.objects.filter(pk__in=asset_ids[i:i + self.bulk_batch_size]).update(
+                    assigned_to=None, status='available', updated_at=now
+                )
+        
+        invalidate_asset_stats()
+        refresh_dashboard_counters(Asset)
         
-        cleanup_count = 0
-        for asset in orphaned_assets:
-            asset.assigned_to = None
-            asset.status = 'available'
-            asset.save()
-            cleanup_count += 1
-            logger.info(f"Unassigned asset {asset.name} from inactive employee {asset.assigned_to.name if asset.assigned_to else 'Unknown'}")
+        for asset_id, asset_name, status, employee_id, employee_name, employee_status in orphans:
+            logger.info(f"Unassigned asset {asset_name} from {employee_status} employee {employee_name}")
         
         logger.info(f"Cleanup completed: {cleanup_count} assets unassigned from inactive employees")
         return cleanup_count
     
-    def get_sync_summary(self):
-        """Get a summary of the current sync status"""
-        total_azure_users = len(self.get_users())
-        total_local_employees = Employee.objects.count()
-        total_azure_employees = Employee.objects.filter(azure_ad_id__isnull=False).count()
-        active_employees = Employee.objects.filter(status='active').count()
-        inactive_employees = Employee.objects.filter(status='inactive').count()
-        deleted_employees = Employee.objects.filter(status='deleted').count()
+    def get_sync_summary(self, refresh=False):
+        """Get a summary of the current sync status from the snapshot saved by the last sync
         
-        return {
-            'azure_users': total_azure_users,
-            'local_employees': total_local_employees,
-            'azure_synced_employees': total_azure_employees,
-            'active_employees': active_employees,
-            'inactive_employees': inactive_employees,
-            'deleted_employees': deleted_employees,
-            'last_sync': timezone.now()
+        With refresh, or before the first sync, the snapshot is recomputed. Only a
+        refresh asks Graph for the user count, with a single $count request.
+        """
+        snapshot = AzureSyncState.get_value(SYNC_SUMMARY_KEY)
+        if snapshot and not refresh:
+            summary = json.loads(snapshot)
+        else:
+            summary = self.save_sync_summary(self.get_user_count() if refresh else None)
+        
+        summary['computed_at'] = datetime.fromisoformat(summary['computed_at'])
+        summary['last_sync'] = summary['computed_at']
+        return summary
+    
+    def save_sync_summary(self, azure_users=None):
+        """Compute and store the sync summary snapshot, keeping the previous Azure user count if none is given"""
+        if azure_users is None:
+            previous = AzureSyncState.get_value(SYNC_SUMMARY_KEY)
+            azure_users = json.loads(previous).get('azure_users') if previous else None
+        
+        # One conditional aggregate per model instead of a count() per status
+        employee_counts = Employee.objects.aggregate(
+            local_employees=models.Count('id'),
+            azure_synced_employees=models.Count('id', filter=models.Q(azure_ad_id__isnull=False)),
+            active_employees=models.Count('id', filter=models.Q(status='active')),
+            inactive_employees=models.Count('id', filter=models.Q(status='inactive')),
+            deleted_employees=models.Count('id', filter=models.Q(status='deleted')),
+        )
+        asset_counts = Asset.objects.aggregate(
+            local_assets=models.Count('id'),
+            azure_synced_assets=models.Count('id', filter=models.Q(azure_ad_id__isnull=False)),
+        )
+        
+        summary = {
+            'azure_users': azure_users,
+            **employee_counts,
+            **asset_counts,
+            'computed_at': timezone.now().isoformat(),
         }
+        AzureSyncState.set_value(SYNC_SUMMARY_KEY, json.dumps(summary))
+        return summary
+    
+    def get_user_count(self):
+        """Count enabled Azure AD users with a single $count request, or None if it fails"""
+        headers = self.get_headers()
+        if not headers:
+            return None
+        
+        # $count is an advanced query and needs the eventual consistency header
+        headers = {**headers, 'ConsistencyLevel': 'eventual'}
+        params = {'$filter': 'accountEnabled eq true'}
+        
+        try:
+            response = self.graph_get(f"{self.graph_url}/users/$count", headers, params)
+            response.raise_for_status()
+            return int(response.text)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Failed to count users in Azure AD: {e}")
+            return None
     
-    def full_sync(self):
-        """Perform full sync of employees, devices, and assignments with change detection"""
-        logger.info("Starting full Azure AD sync with change detection...")
+    def incremental_sync(self):
+        """Sync only users and devices changed since the last run using Graph delta queries
+        
+        Falls back to a full resync when no delta links are stored yet or Graph
+        reports that the stored links have expired. Raises SyncInProgress while
+        another process is running a full sync.
+        """
+        self.check_no_sync_in_progress()
+        users_delta_link = AzureSyncState.get_value(USERS_DELTA_KEY)
+        devices_delta_link = AzureSyncState.get_value(DEVICES_DELTA_KEY)
+        
+        if not users_delta_link or not devices_delta_link:
+            logger.info("No Azure AD delta links stored yet, performing full resync...")
+            return self.resync()
         
-        # Sync employees with full change detection and devices
-        employee_synced, employee_updated, employee_disabled, employee_deleted, devices_synced, devices_assigned = self.sync_employees_with_devices()
+        logger.info("Starting incremental Azure AD sync...")
+        started_at = timezone.now()
         
-        # Sync additional devices (standalone devices not assigned to users)
-        device_synced, device_updated = self.sync_devices()
+        try:
+            changed_users, next_users_link = self.get_delta_changes(users_delta_link)
+            changed_devices, next_devices_link = self.get_delta_changes(devices_delta_link)
+        except DeltaTokenExpired as e:
+            logger.warning(f"Azure AD delta link expired ({e}), performing full resync...")
+            return self.resync()
+        
+        removed_user_ids = [user['id'] for user in changed_users if '@removed' in user]
+        disabled_user_ids = [user['id'] for user in changed_users
+                             if '@removed' not in user and user.get('accountEnabled') is False]
+        active_users = [user for user in changed_users
+                        if '@removed' not in user and user.get('accountEnabled') is not False]
+        
+        employee_synced, employee_updated, devices_synced, devices_assigned = self.upsert_employees(active_users)
+        employee_disabled = self.mark_employees(disabled_user_ids, 'inactive')
+        employee_deleted = self.mark_employees(removed_user_ids, 'deleted')
         
-        # Sync device assignments
-        assignments_updated = self.sync_device_assignments()
+        # Removed devices are left in place, matching the full sync which never deletes assets
+        active_devices = [device for device in changed_devices
+                          if '@removed' not in device and device.get('operatingSystem') in SYNCED_OPERATING_SYSTEMS]
+        device_synced, device_updated = self.upsert_devices(active_devices)
+        self.refresh_asset_health_scores(started_at)
         
-        # Clean up orphaned assets
         cleanup_count = self.cleanup_orphaned_assets()
         
-        logger.info(f"Full Azure AD sync completed: "
+        # Only advance the delta links once every change has been applied
+        if next_users_link:
+            AzureSyncState.set_value(USERS_DELTA_KEY, next_users_link)
+        if next_devices_link:
+            AzureSyncState.set_value(DEVICES_DELTA_KEY, next_devices_link)
+        
+        self.save_sync_summary(self.get_user_count() if changed_users else None)
+        
+        logger.info(f"Incremental Azure AD sync completed: "
+                   f"{len(changed_users)} changed users, {len(changed_devices)} changed devices, "
                    f"{employee_synced} new employees, {employee_updated} updated employees, "
                    f"{employee_disabled} disabled employees, {employee_deleted} deleted employees, "
-                   f"{devices_synced} user devices synced, {devices_assigned} devices assigned, "
-                   f"{device_synced} standalone devices synced, {device_updated} standalone devices updated, "
-                   f"{assignments_updated} device assignments updated, "
+                   f"{device_synced} devices synced, {device_updated} devices updated, "
                    f"{cleanup_count} assets cleaned up")
         
         return {
+            'mode': 'incremental',
+            'users_changed': len(changed_users),
+            'devices_changed': len(changed_devices),
             'employees_synced': employee_synced,
             'employees_updated': employee_updated,
             'employees_disabled': employee_disabled,
@@ -594,6 +1396,135 @@ class AzureADIntegration:
             'user_devices_assigned': devices_assigned,
             'standalone_devices_synced': device_synced,
             'standalone_devices_updated': device_updated,
-            'assignments_updated': assignments_updated,
-            'assets_cleaned_up': cleanup_count
+            'assets_cleaned_up': cleanup_count,
+            'fetch_stats': self.last_fetch_stats,
+            'request_stats': self.request_stats.summary()
         }
+    
+    def resync(self):
+        """Run a full sync and store fresh delta links for subsequent incremental syncs"""
+        # Take the delta links first so changes made during the full sync are picked up next time
+        users_delta_link = self.get_latest_delta_link('users', USER_SELECT)
+        devices_delta_link = self.get_latest_delta_link('devices', DEVICE_SELECT)
+        
+        # Never resume here, pages synced before the delta links were taken could miss changes
+        results = self.full_sync(resume=False)
+        
+        if users_delta_link and devices_delta_link:
+            AzureSyncState.set_value(USERS_DELTA_KEY, users_delta_link)
+            AzureSyncState.set_value(DEVICES_DELTA_KEY, devices_delta_link)
+        else:
+            logger.warning("Could not obtain Azure AD delta links, the next incremental sync will resync again")
+        
+        results['mode'] = 'full'
+        return results
+    
+    def full_sync(self, resume=True, on_start=None):
+        """Perform full sync of employees, devices, and assignments with change detection
+        
+        Progress is recorded in an AzureSyncRun, which is passed to on_start if given.
+        If the previous full sync stopped partway, it is resumed from the phase and
+        page where it stopped, unless it is older than AZURE_SYNC_RESUME_MAX_AGE or
+        resume is False.
+        """
+        run = self.start_sync_run(resume)
+        if on_start:
+            on_start(run)
+        
+        # Users' devices fetched by the employee phase are reused by the assignment phase
+        context = SyncContext()
+        phases = {
+            'employees': lambda run: self.sync_employees_with_devices(run, context),
+            'devices': self.sync_devices,
+            'assignments': lambda run: self.sync_device_assignments(run, context),
+            'cleanup': lambda run: run.checkpoint(assets_cleaned_up=self.cleanup_orphaned_assets(run=run)),
+        }
+        
+        phase_names = AzureSyncRun.phase_names()
+        for phase in phase_names[phase_names.index(run.phase):]:
+            if run.phase != phase:
+                run.phase = phase
+                run.cursor = ''
+                run.save(update_fields=['phase', 'cursor', 'updated_at'])
+            
+            logger.info(f"Azure AD sync phase '{phase}' starting{' from checkpoint' if run.cursor else ''}...")
+            started = time.monotonic()
+            try:
+                phases[phase](run)
+            except Exception as e:
+                run.add_duration(phase, time.monotonic() - started)
+                run.status = 'failed'
+                run.error = str(e)
+                run.save(update_fields=['status', 'error', 'updated_at'])
+                logger.error(f"Azure AD sync failed in phase '{phase}', the next full sync will resume from there: {e}")
+                raise
+            run.add_duration(phase, time.monotonic() - started)
+        
+        run.status = 'completed'
+        run.cursor = ''
+        run.error = ''
+        run.finished_at = timezone.now()
+        run.save(update_fields=['status', 'cursor', 'error', 'finished_at', 'updated_at'])
+        
+        counts = run.counts
+        self.save_sync_summary(counts.get('azure_users'))
+        logger.info(f"Full Azure AD sync completed in {run.total_duration}s: "
+                   f"{counts.get('employees_synced', 0)} new employees, {counts.get('employees_updated', 0)} updated employees, "
+                   f"{counts.get('employees_disabled', 0)} disabled employees, {counts.get('employees_deleted', 0)} deleted employees, "
+                   f"{counts.get('user_devices_synced', 0)} user devices synced, {counts.get('user_devices_assigned', 0)} devices assigned, "
+                   f"{counts.get('standalone_devices_synced', 0)} standalone devices synced, {counts.get('standalone_devices_updated', 0)} standalone devices updated, "
+                   f"{counts.get('assignments_updated', 0)} device assignments updated, "
+                   f"{counts.get('assets_cleaned_up', 0)} assets cleaned up")
+        
+        return {
+            'employees_synced': counts.get('employees_synced', 0),
+            'employees_updated': counts.get('employees_updated', 0),
+            'employees_disabled': counts.get('employees_disabled', 0),
+            'employees_deleted': counts.get('employees_deleted', 0),
+            'user_devices_synced': counts.get('user_devices_synced', 0),
+            'user_devices_assigned': counts.get('user_devices_assigned', 0),
+            'standalone_devices_synced': counts.get('standalone_devices_synced', 0),
+            'standalone_devices_updated': counts.get('standalone_devices_updated', 0),
+            'assignments_updated': counts.get('assignments_updated', 0),
+            'assets_cleaned_up': counts.get('assets_cleaned_up', 0),
+            'sync_run_id': run.id,
+            'resumed': run.attempts > 1,
+            'phase_timings': run.phase_timings(),
+            'total_time': run.total_duration,
+            'fetch_stats': self.last_fetch_stats,
+            'request_stats': self.request_stats.summary()
+        }
+    
+    def start_sync_run(self, resume=True):
+        """Return the unfinished AzureSyncRun to resume, or a new one
+        
+        Raises SyncInProgress if a run was checkpointed within AZURE_SYNC_JOB_TIMEOUT,
+        the same test fail_stale_jobs applies to sync jobs: another process, such as
+        the sync worker, is still driving it.
+        """
+        self.check_no_sync_in_progress()
+        unfinished = AzureSyncRun.objects.filter(status__in=['running', 'failed'])
+        cutoff = timezone.now() - timedelta(hours=settings.AZURE_SYNC_RESUME_MAX_AGE)
+        
+        run = unfinished.filter(started_at__gte=cutoff).first() if resume else None
+        if run:
+            unfinished = unfinished.exclude(pk=run.pk)
+        
+        # Graph page links don't live forever, so older unfinished runs start over
+        unfinished.update(status='abandoned', updated_at=timezone.now())
+        
+        if run:
+            logger.info(f"Resuming Azure AD sync run {run.id} from phase '{run.phase}'")
+            run.status = 'running'
+            run.attempts += 1
+            run.save(update_fields=['status', 'attempts', 'updated_at'])
+            return run
+        
+        return AzureSyncRun.objects.create(phase=AzureSyncRun.phase_names()[0])
+    
+    def check_no_sync_in_progress(self):
+        """Raise SyncInProgress if another process has checkpointed a running sync run recently"""
+        cutoff = timezone.now() - timedelta(minutes=settings.AZURE_SYNC_JOB_TIMEOUT)
+        live = AzureSyncRun.objects.filter(status='running', updated_at__gte=cutoff).first()
+        if live:
+            raise SyncInProgress(f"Azure AD sync run {live.id} is still in progress in another process")
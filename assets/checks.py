@@ -0,0 +1,21 @@
+"""
+System checks for deployment settings the assets app relies on
+"""
+
+from django.conf import settings
+from django.core.checks import Error
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """Cached counters and statistics are updated from several processes, a per-process cache serves stale copies"""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', LOCMEM_CACHE)
+    if backend == LOCMEM_CACHE:
+        return [Error(
+            'The default cache is a per-process LocMemCache, so each gunicorn worker, the sync '
+            'worker and the timers keep their own dashboard counters and statistics.',
+            hint='Set REDIS_URL, or configure a DatabaseCache or RedisCache as the default cache.',
+            id='assets.E001',
+        )]
+    return []
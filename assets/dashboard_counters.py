@@ -0,0 +1,241 @@
+"""
+Cached dashboard counters, kept current by model signals and reconciled periodically
+
+Counters live in the shared default cache (see CACHES in settings) for
+DASHBOARD_COUNTERS_CACHE_TTL seconds, so an update a process misses, or that a
+non-atomic backend loses, is corrected by the next recount.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import Asset, DashboardSnapshot, Handover
+
+CACHE_PREFIX = 'dashboard_counters'
+
+# Completed handovers signed on paper are the scans behind "Last scan"
+LAST_SCAN_KEY = f'{CACHE_PREFIX}:last_scan_at'
+SCAN_MODE = 'Paper & Scan'
+
+# Trends compare today's counters with the snapshot this many days back
+TREND_DAYS = 30
+
+
+def today_bounds(now):
+    """Start and end of the local day containing now"""
+    start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=1)
+
+
+def overdue_before(now):
+    return now - timedelta(days=settings.DASHBOARD_SIGNATURE_OVERDUE_DAYS)
+
+
+class DashboardCounter:
+    """A dashboard count of the model rows meeting a condition
+
+    condition(now) returns the Q the count filters on and matches(obj, now) says
+    whether one instance meets it, so a save or delete can adjust the cached count
+    by its own change instead of recounting. Daily counters are cached per local
+    day so they start from zero at midnight. Counters whose condition depends on
+    the time drift as rows age past it until the next reconciliation.
+    """
+
+    def __init__(self, name, model, fields, condition, matches, daily=False):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.condition = condition
+        self.matches = matches
+        self.daily = daily
+
+    def cache_key(self, now):
+        if self.daily:
+            return f'{CACHE_PREFIX}:{self.name}:{timezone.localdate(now).isoformat()}'
+        return f'{CACHE_PREFIX}:{self.name}'
+
+
+DASHBOARD_COUNTERS = [
+    DashboardCounter(
+        'assets_in_stock', Asset, ['status'],
+        lambda now: Q(status='available'),
+        lambda asset, now: asset.status == 'available',
+    ),
+    DashboardCounter(
+        'pending_signatures', Handover, ['status'],
+        lambda now: Q(status='Pending'),
+        lambda handover, now: handover.status == 'Pending',
+    ),
+    DashboardCounter(
+        'overdue_signatures', Handover, ['status', 'created_at'],
+        lambda now: Q(status='Pending', created_at__lt=overdue_before(now)),
+        lambda handover, now: handover.status == 'Pending' and handover.created_at < overdue_before(now),
+    ),
+    DashboardCounter(
+        'pending_scans', Handover, ['status'],
+        lambda now: Q(status='Pending Scan'),
+        lambda handover, now: handover.status == 'Pending Scan',
+    ),
+    DashboardCounter(
+        'total_handovers', Handover, [],
+        lambda now: Q(),
+        lambda handover, now: True,
+    ),
+    DashboardCounter(
+        'today_handovers', Handover, ['created_at'],
+        lambda now: Q(created_at__gte=today_bounds(now)[0], created_at__lt=today_bounds(now)[1]),
+        lambda handover, now: today_bounds(now)[0] <= handover.created_at < today_bounds(now)[1],
+        daily=True,
+    ),
+]
+
+
+def model_counters(model):
+    return [counter for counter in DASHBOARD_COUNTERS if counter.model is model]
+
+
+def compute_counters(counters, now):
+    """Count the given counters with one conditional aggregate per model"""
+    values = {}
+    for model in dict.fromkeys(counter.model for counter in counters):
+        values.update(model.objects.aggregate(**{
+            counter.name: Count('pk', filter=counter.condition(now))
+            for counter in counters if counter.model is model
+        }))
+    return values
+
+
+def compute_last_scan():
+    return Handover.objects.filter(mode=SCAN_MODE, completed_at__isnull=False).aggregate(
+        last_scan_at=Max('completed_at')
+    )['last_scan_at']
+
+
+def store_counters(counters, values, now):
+    cache.set_many(
+        {counter.cache_key(now): values[counter.name] for counter in counters}, settings.DASHBOARD_COUNTERS_CACHE_TTL
+    )
+
+
+def refresh_dashboard_counters(model=None, now=None):
+    """Recount the counters (of one model, or all of them) into the cache, returning their values
+
+    Bulk writes such as the Azure AD sync's bypass the model signals, so they
+    call this for the models they change.
+    """
+    now = now or timezone.now()
+    counters = model_counters(model) if model else DASHBOARD_COUNTERS
+    values = compute_counters(counters, now)
+    store_counters(counters, values, now)
+    if model in (None, Handover):
+        cache.set(LAST_SCAN_KEY, compute_last_scan(), settings.DASHBOARD_COUNTERS_CACHE_TTL)
+    return values
+
+
+def get_dashboard_counters(now=None):
+    """Every counter and the last scan time, from the cache, counting only those missing from it"""
+    now = now or timezone.now()
+    keys = {counter.cache_key(now): counter for counter in DASHBOARD_COUNTERS}
+    cached = cache.get_many([*keys, LAST_SCAN_KEY])
+
+    missing = [counter for key, counter in keys.items() if key not in cached]
+    values = compute_counters(missing, now) if missing else {}
+    if missing:
+        store_counters(missing, values, now)
+    for key, counter in keys.items():
+        if key in cached:
+            values[counter.name] = cached[key]
+
+    if LAST_SCAN_KEY in cached:
+        values['last_scan_at'] = cached[LAST_SCAN_KEY]
+    else:
+        values['last_scan_at'] = compute_last_scan()
+        cache.set(LAST_SCAN_KEY, values['last_scan_at'], settings.DASHBOARD_COUNTERS_CACHE_TTL)
+    return values
+
+
+def counted_keys(instance, now):
+    """Cache keys of the counters an instance currently counts towards"""
+    return {
+        counter.cache_key(now) for counter in model_counters(type(instance))
+        if counter.matches(instance, now)
+    }
+
+
+def counted_fields(model):
+    return {field for counter in model_counters(model) for field in counter.fields}
+
+
+def stored_counted_keys(instance, now):
+    """Cache keys of the counters the stored row of an instance counts towards, before it is saved"""
+    if instance._state.adding:
+        return set()
+    stored = type(instance)._default_manager.filter(pk=instance.pk).only(*counted_fields(type(instance))).first()
+    return counted_keys(stored, now) if stored else set()
+
+
+def adjust_counters(before, after):
+    """Move cached counters by the change from the before to the after set of counted keys, once committed"""
+    deltas = {key: 1 for key in after - before}
+    deltas.update({key: -1 for key in before - after})
+    if deltas:
+        transaction.on_commit(lambda: apply_deltas(deltas))
+
+
+def apply_deltas(deltas):
+    for key, delta in deltas.items():
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # Not cached, the next read counts it from the database
+            pass
+
+
+def note_scan(handover):
+    """Move the cached last scan time forward when a paper handover completes"""
+    if handover.mode != SCAN_MODE or not handover.completed_at:
+        return
+
+    def update():
+        last_scan_at = cache.get(LAST_SCAN_KEY)
+        if last_scan_at is None or handover.completed_at > last_scan_at:
+            cache.set(LAST_SCAN_KEY, handover.completed_at, settings.DASHBOARD_COUNTERS_CACHE_TTL)
+    transaction.on_commit(update)
+
+
+def forget_scan(handover):
+    """Expire the cached last scan time when a completed paper handover is deleted, the next read recomputes it"""
+    if handover.mode == SCAN_MODE and handover.completed_at:
+        transaction.on_commit(lambda: cache.delete(LAST_SCAN_KEY))
+
+
+def snapshot_counters(values, now=None):
+    """Store the counters as today's snapshot, later runs on the same day replace it"""
+    today = timezone.localdate(now or timezone.now())
+    counters = {counter.name: values[counter.name] for counter in DASHBOARD_COUNTERS}
+    DashboardSnapshot.objects.update_or_create(date=today, defaults={'counters': counters})
+
+
+def trend_baseline(now=None):
+    """Counters of the latest snapshot at least TREND_DAYS old, cached for the day"""
+    today = timezone.localdate(now or timezone.now())
+    key = f'{CACHE_PREFIX}:baseline:{today.isoformat()}'
+    baseline = cache.get(key)
+    if baseline is None:
+        snapshot = DashboardSnapshot.objects.filter(date__lte=today - timedelta(days=TREND_DAYS)).first()
+        baseline = snapshot.counters if snapshot else {}
+        cache.set(key, baseline, 60 * 60 * 24)
+    return baseline
+
+
+def counter_trend(name, value, baseline):
+    """Percentage change of a counter from its baseline, or None without a usable baseline"""
+    previous = baseline.get(name)
+    if not previous:
+        return None
+    return round((value - previous) * 100 / previous)
@@ -0,0 +1,399 @@
+"""
+Local stand-in for Microsoft Graph used to benchmark the Azure AD sync offline
+
+The stub serves either a synthetic tenant generated on demand or responses
+recorded from a real tenant with GraphRecorder, optionally adding latency and
+throttling (429) to every request.
+"""
+
+import base64
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit
+
+from .azure_ad_integration import RETRY_STATUS_CODES
+
+# Response headers kept in fixtures, everything else is regenerated by the stub
+RECORDED_HEADERS = ['Content-Type', 'ETag']
+
+
+def fixture_key(url, api_path=''):
+    """Normalize a Graph URL to its path below the API root plus its sorted, decoded query"""
+    parts = urlsplit(url)
+    path = parts.path
+    if api_path and path.startswith(api_path):
+        path = path[len(api_path):]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)), safe="$,'")
+    return f'{path}?{query}' if query else path
+
+
+class SyntheticTenant:
+    """Deterministic Azure AD tenant whose users and devices are generated on demand by index"""
+
+    def __init__(self, user_count, devices_per_user=1):
+        self.user_count = user_count
+        self.devices_per_user = devices_per_user
+
+    @property
+    def device_count(self):
+        return self.user_count * self.devices_per_user
+
+    def user(self, index):
+        return {
+            'id': f'stub-user-{index}',
+            'displayName': f'Stub User {index}',
+            'mail': f'stub.user{index}@example.com',
+            'userPrincipalName': f'stub.user{index}@example.com',
+            'department': 'IT',
+            'jobTitle': 'Engineer',
+            'officeLocation': 'HQ',
+            'employeeId': str(index),
+            'accountEnabled': True,
+        }
+
+    def device(self, index):
+        user_index, device_number = divmod(index, self.devices_per_user)
+        return {
+            'id': f'stub-device-{user_index}-{device_number}',
+            'displayName': f'STUB-{user_index}-{device_number}',
+            'deviceId': f'STUB-SERIAL-{user_index}-{device_number}',
+            'manufacturer': 'Dell',
+            'model': 'Latitude 5520',
+            'operatingSystem': 'Windows',
+            'operatingSystemVersion': '10.0.19045',
+        }
+
+    def user_index(self, user_id):
+        """Return the index encoded in a stub user id, or None if it is not one of ours"""
+        prefix, _, index = user_id.rpartition('-')
+        if prefix != 'stub-user' or not index.isdigit() or int(index) >= self.user_count:
+            return None
+        return int(index)
+
+    def user_devices(self, user_index):
+        start = user_index * self.devices_per_user
+        return [self.device(i) for i in range(start, start + self.devices_per_user)]
+
+
+class GraphFixtures:
+    """Graph responses recorded from a real tenant, keyed by fixture_key and saved as one JSON file
+
+    Links inside recorded bodies (@odata.nextLink, deltaLink) still point at the
+    recorded graph_url and are rewritten to the stub's URL when served.
+    """
+
+    def __init__(self, graph_url, responses=None):
+        self.graph_url = graph_url
+        self.responses = responses or {}
+        self.lock = threading.Lock()
+
+    @property
+    def api_path(self):
+        return urlsplit(self.graph_url).path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['graph_url'], data['responses'])
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'graph_url': self.graph_url, 'responses': self.responses}, f)
+
+    def add(self, url, status, headers, body):
+        """Record a response body (bytes) for a request URL"""
+        entry = {
+            'status': status,
+            'headers': {name: headers[name] for name in RECORDED_HEADERS if headers.get(name)},
+        }
+        try:
+            entry['body'] = body.decode()
+        except UnicodeDecodeError:
+            entry['body_base64'] = base64.b64encode(body).decode()
+
+        with self.lock:
+            self.responses[fixture_key(url, self.api_path)] = entry
+
+    def truncate(self, next_link):
+        """End a collection before next_link, for recordings limited to their first pages"""
+        with self.lock:
+            self.responses.pop(fixture_key(next_link, self.api_path), None)
+            for entry in self.responses.values():
+                if '@odata.nextLink' not in entry.get('body', ''):
+                    continue
+                body = json.loads(entry['body'])
+                if body.get('@odata.nextLink') == next_link:
+                    del body['@odata.nextLink']
+                    entry['body'] = json.dumps(body)
+
+    def response(self, url, graph_url, request_headers=None):
+        """Return (status, body bytes, headers) for a request, or a Graph style 404 if it was never recorded"""
+        entry = self.responses.get(fixture_key(url, urlsplit(graph_url).path))
+        if entry is None:
+            return 404, json.dumps({'error': {'code': 'Request_ResourceNotFound'}}).encode(), {'Content-Type': 'application/json'}
+
+        headers = dict(entry['headers'])
+        etag = headers.get('ETag')
+        if entry['status'] == 200 and etag and request_headers and request_headers.get('If-None-Match') == etag:
+            return 304, b'', {'ETag': etag}
+
+        if 'body_base64' in entry:
+            body = base64.b64decode(entry['body_base64'])
+        else:
+            body = entry['body'].replace(self.graph_url, graph_url).encode()
+        return entry['status'], body, headers
+
+
+class GraphRecorder:
+    """Capture the Graph responses an AzureADIntegration receives into GraphFixtures
+
+    Installed as a response hook on the integration's session while used as a
+    context manager. Token requests, throttled and failed responses are not
+    recorded, and $batch responses are stored per sub-request so they can be
+    replayed either batched or singly.
+    """
+
+    def __init__(self, azure_ad, fixtures=None):
+        self.azure_ad = azure_ad
+        self.fixtures = fixtures or GraphFixtures(azure_ad.graph_url)
+
+    def __enter__(self):
+        self.azure_ad.session.hooks['response'].append(self.record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.azure_ad.session.hooks['response'].remove(self.record)
+
+    def record(self, response, *args, **kwargs):
+        request = response.request
+        if not request.url.startswith(self.azure_ad.graph_url) or response.status_code in RETRY_STATUS_CODES:
+            return
+
+        if urlsplit(request.url).path.endswith('/$batch'):
+            if response.status_code != 200:
+                return
+            sub_urls = {sub_request['id']: sub_request['url'] for sub_request in json.loads(request.body)['requests']}
+            for sub_response in response.json().get('responses', []):
+                if sub_response['id'] in sub_urls and sub_response['status'] not in RETRY_STATUS_CODES:
+                    self.fixtures.add(sub_urls[sub_response['id']], sub_response['status'],
+                                      sub_response.get('headers', {}), json.dumps(sub_response.get('body', {})).encode())
+            return
+
+        if request.method == 'GET':
+            self.fixtures.add(request.url, response.status_code, response.headers, response.content)
+
+
+class GraphStubHandler(BaseHTTPRequestHandler):
+    """Serves the subset of Graph endpoints that AzureADIntegration uses"""
+
+    protocol_version = 'HTTP/1.1'
+    collection_page_limit = 999
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def tenant(self):
+        return self.server.tenant
+
+    def send_json(self, status, body=None, headers=None):
+        payload = json.dumps(body if body is not None else {}).encode()
+        self.send_body(status, payload, {'Content-Type': 'application/json', **(headers or {})})
+
+    def send_body(self, status, payload, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def simulate_network(self):
+        """Apply the configured latency, then return True if this request was answered with a 429"""
+        self.server.count_request()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.should_throttle():
+            self.send_json(429, {'error': {'code': 'TooManyRequests'}}, {'Retry-After': str(self.server.retry_after)})
+            return True
+        return False
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length)
+
+    def do_POST(self):
+        body = self.read_body()
+        path = urlsplit(self.path).path
+
+        if path.endswith('/oauth2/v2.0/token'):
+            self.server.count_request()
+            return self.send_json(200, {'access_token': 'stub-token', 'token_type': 'Bearer', 'expires_in': 3600})
+
+        if self.simulate_network():
+            return
+
+        if path.endswith('/$batch'):
+            responses = []
+            for sub_request in json.loads(body).get('requests', []):
+                if self.server.should_throttle():
+                    # Graph throttles sub-requests individually inside a successful batch
+                    responses.append({'id': sub_request['id'], 'status': 429,
+                                      'headers': {'Retry-After': str(self.server.retry_after)},
+                                      'body': {'error': {'code': 'TooManyRequests'}}})
+                    continue
+                status, sub_body, headers = self.resolve(sub_request['url'])
+                responses.append({'id': sub_request['id'], 'status': status, 'headers': headers,
+                                  'body': json.loads(sub_body) if sub_body else {}})
+            return self.send_json(200, {'responses': responses})
+
+        self.send_json(404, {'error': {'code': 'NotFound'}})
+
+    def do_GET(self):
+        if self.simulate_network():
+            return
+        status, body, headers = self.resolve(self.path, self.headers)
+        self.send_body(status, body, headers)
+
+    def resolve(self, url, request_headers=None):
+        """Return (status, body bytes, headers) for a Graph GET request path relative to the API root"""
+        if self.server.fixtures:
+            return self.server.fixtures.response(url, self.server.graph_url, request_headers)
+
+        status, body = self.resolve_synthetic(url)
+        if isinstance(body, str):
+            return status, body.encode(), {'Content-Type': 'text/plain'}
+        return status, json.dumps(body).encode(), {'Content-Type': 'application/json'}
+
+    def resolve_synthetic(self, url):
+        """Return (status, body) for a request against the synthetic tenant"""
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        segments = [segment for segment in parts.path.split('/') if segment and segment != 'v1.0']
+
+        if segments == ['users', '$count']:
+            return 200, str(self.tenant.user_count)
+        if segments == ['users']:
+            return 200, self.collection_page('users', self.tenant.user_count, self.tenant.user, query)
+        if segments == ['devices']:
+            return 200, self.collection_page('devices', self.tenant.device_count, self.tenant.device, query)
+        if segments[:2] == ['directory', 'deletedItems']:
+            return 200, {'value': []}
+
+        if len(segments) >= 3 and segments[0] == 'users':
+            user_index = self.tenant.user_index(segments[1])
+            if user_index is None:
+                return 404, {'error': {'code': 'Request_ResourceNotFound'}}
+            if segments[2] == 'registeredDevices':
+                return 200, {'value': self.tenant.user_devices(user_index)}
+            if segments[2] == 'photo':
+                return 404, {'error': {'code': 'ImageNotFound'}}
+
+        return 404, {'error': {'code': 'NotFound'}}
+
+    def collection_page(self, resource, total, build_item, query):
+        """Build one $top/$skiptoken page of a collection with an @odata.nextLink when more remain"""
+        top = min(int(query.get('$top', ['100'])[0]), self.collection_page_limit)
+        skip = int(query.get('$skiptoken', ['0'])[0])
+        end = min(skip + top, total)
+
+        page = {'value': [build_item(i) for i in range(skip, end)]}
+        if end < total:
+            page['@odata.nextLink'] = f'{self.server.graph_url}/{resource}?$top={top}&$skiptoken={end}'
+        return page
+
+
+class GraphStubHTTPServer(ThreadingHTTPServer):
+    """HTTP server holding the stub's tenant or fixtures, simulated network conditions and request counters"""
+
+    daemon_threads = True
+
+    def __init__(self, address, tenant=None, fixtures=None, latency=0, throttle_rate=0, retry_after=0, seed=None):
+        super().__init__(address, GraphStubHandler)
+        self.tenant = tenant
+        self.fixtures = fixtures
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.throttled_count = 0
+        self.graph_url = f'http://{address[0]}:{self.server_address[1]}/v1.0'
+
+    def count_request(self):
+        with self.lock:
+            self.request_count += 1
+
+    def should_throttle(self):
+        with self.lock:
+            throttled = self.throttle_rate > 0 and self.random.random() < self.throttle_rate
+            if throttled:
+                self.throttled_count += 1
+            return throttled
+
+
+class GraphStubServer:
+    """Run a GraphStubHandler on a background thread, usable as a context manager
+
+    Serves the synthetic tenant unless fixtures recorded by GraphRecorder are
+    given. latency (seconds) is added to every Graph request, and throttle_rate
+    is the fraction of requests and $batch sub-requests answered with a 429
+    asking the client to retry after retry_after seconds.
+    """
+
+    def __init__(self, user_count=0, devices_per_user=1, host='127.0.0.1', port=0,
+                 fixtures=None, latency=0, throttle_rate=0, retry_after=0, seed=None):
+        self.httpd = GraphStubHTTPServer(
+            (host, port), tenant=SyntheticTenant(user_count, devices_per_user), fixtures=fixtures,
+            latency=latency, throttle_rate=throttle_rate, retry_after=retry_after, seed=seed,
+        )
+        self.thread = None
+
+    @property
+    def tenant(self):
+        return self.httpd.tenant
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    @property
+    def throttled_count(self):
+        return self.httpd.throttled_count
+
+    @property
+    def graph_url(self):
+        return self.httpd.graph_url
+
+    @property
+    def login_url(self):
+        return f'http://{self.httpd.server_address[0]}:{self.httpd.server_address[1]}'
+
+    def connect(self, azure_ad):
+        """Point an AzureADIntegration at this stub with placeholder credentials"""
+        azure_ad.graph_url = self.graph_url
+        azure_ad.login_url = self.login_url
+        azure_ad.tenant_id = 'stub-tenant'
+        azure_ad.client_id = 'stub-client'
+        azure_ad.client_secret = 'stub-secret'
+        return azure_ad
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,197 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from assets.asset_stats import invalidate_asset_stats
+from assets.azure_ad_integration import AzureADIntegration, GRAPH_PAGE_SIZE
+from assets.dashboard_counters import refresh_dashboard_counters
+from assets.models import Asset, Employee
+from contextlib import contextmanager
+import time
+
+
+class QueryCounter:
+    """Database execute wrapper that counts the queries issued while it is installed"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def restoring_caches():
+    """Recount the dashboard counters and expire the asset statistics on the way out
+
+    Cache writes are not rolled back with the database, so benchmarks enter this
+    outside their rolled back atomic block to clear what the synthetic rows left
+    in the shared cache.
+    """
+    try:
+        yield
+    finally:
+        invalidate_asset_stats()
+        refresh_dashboard_counters()
+
+
+class StubAzureADIntegration(AzureADIntegration):
+    """AzureADIntegration that serves a synthetic tenant from memory instead of Microsoft Graph"""
+
+    def __init__(self, user_count, devices_per_user):
+        super().__init__()
+        self.use_batch = False
+        self.users = []
+        self.user_devices = {}
+
+        for i in range(user_count):
+            user_id = f'benchmark-user-{i}'
+            self.users.append({
+                'id': user_id,
+                'displayName': f'Benchmark User {i}',
+                'mail': f'benchmark.user{i}@example.com',
+                'userPrincipalName': f'benchmark.user{i}@example.com',
+                'department': 'IT',
+                'jobTitle': 'Engineer',
+                'employeeId': str(i),
+            })
+            self.user_devices[user_id] = [
+                {
+                    'id': f'benchmark-device-{i}-{j}',
+                    'displayName': f'BENCH-{i}-{j}',
+                    'deviceId': f'BENCH-SERIAL-{i}-{j}',
+                    'manufacturer': 'Dell',
+                    'model': 'Latitude 5520',
+                    'operatingSystem': 'Windows',
+                    'operatingSystemVersion': '10.0.19045',
+                }
+                for j in range(devices_per_user)
+            ]
+
+        self.devices = [device for devices in self.user_devices.values() for device in devices]
+
+    def get_access_token(self):
+        return 'benchmark-token'
+
+    def iter_user_pages(self, include_disabled=False, start_url=None):
+        return self.paginate(self.users)
+
+    def iter_deleted_user_pages(self):
+        return self.paginate([])
+
+    def iter_device_pages(self, start_url=None):
+        return self.paginate(self.devices)
+
+    def paginate(self, items):
+        """Yield items in Graph-sized pages"""
+        for start in range(0, len(items), GRAPH_PAGE_SIZE):
+            yield items[start:start + GRAPH_PAGE_SIZE]
+
+    def get_user_devices(self, user_id):
+        return self.user_devices.get(user_id, [])
+
+    def get_user_photo_url(self, user_id):
+        return None
+
+
+class PerRowReconciler:
+    """Stand-in for SyncReconciler that writes the way the sync did before it: a lookup and a save() per object"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def find(self, **lookups):
+        for field, value in lookups.items():
+            if value:
+                obj = self.model.objects.filter(**{field: value}).first()
+                if obj:
+                    return obj
+        return None
+
+    def create(self, data):
+        return self.model.objects.create(**data)
+
+    def update(self, obj, data):
+        for field, value in data.items():
+            if value:
+                setattr(obj, field, value)
+        obj.save()
+        return obj
+
+    def save(self, batch_size):
+        """Every change was saved as it was made"""
+
+
+class PerRowStubAzureADIntegration(StubAzureADIntegration):
+    """The synthetic tenant synced with per-row saves, the baseline the bulk reconciliation is compared to"""
+
+    def employee_reconciler(self, now):
+        return PerRowReconciler(Employee)
+
+    def asset_reconciler(self, now):
+        return PerRowReconciler(Asset)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the Azure AD sync database pipeline against a synthetic in-memory tenant (changes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10000,
+            help='Number of synthetic Azure AD users (default: 10000)',
+        )
+        parser.add_argument(
+            '--devices-per-user',
+            type=int,
+            default=1,
+            help='Number of registered devices per synthetic user (default: 1)',
+        )
+        parser.add_argument(
+            '--per-row',
+            action='store_true',
+            help='Also run the sync with per-row lookups and saves, as it worked before bulk reconciliation, for comparison',
+        )
+
+    def handle(self, *args, **options):
+        modes = [('Bulk reconciliation', StubAzureADIntegration)]
+        if options['per_row']:
+            modes.append(('Per-row saves', PerRowStubAzureADIntegration))
+
+        for mode, integration_class in modes:
+            azure_ad = integration_class(options['users'], options['devices_per_user'])
+            self.stdout.write(
+                f'{mode}: benchmarking sync of {len(azure_ad.users)} users and {len(azure_ad.devices)} devices...'
+            )
+
+            # Each mode starts from the same database, so their numbers compare
+            total_queries = 0
+            total_elapsed = 0
+            with restoring_caches(), transaction.atomic():
+                # The first pass creates every employee and asset, the second updates them all
+                for phase in ['Initial sync', 'Repeat sync']:
+                    for label, sync_method in [
+                        ('employees with devices', azure_ad.sync_employees_with_devices),
+                        ('standalone devices', azure_ad.sync_devices),
+                    ]:
+                        queries, elapsed = self.run_phase(f'{phase} - {label}', sync_method)
+                        total_queries += queries
+                        total_elapsed += elapsed
+
+                # Never leave synthetic data behind
+                transaction.set_rollback(True)
+
+            self.stdout.write(f'  = {mode}: {total_queries} queries in {total_elapsed:.2f}s')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed, all changes were rolled back.'))
+
+    def run_phase(self, label, sync_method):
+        """Run one sync phase, report its query count and wall time, and return them"""
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            started = time.monotonic()
+            sync_method()
+            elapsed = time.monotonic() - started
+
+        self.stdout.write(f'  - {label}: {queries.count} queries in {elapsed:.2f}s')
+        return queries.count, elapsed
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from assets.azure_ad_integration import AzureADIntegration
+from assets.graph_stub import GraphStubServer
+import time
+import tracemalloc
+
+
+class Command(BaseCommand):
+    help = 'Compare memory and latency of list-based and streaming Graph user pagination against a local stub tenant'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=50000,
+            help='Number of synthetic Azure AD users served by the stub (default: 50000)',
+        )
+
+    def handle(self, *args, **options):
+        with GraphStubServer(options['users']) as stub:
+            azure_ad = stub.connect(AzureADIntegration())
+
+            # Warm up the token and connection pool so neither mode pays for them
+            azure_ad.get_access_token()
+
+            self.stdout.write(f'Benchmarking Graph pagination over {options["users"]} stub users...')
+            self.run_mode('List (get_users)', lambda: self.consume_list(azure_ad))
+            self.run_mode('Streaming (iter_user_pages)', lambda: self.consume_stream(azure_ad))
+
+    def consume_list(self, azure_ad):
+        """Load every user into one list, then walk it"""
+        started = time.monotonic()
+        users = azure_ad.get_users()
+        first_user_at = time.monotonic() - started
+        return len(users), first_user_at
+
+    def consume_stream(self, azure_ad):
+        """Walk users page by page as they arrive"""
+        started = time.monotonic()
+        first_user_at = None
+        count = 0
+        for page in azure_ad.iter_user_pages():
+            if first_user_at is None:
+                first_user_at = time.monotonic() - started
+            count += len(page)
+        return count, first_user_at
+
+    def run_mode(self, label, consume):
+        """Run one pagination mode under tracemalloc and report its peak memory and timings"""
+        tracemalloc.start()
+        started = time.monotonic()
+        count, first_user_at = consume()
+        elapsed = time.monotonic() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f'  - {label}: {count} users in {elapsed:.2f}s, first user after {first_user_at:.2f}s, '
+            f'peak Python memory {peak / (1024 * 1024):.1f} MiB'
+        )
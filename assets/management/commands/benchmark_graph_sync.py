@@ -0,0 +1,137 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from assets.azure_ad_integration import AzureADIntegration
+from assets.graph_stub import GraphFixtures, GraphStubServer
+from assets.management.commands.benchmark_azure_sync import QueryCounter, restoring_caches
+import os
+import resource
+import threading
+import time
+
+
+class PeakRSSSampler:
+    """Sample the process resident set size on a background thread and keep the peak"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def rss(self):
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except OSError:
+            # No /proc (e.g. macOS), fall back to the peak of the whole process so far
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, self.rss())
+            self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.rss()
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, self.rss())
+
+
+class Command(BaseCommand):
+    help = ('Benchmark full_sync end to end against a local Graph stub serving synthetic tenants or recorded '
+            'fixtures, reporting HTTP calls, DB queries, peak RSS and wall time (changes are rolled back)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 50000],
+            help='Synthetic tenant sizes to benchmark (default: 1000 10000 50000)',
+        )
+        parser.add_argument(
+            '--devices-per-user',
+            type=int,
+            default=1,
+            help='Number of registered devices per synthetic user (default: 1)',
+        )
+        parser.add_argument(
+            '--fixtures',
+            help='Replay a fixture file written by record_graph_fixtures instead of synthetic tenants',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0,
+            help='Milliseconds of latency added to every Graph request (default: 0)',
+        )
+        parser.add_argument(
+            '--throttle-rate',
+            type=float,
+            default=0,
+            help='Fraction of Graph requests and $batch sub-requests answered with 429 (default: 0)',
+        )
+        parser.add_argument(
+            '--retry-after',
+            type=int,
+            default=0,
+            help='Retry-After seconds sent with injected 429 responses (default: 0)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for 429 injection, so runs are repeatable (default: 0)',
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options['throttle_rate'] < 1:
+            raise CommandError('--throttle-rate must be at least 0 and below 1.')
+
+        if options['fixtures']:
+            fixtures = GraphFixtures.load(options['fixtures'])
+            self.stdout.write(f'Replaying {len(fixtures.responses)} recorded Graph responses from {options["fixtures"]}...')
+            self.run_benchmark('Recorded tenant', options, fixtures=fixtures)
+        else:
+            for user_count in options['users']:
+                self.stdout.write(f'Benchmarking full sync of {user_count} synthetic users...')
+                self.run_benchmark(f'{user_count} users', options, user_count=user_count)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed, all changes were rolled back.'))
+
+    def run_benchmark(self, label, options, user_count=0, fixtures=None):
+        """Run one full sync against a fresh stub and report what it cost"""
+        stub = GraphStubServer(
+            user_count, options['devices_per_user'], fixtures=fixtures, latency=options['latency'] / 1000,
+            throttle_rate=options['throttle_rate'], retry_after=options['retry_after'], seed=options['seed'],
+        )
+        with stub:
+            azure_ad = stub.connect(AzureADIntegration())
+            # Fetch the token up front so it is not counted against the sync
+            azure_ad.get_access_token()
+            requests_before = stub.request_count
+
+            queries = QueryCounter()
+            with restoring_caches(), transaction.atomic(), connection.execute_wrapper(queries), PeakRSSSampler() as rss:
+                started = time.monotonic()
+                try:
+                    results = azure_ad.full_sync(resume=False)
+                finally:
+                    elapsed = time.monotonic() - started
+                    # Never leave synthetic data behind
+                    transaction.set_rollback(True)
+
+        self.stdout.write(
+            f'  - {label}: {stub.request_count - requests_before} HTTP calls ({stub.throttled_count} throttled), '
+            f'{queries.count} queries, peak RSS {rss.peak / (1024 * 1024):.1f} MiB, {elapsed:.2f}s'
+        )
+        self.stdout.write(
+            f'    {results.get("employees_synced", 0)} employees and '
+            f'{results.get("user_devices_synced", 0) + results.get("standalone_devices_synced", 0)} devices synced, '
+            f'phases: ' + ', '.join(f'{phase} {seconds:.2f}s' for phase, seconds in results['phase_timings'])
+        )
@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from assets.models import Asset
+from assets.views import calculate_health_score
+from assets.management.commands.benchmark_azure_sync import QueryCounter, restoring_caches
+from datetime import date, datetime, time as datetime_time, timedelta, timezone as dt_timezone
+import random
+import time
+
+
+class Command(BaseCommand):
+    help = ('Compare scoring a page of assets with the Python calculate_health_score loop and with the SQL '
+            'health score annotation over synthetic assets (changes are rolled back)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assets',
+            type=int,
+            default=100000,
+            help='Number of synthetic assets to create (default: 100000)',
+        )
+        parser.add_argument(
+            '--page',
+            type=int,
+            default=1,
+            help='Page of 10 assets to render (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        with restoring_caches(), transaction.atomic():
+            self.stdout.write(f'Creating {options["assets"]} synthetic assets...')
+            Asset.objects.bulk_create(self.build_assets(options['assets']), batch_size=1000)
+            # Each measurement gets a fresh queryset so none reuses another's result cache
+            assets = Asset.objects.filter(serial_number__startswith='BENCH-HS-').select_related('assigned_to')
+
+            self.stdout.write('Scoring one page of assets...')
+            python_scores = self.run_mode('Python loop', lambda: self.score_in_python(assets, options['page']))
+            sql_scores = self.run_mode('SQL annotation', lambda: self.score_in_sql(assets, options['page']))
+            if python_scores != sql_scores:
+                self.stdout.write(self.style.ERROR('  The two approaches scored the page differently!'))
+
+            self.stdout.write('Counting healthy (80%+) assets...')
+            python_healthy = self.run_mode(
+                'Python loop', lambda: sum(1 for asset in assets.all() if calculate_health_score(asset) >= 80)
+            )
+            sql_healthy = self.run_mode(
+                'SQL annotation', lambda: assets.with_health_score().filter(current_health_score__gte=80).count()
+            )
+            if python_healthy != sql_healthy:
+                self.stdout.write(self.style.ERROR('  The two approaches counted different healthy assets!'))
+
+            # Never leave synthetic data behind
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed, all changes were rolled back.'))
+
+    def build_assets(self, count):
+        """Synthetic assets spread over every health band and reference date source"""
+        rng = random.Random(0)
+        today = date.today()
+
+        def random_datetime():
+            day = today - timedelta(days=rng.randint(0, 2500))
+            return datetime.combine(day, datetime_time(rng.randint(0, 23)), dt_timezone.utc)
+
+        for i in range(count):
+            is_azure = rng.random() < 0.5
+            yield Asset(
+                name=f'Benchmark Asset {i}',
+                asset_type='laptop',
+                serial_number=f'BENCH-HS-{i}',
+                azure_ad_id=f'benchmark-health-{i}' if is_azure else None,
+                last_azure_sync=random_datetime() if is_azure and rng.random() < 0.8 else None,
+                azure_last_signin=random_datetime() if is_azure and rng.random() < 0.5 else None,
+                purchase_date=today - timedelta(days=rng.randint(0, 2500)) if rng.random() < 0.7 else None,
+            )
+
+    def score_in_python(self, assets, page_number):
+        """What the list views used to do: load and score every asset, then paginate them"""
+        assets = assets.all()
+        for asset in assets:
+            asset.health_score = calculate_health_score(asset)
+        page = Paginator(assets, 10).get_page(page_number)
+        return [(asset.pk, asset.health_score) for asset in page]
+
+    def score_in_sql(self, assets, page_number):
+        page = Paginator(assets.with_health_score(), 10).get_page(page_number)
+        return [(asset.pk, asset.health_score) for asset in page]
+
+    def run_mode(self, label, measure):
+        """Run one approach and report its query count and wall time"""
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            started = time.monotonic()
+            result = measure()
+            elapsed = time.monotonic() - started
+
+        self.stdout.write(f'  - {label}: {queries.count} queries in {elapsed:.3f}s')
+        return result
@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from assets.models import Asset
+from assets.search import search, search_filter
+from assets.management.commands.benchmark_azure_sync import QueryCounter, restoring_caches
+import random
+import time
+
+MANUFACTURERS = {
+    'Dell': ['Latitude 7420', 'Latitude 5540', 'OptiPlex 7090', 'XPS 13'],
+    'Lenovo': ['ThinkPad T14', 'ThinkPad X1 Carbon', 'ThinkCentre M90'],
+    'Apple': ['MacBook Pro 14', 'MacBook Air M2', 'iPhone 15', 'iPad Air'],
+    'HP': ['EliteBook 840', 'ProBook 450', 'EliteDesk 800'],
+    'Samsung': ['Galaxy S23', 'Galaxy Tab S9', 'Odyssey G7'],
+}
+
+
+class Command(BaseCommand):
+    help = ('Compare asset searches through the icontains predicates the views used to build with the '
+            'full-text search index over synthetic assets (changes are rolled back)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assets',
+            type=int,
+            default=200000,
+            help='Number of synthetic assets to create (default: 200000)',
+        )
+        parser.add_argument(
+            '--queries',
+            nargs='+',
+            default=['latitude', 'thinkpad x1', 'BENCH-SR-01234', 'galaxy tab', 'macbook pro 14', 'nothingmatches'],
+            help='Search texts to benchmark',
+        )
+
+    def handle(self, *args, **options):
+        with restoring_caches(), transaction.atomic():
+            self.stdout.write(f'Creating {options["assets"]} synthetic assets (the search triggers index them)...')
+            started = time.monotonic()
+            Asset.objects.bulk_create(self.build_assets(options['assets']), batch_size=1000)
+            self.stdout.write(f'  - created and indexed in {time.monotonic() - started:.2f}s')
+
+            assets = Asset.objects.select_related('assigned_to')
+            for text in options['queries']:
+                self.stdout.write(f'Searching for "{text}" (count and first page of 10)...')
+                self.run_mode('icontains', lambda: self.list_page(assets.filter(self.icontains_filter(text)).distinct()))
+                self.run_mode('Search index', lambda: self.list_page(assets.filter(search_filter(Asset, text))))
+                self.run_mode('Ranked top 20', lambda: (None, [asset.pk for asset in search(assets, text, limit=20)]))
+
+            # Never leave synthetic data behind
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed, all changes were rolled back.'))
+
+    def build_assets(self, count):
+        rng = random.Random(0)
+        manufacturers = list(MANUFACTURERS)
+        for i in range(count):
+            manufacturer = rng.choice(manufacturers)
+            model = rng.choice(MANUFACTURERS[manufacturer])
+            yield Asset(
+                name=f'{manufacturer} {model} #{i}',
+                asset_type='laptop',
+                serial_number=f'BENCH-SR-{i:05d}',
+                model=model,
+                manufacturer=manufacturer,
+            )
+
+    def icontains_filter(self, text):
+        """The predicates the asset views built before the search index"""
+        return (
+            Q(name__icontains=text) |
+            Q(serial_number__icontains=text) |
+            Q(model__icontains=text) |
+            Q(manufacturer__icontains=text) |
+            Q(assigned_to__name__icontains=text)
+        )
+
+    def list_page(self, assets):
+        return assets.count(), [asset.pk for asset in assets.order_by('name', 'id')[:10]]
+
+    def run_mode(self, label, measure):
+        """Run one approach and report its query count, wall time and matches"""
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            started = time.monotonic()
+            count, page = measure()
+            elapsed = time.monotonic() - started
+
+        matches = f'{count} matches' if count is not None else f'{len(page)} results'
+        self.stdout.write(f'  - {label}: {matches}, {queries.count} queries in {elapsed:.3f}s')
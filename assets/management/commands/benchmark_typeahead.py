@@ -0,0 +1,114 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from assets.models import Asset, Employee, Handover
+from assets.views import typeahead_api
+from assets.management.commands.benchmark_azure_sync import QueryCounter, restoring_caches
+from assets.management.commands.benchmark_search import MANUFACTURERS, Command as SearchBenchmark
+import random
+import time
+
+FIRST_NAMES = ['Alice', 'Bob', 'Carla', 'Dmitri', 'Erin', 'Farah', 'Gustav', 'Hana', 'Ivan', 'Jonas']
+LAST_NAMES = ['Andersen', 'Brown', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Huang', 'Ito', 'Jensen']
+
+
+class Command(BaseCommand):
+    help = ('Measure /api/typeahead/ latency percentiles over synthetic assets, employees and handovers '
+            'with a mix of serial, name, email and handover ID prefixes (changes are rolled back)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assets',
+            type=int,
+            default=100000,
+            help='Number of synthetic assets to create (default: 100000)',
+        )
+        parser.add_argument(
+            '--employees',
+            type=int,
+            default=5000,
+            help='Number of synthetic employees to create (default: 5000)',
+        )
+        parser.add_argument(
+            '--handovers',
+            type=int,
+            default=20000,
+            help='Number of synthetic handovers to create (default: 20000)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Number of typeahead requests to time (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.first()
+        if not user:
+            raise CommandError('Create a user first, handovers need a creator.')
+
+        with restoring_caches(), transaction.atomic():
+            self.stdout.write(
+                f'Creating {options["assets"]} assets, {options["employees"]} employees and '
+                f'{options["handovers"]} handovers...'
+            )
+            Asset.objects.bulk_create(SearchBenchmark().build_assets(options['assets']), batch_size=1000)
+            employees = Employee.objects.bulk_create(self.build_employees(options['employees']), batch_size=1000)
+            Handover.objects.bulk_create(self.build_handovers(options['handovers'], employees, user), batch_size=1000)
+
+            factory = RequestFactory()
+            rng = random.Random(0)
+            timings = []
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                for _ in range(options['requests']):
+                    request = factory.get('/api/typeahead/', {'q': self.random_query(rng, options)})
+                    request.user = user
+                    started = time.monotonic()
+                    typeahead_api(request)
+                    timings.append(time.monotonic() - started)
+
+            # Never leave synthetic data behind
+            transaction.set_rollback(True)
+
+        timings.sort()
+        percentile = lambda p: timings[min(int(len(timings) * p), len(timings) - 1)] * 1000
+        self.stdout.write(
+            f'  - {len(timings)} requests, {queries.count / len(timings):.1f} queries each: '
+            f'p50 {percentile(0.5):.1f}ms, p95 {percentile(0.95):.1f}ms, p99 {percentile(0.99):.1f}ms, '
+            f'max {timings[-1] * 1000:.1f}ms'
+        )
+        self.stdout.write(self.style.SUCCESS('Benchmark completed, all changes were rolled back.'))
+
+    def build_employees(self, count):
+        for i in range(count):
+            first, last = FIRST_NAMES[i % len(FIRST_NAMES)], LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+            yield Employee(
+                name=f'{first} {last} {i}',
+                email=f'{first.lower()}.{last.lower()}.{i}@bench.example.com',
+                department='IT',
+            )
+
+    def build_handovers(self, count, employees, user):
+        for i in range(count):
+            yield Handover(handover_id=f'HOV-BENCH-{i:05d}', employee=employees[i % len(employees)], created_by=user)
+
+    def random_query(self, rng, options):
+        """A prefix as someone might type it, or a full serial as a barcode scan sends it"""
+        kind = rng.choice(['serial', 'barcode', 'model', 'employee', 'email', 'handover'])
+        if kind == 'serial':
+            return f'BENCH-SR-{rng.randrange(options["assets"]):05d}'[:rng.randint(11, 14)]
+        if kind == 'barcode':
+            return f'BENCH-SR-{rng.randrange(options["assets"]):05d}'
+        if kind == 'model':
+            manufacturer = rng.choice(list(MANUFACTURERS))
+            words = f'{manufacturer} {rng.choice(MANUFACTURERS[manufacturer])}'.split()
+            text = ' '.join(words[:rng.randint(1, len(words))])
+            return text[:rng.randint(2, len(text))]
+        if kind == 'employee':
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            return name[:rng.randint(2, len(name))]
+        if kind == 'email':
+            return f'{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}'[:rng.randint(3, 12)]
+        return f'HOV-BENCH-{rng.randrange(options["handovers"]):05d}'[:rng.randint(6, 15)]
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from assets.search import rebuild_search_indexes
+import time
+
+
+class Command(BaseCommand):
+    help = ('Rebuild the asset, employee and handover search documents and their triggers from scratch, '
+            'e.g. after restoring tables or changing data with the triggers disabled')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database to rebuild the search index of (default: "default")',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        rebuild_search_indexes(options['database'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the search index in {time.monotonic() - started:.2f}s'))
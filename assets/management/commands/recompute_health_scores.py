@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+from assets.asset_stats import invalidate_asset_stats
+from assets.models import Asset, AzureSyncState, HEALTH_SCORES_DATE_KEY
+from datetime import date
+import time
+
+
+class Command(BaseCommand):
+    help = ('Store current asset health scores. Run daily: only assets whose age may have crossed a health band '
+            'since the previous run are checked, and only changed scores are written.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Check every asset instead of only those that may have changed band since the last run',
+        )
+
+    def handle(self, *args, **options):
+        today = date.today()
+        last_run = parse_date(AzureSyncState.get_value(HEALTH_SCORES_DATE_KEY) or '')
+
+        if options['full'] or last_run is None or last_run > today:
+            self.stdout.write('Checking the health score of every asset...')
+            assets = Asset.objects.all()
+        else:
+            self.stdout.write(f'Checking assets that may have changed health band since {last_run}...')
+            assets = Asset.objects.crossing_health_bands(last_run, today)
+
+        started = time.monotonic()
+        updated = assets.refresh_health_scores(today)
+        AzureSyncState.set_value(HEALTH_SCORES_DATE_KEY, today.isoformat())
+        if updated:
+            # The UPDATE sends no signals, expire the statistics in the shared cache the web workers read
+            invalidate_asset_stats()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Updated {updated} health scores in {time.monotonic() - started:.2f}s')
+        )
@@ -0,0 +1,25 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from assets.dashboard_counters import DASHBOARD_COUNTERS, refresh_dashboard_counters, snapshot_counters
+
+
+class Command(BaseCommand):
+    help = ('Recount the cached dashboard counters, correcting any drift from writes that bypass the model '
+            'signals, and store them as today\'s snapshot for the dashboard trends. Run every few minutes.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        cached = cache.get_many([counter.cache_key(now) for counter in DASHBOARD_COUNTERS])
+
+        values = refresh_dashboard_counters(now=now)
+        snapshot_counters(values, now)
+
+        for counter in DASHBOARD_COUNTERS:
+            previous = cached.get(counter.cache_key(now))
+            if previous is not None and previous != values[counter.name]:
+                self.stdout.write(f'  - {counter.name}: corrected {previous} to {values[counter.name]}')
+
+        self.stdout.write(self.style.SUCCESS(
+            'Reconciled dashboard counters: ' + ', '.join(f'{name} {value}' for name, value in values.items())
+        ))
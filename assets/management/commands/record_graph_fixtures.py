@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from assets.azure_ad_integration import AzureADIntegration
+from assets.graph_stub import GraphRecorder
+
+
+class Command(BaseCommand):
+    help = ('Record the Graph responses a full Azure AD sync reads (users, deleted users, devices, '
+            'registered devices and photos) to a fixture file for benchmark_graph_sync --fixtures. '
+            'Fixtures contain real directory data, keep them out of version control.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            help='Path of the JSON fixture file to write',
+        )
+        parser.add_argument(
+            '--max-pages',
+            type=int,
+            help='Only record the first N pages of each collection (default: all pages)',
+        )
+        parser.add_argument(
+            '--photos',
+            action='store_true',
+            help='Also record the photo of every recorded user',
+        )
+
+    def handle(self, *args, **options):
+        azure_ad = AzureADIntegration()
+
+        if not azure_ad.get_access_token():
+            raise CommandError('Azure AD not configured. Please check your settings.')
+
+        with GraphRecorder(azure_ad) as recorder:
+            truncated_links = []
+
+            users = self.record_collection('users', azure_ad.iter_user_pages(), options['max_pages'], truncated_links,
+                                           lambda page: azure_ad.fetch_user_details(page))
+            self.record_collection('deleted users', azure_ad.iter_deleted_user_pages(), options['max_pages'], truncated_links)
+            self.record_collection('devices', azure_ad.iter_device_pages(), options['max_pages'], truncated_links)
+
+            if options['photos']:
+                self.stdout.write(f'Recording photos for {len(users)} users...')
+                for user in users:
+                    azure_ad.get_user_photo(user['id'])
+
+        # Pages fetched ahead of a --max-pages cut-off are dropped so the recording ends cleanly
+        for next_link in truncated_links:
+            recorder.fixtures.truncate(next_link)
+
+        recorder.fixtures.save(options['output'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Recorded {len(recorder.fixtures.responses)} Graph responses to {options["output"]}')
+        )
+
+    def record_collection(self, label, pages, max_pages, truncated_links, on_page=None):
+        """Read a collection page by page, returning its items"""
+        items = []
+        for number, page in enumerate(pages, start=1):
+            items.extend(page)
+            if on_page:
+                on_page(page)
+            if max_pages and number >= max_pages:
+                if page.next_link:
+                    truncated_links.append(page.next_link)
+                break
+
+        self.stdout.write(f'  - {label}: {len(items)} recorded')
+        return items
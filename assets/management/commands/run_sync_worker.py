@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from assets.sync_jobs import claim_next_job, run_job
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Run queued Azure AD sync jobs (requested from the Azure AD sync page) outside the web server'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run at most one queued job and exit, for use from cron',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between checks for new jobs (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Azure AD sync worker started, waiting for jobs...'))
+        
+        while True:
+            job = claim_next_job()
+            
+            if job:
+                self.stdout.write(f'Running sync job #{job.id}...')
+                job = run_job(job)
+                if job.status == 'completed':
+                    self.stdout.write(self.style.SUCCESS(f'Sync job #{job.id} completed'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'Sync job #{job.id} failed: {job.error}'))
+            
+            if options['once']:
+                break
+            
+            if not job:
+                time.sleep(options['poll_interval'])
@@ -1,7 +1,8 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
-from assets.azure_ad_integration import AzureADIntegration
+from assets.azure_ad_integration import AzureADIntegration, SyncInProgress
 import logging
+import requests
 
 logger = logging.getLogger(__name__)
 
@@ -29,20 +30,53 @@ class Command(BaseCommand):
             action='store_true',
             help='Show sync summary without performing sync',
         )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='With --summary, recompute the summary instead of showing the snapshot from the last sync',
+        )
         parser.add_argument(
             '--cleanup-only',
             action='store_true',
             help='Only cleanup orphaned assets',
         )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='With --cleanup-only, report how many assets would be unassigned without changing anything',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only sync users and devices changed since the last run (Graph delta query)',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Start a new full sync instead of resuming an interrupted one',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of concurrent Graph lookups (defaults to AZURE_SYNC_WORKERS)',
+        )
 
     def handle(self, *args, **options):
-        azure_ad = AzureADIntegration()
+        azure_ad = AzureADIntegration(max_workers=options['workers'])
         
         if options['summary']:
-            self.show_sync_summary(azure_ad)
+            self.show_sync_summary(azure_ad, refresh=options['refresh'])
             return
             
         if options['cleanup_only']:
+            if options['dry_run']:
+                self.stdout.write('Checking for orphaned assets (dry run)...')
+                cleanup_count = azure_ad.cleanup_orphaned_assets(dry_run=True)
+                self.stdout.write(
+                    self.style.SUCCESS(f'Dry run completed: {cleanup_count} assets would be unassigned')
+                )
+                return
+            
             self.stdout.write('Cleaning up orphaned assets...')
             cleanup_count = azure_ad.cleanup_orphaned_assets()
             self.stdout.write(
@@ -52,7 +86,33 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS('Starting Azure AD sync with change detection...'))
         
-        if options['employees_only']:
+        if options['incremental']:
+            self.stdout.write('Performing incremental sync...')
+            try:
+                results = azure_ad.incremental_sync()
+            except requests.exceptions.RequestException as e:
+                raise CommandError(f'Incremental sync failed, delta links were left unchanged: {e}')
+            except SyncInProgress as e:
+                raise CommandError(f'{e}, wait for it to finish or for AZURE_SYNC_JOB_TIMEOUT to pass')
+            
+            if results['mode'] == 'incremental':
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Incremental Azure AD sync completed:\n'
+                        f'  - Changes: {results["users_changed"]} users, {results["devices_changed"]} devices\n'
+                        f'  - Employees: {results["employees_synced"]} new, {results["employees_updated"]} updated, {results["employees_disabled"]} disabled, {results["employees_deleted"]} deleted\n'
+                        f'  - User Devices: {results["user_devices_synced"]} synced, {results["user_devices_assigned"]} assigned\n'
+                        f'  - Standalone Devices: {results["standalone_devices_synced"]} synced, {results["standalone_devices_updated"]} updated\n'
+                        f'  - Assets cleaned up: {results["assets_cleaned_up"]}'
+                    )
+                )
+                self.show_fetch_stats(results['fetch_stats'])
+                self.show_request_stats(results['request_stats'])
+            else:
+                self.stdout.write(self.style.WARNING('Delta links were missing or expired, a full resync was performed.'))
+                self.show_full_sync_results(results)
+            
+        elif options['employees_only']:
             self.stdout.write('Syncing employees with change detection and devices...')
             synced, updated, disabled, deleted, devices_synced, devices_assigned = azure_ad.sync_employees_with_devices()
             self.stdout.write(
@@ -66,6 +126,8 @@ class Command(BaseCommand):
                     f'  - Devices assigned: {devices_assigned}'
                 )
             )
+            self.show_fetch_stats(azure_ad.last_fetch_stats)
+            self.show_request_stats(azure_ad.request_stats.summary())
             
         elif options['devices_only']:
             self.stdout.write('Syncing devices only...')
@@ -83,33 +145,78 @@ class Command(BaseCommand):
             
         else:
             self.stdout.write('Performing full sync with change detection...')
-            results = azure_ad.full_sync()
-            
+            try:
+                results = azure_ad.full_sync(resume=not options['restart'])
+            except requests.exceptions.RequestException as e:
+                raise CommandError(f'Full sync failed, run the command again to resume where it stopped: {e}')
+            except SyncInProgress as e:
+                raise CommandError(f'{e}, wait for it to finish or for AZURE_SYNC_JOB_TIMEOUT to pass')
+            self.show_full_sync_results(results)
+    
+    def show_full_sync_results(self, results):
+        """Show the results of a full sync"""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Full Azure AD sync completed:\n'
+                f'  - Employees: {results["employees_synced"]} new, {results["employees_updated"]} updated, {results["employees_disabled"]} disabled, {results["employees_deleted"]} deleted\n'
+                f'  - User Devices: {results["user_devices_synced"]} synced, {results["user_devices_assigned"]} assigned\n'
+                f'  - Standalone Devices: {results["standalone_devices_synced"]} synced, {results["standalone_devices_updated"]} updated\n'
+                f'  - Assignments: {results["assignments_updated"]} updated\n'
+                f'  - Assets cleaned up: {results["assets_cleaned_up"]}'
+            )
+        )
+        self.show_phase_timings(results)
+        self.show_fetch_stats(results['fetch_stats'])
+        self.show_request_stats(results['request_stats'])
+    
+    def show_phase_timings(self, results):
+        """Show how long each full sync phase took"""
+        if not results.get('phase_timings'):
+            return
+        
+        resumed = ' (resumed from an interrupted run)' if results.get('resumed') else ''
+        self.stdout.write(f'  - Phase timings, {results["total_time"]}s total{resumed}:')
+        for label, seconds in results['phase_timings']:
+            self.stdout.write(f'      {label}: {seconds}s')
+    
+    def show_fetch_stats(self, stats):
+        """Show how long the concurrent Graph lookups took"""
+        if not stats:
+            return
+        
+        self.stdout.write(
+            f'  - Graph lookups: {stats["users"]} users in {stats["wall_time"]}s '
+            f'with {stats["workers"]} workers ({stats["speedup"]}x faster than serial, '
+            f'{stats["serial_time"]}s)'
+        )
+    
+    def show_request_stats(self, request_stats):
+        """Show where Graph request time went, per endpoint"""
+        if not request_stats:
+            return
+        
+        self.stdout.write('  - Graph endpoints (total time, calls, avg/max latency, retries, errors):')
+        for stats in request_stats:
             self.stdout.write(
-                self.style.SUCCESS(
-                    f'Full Azure AD sync completed:\n'
-                    f'  - Employees: {results["employees_synced"]} new, {results["employees_updated"]} updated, {results["employees_disabled"]} disabled, {results["employees_deleted"]} deleted\n'
-                    f'  - User Devices: {results["user_devices_synced"]} synced, {results["user_devices_assigned"]} assigned\n'
-                    f'  - Standalone Devices: {results["standalone_devices_synced"]} synced, {results["standalone_devices_updated"]} updated\n'
-                    f'  - Assignments: {results["assignments_updated"]} updated\n'
-                    f'  - Assets cleaned up: {results["assets_cleaned_up"]}'
-                )
+                f'      {stats["endpoint"]}: {stats["total_time"]}s, {stats["calls"]} calls, '
+                f'{stats["avg_ms"]}/{stats["max_ms"]}ms, {stats["retries"]} retries, {stats["errors"]} errors'
             )
     
-    def show_sync_summary(self, azure_ad):
+    def show_sync_summary(self, azure_ad, refresh=False):
         """Show a summary of the current sync status"""
-        summary = azure_ad.get_sync_summary()
+        summary = azure_ad.get_sync_summary(refresh=refresh)
         
         self.stdout.write(
             self.style.SUCCESS(
                 f'Azure AD Sync Summary:\n'
-                f'  - Azure AD Users: {summary["azure_users"]}\n'
+                f'  - Azure AD Users: {summary["azure_users"] if summary["azure_users"] is not None else "unknown until the first sync"}\n'
                 f'  - Local Employees: {summary["local_employees"]}\n'
                 f'  - Azure Synced Employees: {summary["azure_synced_employees"]}\n'
                 f'  - Active Employees: {summary["active_employees"]}\n'
                 f'  - Inactive Employees: {summary["inactive_employees"]}\n'
                 f'  - Deleted Employees: {summary["deleted_employees"]}\n'
-                f'  - Last Sync: {summary["last_sync"]}'
+                f'  - Local Assets: {summary["local_assets"]} ({summary["azure_synced_assets"]} from Azure AD)\n'
+                f'  - Last Computed: {summary["computed_at"]}'
             )
         )
 
@@ -1,96 +1,139 @@
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, time as datetime_time
 from assets.models import Employee
 from assets.azure_ad_integration import AzureADIntegration
+from assets.photo_cache import photo_cache, Image
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 class Command(BaseCommand):
-    help = 'Sync Azure AD profile photos for existing employees'
+    help = 'Prefetch Azure AD profile photos and thumbnails into the employee photo cache'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Force update all employees, even if they already have photos',
+            help='Refetch all photos, even ones the cache considers fresh',
         )
         parser.add_argument(
             '--employee-id',
             type=str,
             help='Sync photos for a specific employee ID',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.AZURE_SYNC_WORKERS,
+            help=f'Number of concurrent photo downloads (default: {settings.AZURE_SYNC_WORKERS})',
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Only employees synced from Azure AD on or after this date or datetime (e.g. 2024-06-01)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
             self.style.SUCCESS('Starting Azure AD photo sync...')
         )
-        
-        azure_ad = AzureADIntegration()
-        
+
+        azure_ad = AzureADIntegration(max_workers=options['workers'])
+
         # Check if Azure AD is configured
         if not azure_ad.get_access_token():
             self.stdout.write(
                 self.style.ERROR('Azure AD not configured. Please check your settings.')
             )
             return
-        
+
+        if Image is None:
+            self.stdout.write(
+                self.style.WARNING('Pillow is not installed, caching full-size photos without thumbnails.')
+            )
+
         # Get employees to sync
+        employees = Employee.objects.filter(azure_ad_id__isnull=False).exclude(azure_ad_id='')
         if options['employee_id']:
-            employees = Employee.objects.filter(id=options['employee_id'])
+            employees = employees.filter(id=options['employee_id'])
             if not employees.exists():
                 self.stdout.write(
                     self.style.ERROR(f'Employee with ID {options["employee_id"]} not found.')
                 )
                 return
-        else:
-            if options['force']:
-                employees = Employee.objects.filter(azure_ad_id__isnull=False)
-            else:
-                # Only sync employees without photos or with placeholder photos
-                employees = Employee.objects.filter(
-                    azure_ad_id__isnull=False
-                ).exclude(
-                    avatar_url__icontains='randomuser.me'
-                )
-        
-        self.stdout.write(f'Found {employees.count()} employees to sync...')
-        
-        synced_count = 0
-        error_count = 0
-        
-        for employee in employees:
-            try:
-                self.stdout.write(f'Processing {employee.name}...')
-                
-                # Get photo URL from Azure AD
-                photo_url = azure_ad.get_user_photo_url(employee.azure_ad_id)
-                
-                if photo_url:
-                    # Update employee with photo URL
-                    employee.avatar_url = photo_url
-                    employee.last_azure_sync = timezone.now()
-                    employee.save()
-                    
-                    self.stdout.write(
-                        self.style.SUCCESS(f'  ✓ Photo synced for {employee.name}')
-                    )
-                    synced_count += 1
-                else:
+        if options['since']:
+            employees = employees.filter(last_azure_sync__gte=self.parse_since(options['since']))
+
+        azure_ids = list(employees.values_list('azure_ad_id', flat=True))
+        if not options['force']:
+            # Skip photos fetched within the cache TTL
+            azure_ids = [azure_id for azure_id in azure_ids if not photo_cache.is_fresh(azure_id)]
+
+        self.stdout.write(f'Found {len(azure_ids)} employees to sync with {options["workers"]} workers...')
+
+        counts = {'downloaded': 0, 'unchanged': 0, 'no_photo': 0, 'errors': 0}
+        downloaded_bytes = 0
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as executor:
+            futures = {executor.submit(self.fetch_photo, azure_ad, azure_id): azure_id for azure_id in azure_ids}
+            for future in as_completed(futures):
+                try:
+                    outcome, size = future.result()
+                except Exception as e:
                     self.stdout.write(
-                        self.style.WARNING(f'  - No photo found for {employee.name}')
+                        self.style.ERROR(f'  ✗ Error syncing photo for {futures[future]}: {str(e)}')
                     )
-                    
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'  ✗ Error syncing {employee.name}: {str(e)}')
-                )
-                error_count += 1
-        
+                    counts['errors'] += 1
+                    continue
+
+                counts[outcome] += 1
+                downloaded_bytes += size
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f'  - {futures[future]}: {outcome.replace("_", " ")}')
+
+        elapsed = time.monotonic() - started
+        processed = len(azure_ids)
+
         self.stdout.write('\n' + '=' * 50)
         self.stdout.write(
             self.style.SUCCESS(f'Azure AD photo sync completed!')
         )
-        self.stdout.write(f'Successfully synced: {synced_count}')
-        self.stdout.write(f'Errors: {error_count}')
-        self.stdout.write(f'Total processed: {employees.count()}')
+        self.stdout.write(f'Downloaded: {counts["downloaded"]}')
+        self.stdout.write(f'Unchanged: {counts["unchanged"]}')
+        self.stdout.write(f'No photo: {counts["no_photo"]}')
+        self.stdout.write(f'Errors: {counts["errors"]}')
+        self.stdout.write(f'Total processed: {processed}')
+        if elapsed > 0:
+            self.stdout.write(
+                f'Throughput: {processed / elapsed:.1f} photos/s, '
+                f'{downloaded_bytes / (1024 * 1024) / elapsed:.2f} MiB/s over {elapsed:.2f}s'
+            )
+
+    def fetch_photo(self, azure_ad, azure_id):
+        """Refresh one user's cached photo and report ('downloaded' | 'unchanged' | 'no_photo', bytes downloaded)"""
+        previous = photo_cache.read_meta(photo_cache.key(azure_id)) or {}
+        photo = photo_cache.refresh(azure_id, azure_ad)
+
+        if photo is None:
+            return 'no_photo', 0
+        if photo.etag == previous.get('etag'):
+            return 'unchanged', 0
+        return 'downloaded', len(photo.data)
+
+    def parse_since(self, value):
+        """Parse --since as an aware datetime"""
+        since = parse_datetime(value)
+        if since is None:
+            since_date = parse_date(value)
+            if since_date is None:
+                raise CommandError(f'Invalid --since value "{value}", expected YYYY-MM-DD or an ISO datetime.')
+            since = datetime.combine(since_date, datetime_time.min)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0014_azuresyncstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AzureSyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed'), ('abandoned', 'Abandoned')], default='running', max_length=20)),
+                ('phase', models.CharField(choices=[('employees', 'Employees and user devices'), ('devices', 'Standalone devices'), ('assignments', 'Device assignments'), ('cleanup', 'Orphaned asset cleanup')], default='employees', help_text='Phase currently running, or the phase to resume from', max_length=20)),
+                ('cursor', models.TextField(blank=True, help_text='Graph page link to resume the current phase from')),
+                ('counts', models.JSONField(blank=True, default=dict, help_text='Running totals, keyed like the full_sync results')),
+                ('phase_durations', models.JSONField(blank=True, default=dict, help_text='Seconds spent in each phase, across resumes')),
+                ('attempts', models.PositiveIntegerField(default=1)),
+                ('error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0016_azuresyncjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetCleanupRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_name', models.CharField(max_length=200)),
+                ('previous_status', models.CharField(max_length=20)),
+                ('employee_name', models.CharField(max_length=200)),
+                ('employee_status', models.CharField(help_text="Why the asset was unassigned: the employee's Azure AD status", max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('asset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cleanup_records', to='assets.asset')),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asset_cleanup_records', to='assets.employee')),
+                ('sync_run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cleanup_records', to='assets.azuresyncrun')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
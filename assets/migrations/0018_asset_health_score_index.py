@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:42
+
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.db import migrations, models
+from django.db.models import Case, Q, Value, When
+
+# The health score bands as they were when this migration was written: (age below in days, score)
+HEALTH_SCORE_BANDS = [(30, 100), (90, 95), (180, 90), (365, 85), (730, 75), (1095, 65), (1460, 55), (1825, 45)]
+HEALTH_SCORE_OLDEST = 35
+HEALTH_SCORE_UNKNOWN_AGE = 50
+
+
+def health_band_expression(field, today, is_datetime=False):
+    whens = []
+    for max_age, score in HEALTH_SCORE_BANDS:
+        cutoff = today - timedelta(days=max_age - 1)
+        if is_datetime:
+            cutoff = datetime.combine(cutoff, time.min, timezone.utc)
+        whens.append(When(**{f'{field}__gte': cutoff}, then=Value(score)))
+    return Case(*whens, default=Value(HEALTH_SCORE_OLDEST), output_field=models.IntegerField())
+
+
+def health_score_expression(today):
+    is_azure = Q(azure_ad_id__isnull=False) & ~Q(azure_ad_id='')
+    return Case(
+        When(is_azure & Q(last_azure_sync__isnull=False), then=health_band_expression('last_azure_sync', today, True)),
+        When(is_azure & Q(azure_last_signin__isnull=False), then=health_band_expression('azure_last_signin', today, True)),
+        When(purchase_date__isnull=False, then=health_band_expression('purchase_date', today)),
+        When(last_azure_sync__isnull=False, then=health_band_expression('last_azure_sync', today, True)),
+        default=Value(HEALTH_SCORE_UNKNOWN_AGE),
+        output_field=models.IntegerField(),
+    )
+
+
+def store_health_scores(apps, schema_editor):
+    # Existing assets were never scored, views now read the stored column
+    Asset = apps.get_model('assets', 'Asset')
+    Asset.objects.update(health_score=health_score_expression(date.today()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0017_assetcleanuprecord'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['health_score'], name='asset_health_score_idx'),
+        ),
+        migrations.RunPython(store_health_scores, migrations.RunPython.noop),
+    ]
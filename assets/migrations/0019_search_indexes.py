@@ -0,0 +1,618 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:10
+
+from django.db import migrations
+
+# The search document tables and the triggers maintaining them as they were when this
+# migration was written, frozen so later changes to assets.search don't rewrite history
+
+CREATE_SQL = {
+    'sqlite': [
+        (
+            'CREATE TABLE assets_asset_search (id INTEGER PRIMARY KEY, object_id char(32) NOT NULL UNIQUE, name '
+            'TEXT NOT NULL, serial_number TEXT NOT NULL, model TEXT NOT NULL, manufacturer TEXT NOT NULL, '
+            'asset_type TEXT NOT NULL, owner TEXT NOT NULL)'
+        ),
+        (
+            'CREATE VIRTUAL TABLE assets_asset_search_fts USING fts5(name, serial_number, model, manufacturer, '
+            "asset_type, owner, content='assets_asset_search', content_rowid='id', tokenize='unicode61 "
+            "remove_diacritics 2', prefix='2 3')"
+        ),
+        (
+            "INSERT INTO assets_asset_search_fts (assets_asset_search_fts, rank) VALUES ('rank', 'bm25(10.0, "
+            "10.0, 4.0, 4.0, 2.0, 1.0)')"
+        ),
+        (
+            'INSERT INTO assets_asset_search (object_id, name, serial_number, model, manufacturer, asset_type, '
+            "owner) SELECT t.id, coalesce(t.name, ''), coalesce(t.serial_number, ''), coalesce(t.model, ''), "
+            "coalesce(t.manufacturer, ''), coalesce(t.asset_type, ''), coalesce((SELECT e.name || ' ' || e.email "
+            "|| ' ' || e.department FROM assets_employee e WHERE e.id = t.assigned_to_id), '') FROM assets_asset "
+            't'
+        ),
+        "INSERT INTO assets_asset_search_fts (assets_asset_search_fts) VALUES ('rebuild')",
+        (
+            'CREATE TRIGGER assets_asset_search_insert AFTER INSERT ON assets_asset_search BEGIN INSERT INTO '
+            'assets_asset_search_fts (rowid, name, serial_number, model, manufacturer, asset_type, owner) VALUES '
+            '(NEW.id, NEW.name, NEW.serial_number, NEW.model, NEW.manufacturer, NEW.asset_type, NEW.owner); END'
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_delete AFTER DELETE ON assets_asset_search BEGIN INSERT INTO '
+            'assets_asset_search_fts (assets_asset_search_fts, rowid, name, serial_number, model, manufacturer, '
+            "asset_type, owner) VALUES ('delete', OLD.id, OLD.name, OLD.serial_number, OLD.model, "
+            'OLD.manufacturer, OLD.asset_type, OLD.owner); END'
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_assets_asset_insert AFTER INSERT ON assets_asset FOR EACH ROW '
+            'BEGIN DELETE FROM assets_asset_search WHERE object_id = NEW.id; INSERT INTO assets_asset_search '
+            '(object_id, name, serial_number, model, manufacturer, asset_type, owner) SELECT t.id, '
+            "coalesce(t.name, ''), coalesce(t.serial_number, ''), coalesce(t.model, ''), "
+            "coalesce(t.manufacturer, ''), coalesce(t.asset_type, ''), coalesce((SELECT e.name || ' ' || e.email "
+            "|| ' ' || e.department FROM assets_employee e WHERE e.id = t.assigned_to_id), '') FROM assets_asset "
+            't WHERE t.id = NEW.id; END'
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_assets_asset_update AFTER UPDATE OF name, serial_number, model, '
+            'manufacturer, asset_type, assigned_to_id ON assets_asset FOR EACH ROW BEGIN DELETE FROM '
+            'assets_asset_search WHERE object_id = NEW.id; INSERT INTO assets_asset_search (object_id, name, '
+            "serial_number, model, manufacturer, asset_type, owner) SELECT t.id, coalesce(t.name, ''), "
+            "coalesce(t.serial_number, ''), coalesce(t.model, ''), coalesce(t.manufacturer, ''), "
+            "coalesce(t.asset_type, ''), coalesce((SELECT e.name || ' ' || e.email || ' ' || e.department FROM "
+            "assets_employee e WHERE e.id = t.assigned_to_id), '') FROM assets_asset t WHERE t.id = NEW.id; END"
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_assets_asset_delete AFTER DELETE ON assets_asset FOR EACH ROW '
+            'BEGIN DELETE FROM assets_asset_search WHERE object_id = OLD.id; INSERT INTO assets_asset_search '
+            '(object_id, name, serial_number, model, manufacturer, asset_type, owner) SELECT t.id, '
+            "coalesce(t.name, ''), coalesce(t.serial_number, ''), coalesce(t.model, ''), "
+            "coalesce(t.manufacturer, ''), coalesce(t.asset_type, ''), coalesce((SELECT e.name || ' ' || e.email "
+            "|| ' ' || e.department FROM assets_employee e WHERE e.id = t.assigned_to_id), '') FROM assets_asset "
+            't WHERE t.id = OLD.id; END'
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_assets_employee_update AFTER UPDATE OF name, email, department '
+            'ON assets_employee FOR EACH ROW BEGIN DELETE FROM assets_asset_search WHERE object_id IN (SELECT id '
+            'FROM assets_asset WHERE assigned_to_id = NEW.id UNION SELECT id FROM assets_asset WHERE '
+            'assigned_to_id = OLD.id); INSERT INTO assets_asset_search (object_id, name, serial_number, model, '
+            "manufacturer, asset_type, owner) SELECT t.id, coalesce(t.name, ''), coalesce(t.serial_number, ''), "
+            "coalesce(t.model, ''), coalesce(t.manufacturer, ''), coalesce(t.asset_type, ''), coalesce((SELECT "
+            "e.name || ' ' || e.email || ' ' || e.department FROM assets_employee e WHERE e.id = "
+            "t.assigned_to_id), '') FROM assets_asset t WHERE t.id IN (SELECT id FROM assets_asset WHERE "
+            'assigned_to_id = NEW.id UNION SELECT id FROM assets_asset WHERE assigned_to_id = OLD.id); END'
+        ),
+        (
+            'CREATE TABLE assets_employee_search (id INTEGER PRIMARY KEY, object_id char(32) NOT NULL UNIQUE, '
+            'name TEXT NOT NULL, email TEXT NOT NULL, department TEXT NOT NULL, phone TEXT NOT NULL)'
+        ),
+        (
+            'CREATE VIRTUAL TABLE assets_employee_search_fts USING fts5(name, email, department, phone, '
+            "content='assets_employee_search', content_rowid='id', tokenize='unicode61 remove_diacritics 2', "
+            "prefix='2 3')"
+        ),
+        (
+            "INSERT INTO assets_employee_search_fts (assets_employee_search_fts, rank) VALUES ('rank', "
+            "'bm25(10.0, 10.0, 2.0, 2.0)')"
+        ),
+        (
+            'INSERT INTO assets_employee_search (object_id, name, email, department, phone) SELECT t.id, '
+            "coalesce(t.name, ''), coalesce(t.email, ''), coalesce(t.department, ''), coalesce(t.phone, '') FROM "
+            'assets_employee t'
+        ),
+        "INSERT INTO assets_employee_search_fts (assets_employee_search_fts) VALUES ('rebuild')",
+        (
+            'CREATE TRIGGER assets_employee_search_insert AFTER INSERT ON assets_employee_search BEGIN INSERT '
+            'INTO assets_employee_search_fts (rowid, name, email, department, phone) VALUES (NEW.id, NEW.name, '
+            'NEW.email, NEW.department, NEW.phone); END'
+        ),
+        (
+            'CREATE TRIGGER assets_employee_search_delete AFTER DELETE ON assets_employee_search BEGIN INSERT '
+            'INTO assets_employee_search_fts (assets_employee_search_fts, rowid, name, email, department, phone) '
+            "VALUES ('delete', OLD.id, OLD.name, OLD.email, OLD.department, OLD.phone); END"
+        ),
+        (
+            'CREATE TRIGGER assets_employee_search_assets_employee_insert AFTER INSERT ON assets_employee FOR '
+            'EACH ROW BEGIN DELETE FROM assets_employee_search WHERE object_id = NEW.id; INSERT INTO '
+            'assets_employee_search (object_id, name, email, department, phone) SELECT t.id, coalesce(t.name, '
+            "''), coalesce(t.email, ''), coalesce(t.department, ''), coalesce(t.phone, '') FROM assets_employee "
+            't WHERE t.id = NEW.id; END'
+        ),
+        (
+            'CREATE TRIGGER assets_employee_search_assets_employee_update AFTER UPDATE OF name, email, '
+            'department, phone ON assets_employee FOR EACH ROW BEGIN DELETE FROM assets_employee_search WHERE '
+            'object_id = NEW.id; INSERT INTO assets_employee_search (object_id, name, email, department, phone) '
+            "SELECT t.id, coalesce(t.name, ''), coalesce(t.email, ''), coalesce(t.department, ''), "
+            "coalesce(t.phone, '') FROM assets_employee t WHERE t.id = NEW.id; END"
+        ),
+        (
+            'CREATE TRIGGER assets_employee_search_assets_employee_delete AFTER DELETE ON assets_employee FOR '
+            'EACH ROW BEGIN DELETE FROM assets_employee_search WHERE object_id = OLD.id; INSERT INTO '
+            'assets_employee_search (object_id, name, email, department, phone) SELECT t.id, coalesce(t.name, '
+            "''), coalesce(t.email, ''), coalesce(t.department, ''), coalesce(t.phone, '') FROM assets_employee "
+            't WHERE t.id = OLD.id; END'
+        ),
+        (
+            'CREATE TABLE assets_handover_search (id INTEGER PRIMARY KEY, object_id char(32) NOT NULL UNIQUE, '
+            'handover_id TEXT NOT NULL, employee TEXT NOT NULL, assets TEXT NOT NULL, notes TEXT NOT NULL)'
+        ),
+        (
+            'CREATE VIRTUAL TABLE assets_handover_search_fts USING fts5(handover_id, employee, assets, notes, '
+            "content='assets_handover_search', content_rowid='id', tokenize='unicode61 remove_diacritics 2', "
+            "prefix='2 3')"
+        ),
+        (
+            "INSERT INTO assets_handover_search_fts (assets_handover_search_fts, rank) VALUES ('rank', "
+            "'bm25(10.0, 10.0, 4.0, 1.0)')"
+        ),
+        (
+            'INSERT INTO assets_handover_search (object_id, handover_id, employee, assets, notes) SELECT t.id, '
+            "coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM assets_employee e WHERE e.id = "
+            "t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), coalesce(t.notes, '') FROM "
+            'assets_handover t'
+        ),
+        "INSERT INTO assets_handover_search_fts (assets_handover_search_fts) VALUES ('rebuild')",
+        (
+            'CREATE TRIGGER assets_handover_search_insert AFTER INSERT ON assets_handover_search BEGIN INSERT '
+            'INTO assets_handover_search_fts (rowid, handover_id, employee, assets, notes) VALUES (NEW.id, '
+            'NEW.handover_id, NEW.employee, NEW.assets, NEW.notes); END'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_delete AFTER DELETE ON assets_handover_search BEGIN INSERT '
+            'INTO assets_handover_search_fts (assets_handover_search_fts, rowid, handover_id, employee, assets, '
+            "notes) VALUES ('delete', OLD.id, OLD.handover_id, OLD.employee, OLD.assets, OLD.notes); END"
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handover_insert AFTER INSERT ON assets_handover FOR '
+            'EACH ROW BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.id; INSERT INTO '
+            'assets_handover_search (object_id, handover_id, employee, assets, notes) SELECT t.id, '
+            "coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM assets_employee e WHERE e.id = "
+            "t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), coalesce(t.notes, '') FROM "
+            'assets_handover t WHERE t.id = NEW.id; END'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handover_update AFTER UPDATE OF handover_id, '
+            'employee_id, notes ON assets_handover FOR EACH ROW BEGIN DELETE FROM assets_handover_search WHERE '
+            'object_id = NEW.id; INSERT INTO assets_handover_search (object_id, handover_id, employee, assets, '
+            "notes) SELECT t.id, coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM assets_employee e "
+            "WHERE e.id = t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), coalesce(t.notes, '') FROM assets_handover t WHERE t.id = NEW.id; END"
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handover_delete AFTER DELETE ON assets_handover FOR '
+            'EACH ROW BEGIN DELETE FROM assets_handover_search WHERE object_id = OLD.id; INSERT INTO '
+            'assets_handover_search (object_id, handover_id, employee, assets, notes) SELECT t.id, '
+            "coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM assets_employee e WHERE e.id = "
+            "t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), coalesce(t.notes, '') FROM "
+            'assets_handover t WHERE t.id = OLD.id; END'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handoverasset_insert AFTER INSERT ON '
+            'assets_handoverasset FOR EACH ROW BEGIN DELETE FROM assets_handover_search WHERE object_id = '
+            'NEW.handover_id; INSERT INTO assets_handover_search (object_id, handover_id, employee, assets, '
+            "notes) SELECT t.id, coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM assets_employee e "
+            "WHERE e.id = t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), coalesce(t.notes, '') FROM assets_handover t WHERE t.id = NEW.handover_id; END"
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handoverasset_update AFTER UPDATE OF handover_id, '
+            'asset_id ON assets_handoverasset FOR EACH ROW BEGIN DELETE FROM assets_handover_search WHERE '
+            'object_id IN (SELECT NEW.handover_id UNION SELECT OLD.handover_id); INSERT INTO '
+            'assets_handover_search (object_id, handover_id, employee, assets, notes) SELECT t.id, '
+            "coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM assets_employee e WHERE e.id = "
+            "t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), coalesce(t.notes, '') FROM "
+            'assets_handover t WHERE t.id IN (SELECT NEW.handover_id UNION SELECT OLD.handover_id); END'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handoverasset_delete AFTER DELETE ON '
+            'assets_handoverasset FOR EACH ROW BEGIN DELETE FROM assets_handover_search WHERE object_id = '
+            'OLD.handover_id; INSERT INTO assets_handover_search (object_id, handover_id, employee, assets, '
+            "notes) SELECT t.id, coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM assets_employee e "
+            "WHERE e.id = t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), coalesce(t.notes, '') FROM assets_handover t WHERE t.id = OLD.handover_id; END"
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_employee_update AFTER UPDATE OF name ON '
+            'assets_employee FOR EACH ROW BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT id '
+            'FROM assets_handover WHERE employee_id = NEW.id UNION SELECT id FROM assets_handover WHERE '
+            'employee_id = OLD.id); INSERT INTO assets_handover_search (object_id, handover_id, employee, '
+            "assets, notes) SELECT t.id, coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), coalesce(t.notes, '') FROM assets_handover t WHERE t.id IN (SELECT id FROM assets_handover "
+            'WHERE employee_id = NEW.id UNION SELECT id FROM assets_handover WHERE employee_id = OLD.id); END'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_asset_update AFTER UPDATE OF name ON assets_asset FOR '
+            'EACH ROW BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT handover_id FROM '
+            'assets_handoverasset WHERE asset_id = NEW.id UNION SELECT handover_id FROM assets_handoverasset '
+            'WHERE asset_id = OLD.id); INSERT INTO assets_handover_search (object_id, handover_id, employee, '
+            "assets, notes) SELECT t.id, coalesce(t.handover_id, ''), coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), coalesce((SELECT group_concat(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), coalesce(t.notes, '') FROM assets_handover t WHERE t.id IN (SELECT handover_id FROM "
+            'assets_handoverasset WHERE asset_id = NEW.id UNION SELECT handover_id FROM assets_handoverasset '
+            'WHERE asset_id = OLD.id); END'
+        ),
+    ],
+    'postgresql': [
+        'CREATE TABLE assets_asset_search (object_id uuid PRIMARY KEY, document tsvector NOT NULL)',
+        (
+            "INSERT INTO assets_asset_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.name, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.serial_number, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.model, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.manufacturer, ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.asset_type, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name || ' ' || "
+            "e.email || ' ' || e.department FROM assets_employee e WHERE e.id = t.assigned_to_id), ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_asset t"
+        ),
+        'CREATE INDEX assets_asset_search_document ON assets_asset_search USING GIN (document)',
+        (
+            'CREATE FUNCTION assets_asset_search_assets_asset_insert() RETURNS trigger LANGUAGE plpgsql AS $$ '
+            'BEGIN DELETE FROM assets_asset_search WHERE object_id = NEW.id; INSERT INTO assets_asset_search '
+            "(object_id, document) SELECT t.id, setweight(to_tsvector('simple', regexp_replace(coalesce(t.name, "
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.serial_number, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.model, ''), '[^[:alnum:]]+', ' ', 'g')), "
+            "'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.manufacturer, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.asset_type, ''), '[^[:alnum:]]+', ' ', 'g')), 'C') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name || ' ' || e.email || ' ' || "
+            "e.department FROM assets_employee e WHERE e.id = t.assigned_to_id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'D') FROM assets_asset t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_assets_asset_insert AFTER INSERT ON assets_asset FOR EACH ROW '
+            'EXECUTE FUNCTION assets_asset_search_assets_asset_insert()'
+        ),
+        (
+            'CREATE FUNCTION assets_asset_search_assets_asset_update() RETURNS trigger LANGUAGE plpgsql AS $$ '
+            'BEGIN DELETE FROM assets_asset_search WHERE object_id = NEW.id; INSERT INTO assets_asset_search '
+            "(object_id, document) SELECT t.id, setweight(to_tsvector('simple', regexp_replace(coalesce(t.name, "
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.serial_number, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.model, ''), '[^[:alnum:]]+', ' ', 'g')), "
+            "'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.manufacturer, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.asset_type, ''), '[^[:alnum:]]+', ' ', 'g')), 'C') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name || ' ' || e.email || ' ' || "
+            "e.department FROM assets_employee e WHERE e.id = t.assigned_to_id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'D') FROM assets_asset t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_assets_asset_update AFTER UPDATE OF name, serial_number, model, '
+            'manufacturer, asset_type, assigned_to_id ON assets_asset FOR EACH ROW EXECUTE FUNCTION '
+            'assets_asset_search_assets_asset_update()'
+        ),
+        (
+            'CREATE FUNCTION assets_asset_search_assets_asset_delete() RETURNS trigger LANGUAGE plpgsql AS $$ '
+            'BEGIN DELETE FROM assets_asset_search WHERE object_id = OLD.id; INSERT INTO assets_asset_search '
+            "(object_id, document) SELECT t.id, setweight(to_tsvector('simple', regexp_replace(coalesce(t.name, "
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.serial_number, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.model, ''), '[^[:alnum:]]+', ' ', 'g')), "
+            "'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.manufacturer, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.asset_type, ''), '[^[:alnum:]]+', ' ', 'g')), 'C') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name || ' ' || e.email || ' ' || "
+            "e.department FROM assets_employee e WHERE e.id = t.assigned_to_id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'D') FROM assets_asset t WHERE t.id = OLD.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_assets_asset_delete AFTER DELETE ON assets_asset FOR EACH ROW '
+            'EXECUTE FUNCTION assets_asset_search_assets_asset_delete()'
+        ),
+        (
+            'CREATE FUNCTION assets_asset_search_assets_employee_update() RETURNS trigger LANGUAGE plpgsql AS $$ '
+            'BEGIN DELETE FROM assets_asset_search WHERE object_id IN (SELECT id FROM assets_asset WHERE '
+            'assigned_to_id = NEW.id UNION SELECT id FROM assets_asset WHERE assigned_to_id = OLD.id); INSERT '
+            "INTO assets_asset_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.name, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.serial_number, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.model, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.manufacturer, ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.asset_type, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name || ' ' || "
+            "e.email || ' ' || e.department FROM assets_employee e WHERE e.id = t.assigned_to_id), ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_asset t WHERE t.id IN (SELECT id FROM assets_asset "
+            'WHERE assigned_to_id = NEW.id UNION SELECT id FROM assets_asset WHERE assigned_to_id = OLD.id); '
+            'RETURN NULL; END $$'
+        ),
+        (
+            'CREATE TRIGGER assets_asset_search_assets_employee_update AFTER UPDATE OF name, email, department '
+            'ON assets_employee FOR EACH ROW EXECUTE FUNCTION assets_asset_search_assets_employee_update()'
+        ),
+        'CREATE TABLE assets_employee_search (object_id uuid PRIMARY KEY, document tsvector NOT NULL)',
+        (
+            'INSERT INTO assets_employee_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.name, ''), '[^[:alnum:]]+', ' ', 'g')), "
+            "'A') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.email, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.department, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'C') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.phone, ''), '[^[:alnum:]]+', ' ', 'g')), 'C') FROM assets_employee t"
+        ),
+        'CREATE INDEX assets_employee_search_document ON assets_employee_search USING GIN (document)',
+        (
+            'CREATE FUNCTION assets_employee_search_assets_employee_insert() RETURNS trigger LANGUAGE plpgsql AS '
+            '$$ BEGIN DELETE FROM assets_employee_search WHERE object_id = NEW.id; INSERT INTO '
+            "assets_employee_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.name, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.email, ''), '[^[:alnum:]]+', ' ', 'g')), "
+            "'A') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.department, ''), '[^[:alnum:]]+', "
+            "' ', 'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.phone, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'C') FROM assets_employee t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_employee_search_assets_employee_insert AFTER INSERT ON assets_employee FOR '
+            'EACH ROW EXECUTE FUNCTION assets_employee_search_assets_employee_insert()'
+        ),
+        (
+            'CREATE FUNCTION assets_employee_search_assets_employee_update() RETURNS trigger LANGUAGE plpgsql AS '
+            '$$ BEGIN DELETE FROM assets_employee_search WHERE object_id = NEW.id; INSERT INTO '
+            "assets_employee_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.name, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.email, ''), '[^[:alnum:]]+', ' ', 'g')), "
+            "'A') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.department, ''), '[^[:alnum:]]+', "
+            "' ', 'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.phone, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'C') FROM assets_employee t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_employee_search_assets_employee_update AFTER UPDATE OF name, email, '
+            'department, phone ON assets_employee FOR EACH ROW EXECUTE FUNCTION '
+            'assets_employee_search_assets_employee_update()'
+        ),
+        (
+            'CREATE FUNCTION assets_employee_search_assets_employee_delete() RETURNS trigger LANGUAGE plpgsql AS '
+            '$$ BEGIN DELETE FROM assets_employee_search WHERE object_id = OLD.id; INSERT INTO '
+            "assets_employee_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.name, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.email, ''), '[^[:alnum:]]+', ' ', 'g')), "
+            "'A') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.department, ''), '[^[:alnum:]]+', "
+            "' ', 'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.phone, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'C') FROM assets_employee t WHERE t.id = OLD.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_employee_search_assets_employee_delete AFTER DELETE ON assets_employee FOR '
+            'EACH ROW EXECUTE FUNCTION assets_employee_search_assets_employee_delete()'
+        ),
+        'CREATE TABLE assets_handover_search (object_id uuid PRIMARY KEY, document tsvector NOT NULL)',
+        (
+            'INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t"
+        ),
+        'CREATE INDEX assets_handover_search_document ON assets_handover_search USING GIN (document)',
+        (
+            'CREATE FUNCTION assets_handover_search_assets_handover_insert() RETURNS trigger LANGUAGE plpgsql AS '
+            '$$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handover_insert AFTER INSERT ON assets_handover FOR '
+            'EACH ROW EXECUTE FUNCTION assets_handover_search_assets_handover_insert()'
+        ),
+        (
+            'CREATE FUNCTION assets_handover_search_assets_handover_update() RETURNS trigger LANGUAGE plpgsql AS '
+            '$$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handover_update AFTER UPDATE OF handover_id, '
+            'employee_id, notes ON assets_handover FOR EACH ROW EXECUTE FUNCTION '
+            'assets_handover_search_assets_handover_update()'
+        ),
+        (
+            'CREATE FUNCTION assets_handover_search_assets_handover_delete() RETURNS trigger LANGUAGE plpgsql AS '
+            '$$ BEGIN DELETE FROM assets_handover_search WHERE object_id = OLD.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = OLD.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handover_delete AFTER DELETE ON assets_handover FOR '
+            'EACH ROW EXECUTE FUNCTION assets_handover_search_assets_handover_delete()'
+        ),
+        (
+            'CREATE FUNCTION assets_handover_search_assets_handoverasset_insert() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.handover_id; INSERT '
+            "INTO assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = NEW.handover_id; RETURN NULL; "
+            'END $$'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handoverasset_insert AFTER INSERT ON '
+            'assets_handoverasset FOR EACH ROW EXECUTE FUNCTION '
+            'assets_handover_search_assets_handoverasset_insert()'
+        ),
+        (
+            'CREATE FUNCTION assets_handover_search_assets_handoverasset_update() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT NEW.handover_id '
+            'UNION SELECT OLD.handover_id); INSERT INTO assets_handover_search (object_id, document) SELECT '
+            "t.id, setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', "
+            "' ', 'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id IN (SELECT NEW.handover_id UNION SELECT OLD.handover_id); RETURN NULL; END $$'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handoverasset_update AFTER UPDATE OF handover_id, '
+            'asset_id ON assets_handoverasset FOR EACH ROW EXECUTE FUNCTION '
+            'assets_handover_search_assets_handoverasset_update()'
+        ),
+        (
+            'CREATE FUNCTION assets_handover_search_assets_handoverasset_delete() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = OLD.handover_id; INSERT '
+            "INTO assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = OLD.handover_id; RETURN NULL; "
+            'END $$'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_handoverasset_delete AFTER DELETE ON '
+            'assets_handoverasset FOR EACH ROW EXECUTE FUNCTION '
+            'assets_handover_search_assets_handoverasset_delete()'
+        ),
+        (
+            'CREATE FUNCTION assets_handover_search_assets_employee_update() RETURNS trigger LANGUAGE plpgsql AS '
+            '$$ BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT id FROM assets_handover '
+            'WHERE employee_id = NEW.id UNION SELECT id FROM assets_handover WHERE employee_id = OLD.id); INSERT '
+            "INTO assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id IN (SELECT id FROM "
+            'assets_handover WHERE employee_id = NEW.id UNION SELECT id FROM assets_handover WHERE employee_id = '
+            'OLD.id); RETURN NULL; END $$'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_employee_update AFTER UPDATE OF name ON '
+            'assets_employee FOR EACH ROW EXECUTE FUNCTION assets_handover_search_assets_employee_update()'
+        ),
+        (
+            'CREATE FUNCTION assets_handover_search_assets_asset_update() RETURNS trigger LANGUAGE plpgsql AS $$ '
+            'BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT handover_id FROM '
+            'assets_handoverasset WHERE asset_id = NEW.id UNION SELECT handover_id FROM assets_handoverasset '
+            'WHERE asset_id = OLD.id); INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id IN (SELECT handover_id FROM assets_handoverasset WHERE asset_id = NEW.id UNION SELECT '
+            'handover_id FROM assets_handoverasset WHERE asset_id = OLD.id); RETURN NULL; END $$'
+        ),
+        (
+            'CREATE TRIGGER assets_handover_search_assets_asset_update AFTER UPDATE OF name ON assets_asset FOR '
+            'EACH ROW EXECUTE FUNCTION assets_handover_search_assets_asset_update()'
+        ),
+    ],
+}
+
+DROP_SQL = {
+    'sqlite': [
+        'DROP TABLE IF EXISTS assets_asset_search_fts',
+        'DROP TABLE IF EXISTS assets_asset_search',
+        'DROP TRIGGER IF EXISTS assets_asset_search_assets_asset_insert',
+        'DROP TRIGGER IF EXISTS assets_asset_search_assets_asset_update',
+        'DROP TRIGGER IF EXISTS assets_asset_search_assets_asset_delete',
+        'DROP TRIGGER IF EXISTS assets_asset_search_assets_employee_update',
+        'DROP TABLE IF EXISTS assets_employee_search_fts',
+        'DROP TABLE IF EXISTS assets_employee_search',
+        'DROP TRIGGER IF EXISTS assets_employee_search_assets_employee_insert',
+        'DROP TRIGGER IF EXISTS assets_employee_search_assets_employee_update',
+        'DROP TRIGGER IF EXISTS assets_employee_search_assets_employee_delete',
+        'DROP TABLE IF EXISTS assets_handover_search_fts',
+        'DROP TABLE IF EXISTS assets_handover_search',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handover_insert',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handover_update',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handover_delete',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handoverasset_insert',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handoverasset_update',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handoverasset_delete',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_employee_update',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_asset_update',
+    ],
+    'postgresql': [
+        'DROP TABLE IF EXISTS assets_asset_search',
+        'DROP TRIGGER IF EXISTS assets_asset_search_assets_asset_insert ON assets_asset',
+        'DROP FUNCTION IF EXISTS assets_asset_search_assets_asset_insert()',
+        'DROP TRIGGER IF EXISTS assets_asset_search_assets_asset_update ON assets_asset',
+        'DROP FUNCTION IF EXISTS assets_asset_search_assets_asset_update()',
+        'DROP TRIGGER IF EXISTS assets_asset_search_assets_asset_delete ON assets_asset',
+        'DROP FUNCTION IF EXISTS assets_asset_search_assets_asset_delete()',
+        'DROP TRIGGER IF EXISTS assets_asset_search_assets_employee_update ON assets_employee',
+        'DROP FUNCTION IF EXISTS assets_asset_search_assets_employee_update()',
+        'DROP TABLE IF EXISTS assets_employee_search',
+        'DROP TRIGGER IF EXISTS assets_employee_search_assets_employee_insert ON assets_employee',
+        'DROP FUNCTION IF EXISTS assets_employee_search_assets_employee_insert()',
+        'DROP TRIGGER IF EXISTS assets_employee_search_assets_employee_update ON assets_employee',
+        'DROP FUNCTION IF EXISTS assets_employee_search_assets_employee_update()',
+        'DROP TRIGGER IF EXISTS assets_employee_search_assets_employee_delete ON assets_employee',
+        'DROP FUNCTION IF EXISTS assets_employee_search_assets_employee_delete()',
+        'DROP TABLE IF EXISTS assets_handover_search',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handover_insert ON assets_handover',
+        'DROP FUNCTION IF EXISTS assets_handover_search_assets_handover_insert()',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handover_update ON assets_handover',
+        'DROP FUNCTION IF EXISTS assets_handover_search_assets_handover_update()',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handover_delete ON assets_handover',
+        'DROP FUNCTION IF EXISTS assets_handover_search_assets_handover_delete()',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handoverasset_insert ON assets_handoverasset',
+        'DROP FUNCTION IF EXISTS assets_handover_search_assets_handoverasset_insert()',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handoverasset_update ON assets_handoverasset',
+        'DROP FUNCTION IF EXISTS assets_handover_search_assets_handoverasset_update()',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_handoverasset_delete ON assets_handoverasset',
+        'DROP FUNCTION IF EXISTS assets_handover_search_assets_handoverasset_delete()',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_employee_update ON assets_employee',
+        'DROP FUNCTION IF EXISTS assets_handover_search_assets_employee_update()',
+        'DROP TRIGGER IF EXISTS assets_handover_search_assets_asset_update ON assets_asset',
+        'DROP FUNCTION IF EXISTS assets_handover_search_assets_asset_update()',
+    ],
+}
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0018_asset_health_score_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sql(CREATE_SQL), run_sql(DROP_SQL)),
+    ]
@@ -0,0 +1,281 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:05
+
+from django.db import migrations
+
+# Handover IDs now have a weight of their own, so typeahead can match them alone. SQLite
+# weighs the document columns when ranking, PostgreSQL stores the weights in the document,
+# so its handover documents and the triggers writing them are replaced.
+
+WEIGHTS_SQL = {
+    'sqlite': [
+        (
+            "INSERT INTO assets_handover_search_fts (assets_handover_search_fts, rank) VALUES ('rank', "
+            "'bm25(10.0, 4.0, 2.0, 1.0)')"
+        ),
+    ],
+    'postgresql': [
+        'DELETE FROM assets_handover_search',
+        (
+            'INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'C') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t"
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handover_insert() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handover_update() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handover_delete() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = OLD.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = OLD.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handoverasset_insert() RETURNS trigger '
+            'LANGUAGE plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.handover_id; '
+            'INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'C') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id = NEW.handover_id; RETURN NULL; END $$'
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handoverasset_update() RETURNS trigger '
+            'LANGUAGE plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT '
+            'NEW.handover_id UNION SELECT OLD.handover_id); INSERT INTO assets_handover_search (object_id, '
+            "document) SELECT t.id, setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE e.id = t.employee_id), ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'C') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id IN (SELECT NEW.handover_id "
+            'UNION SELECT OLD.handover_id); RETURN NULL; END $$'
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handoverasset_delete() RETURNS trigger '
+            'LANGUAGE plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = OLD.handover_id; '
+            'INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'C') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id = OLD.handover_id; RETURN NULL; END $$'
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_employee_update() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT id FROM '
+            'assets_handover WHERE employee_id = NEW.id UNION SELECT id FROM assets_handover WHERE employee_id = '
+            'OLD.id); INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'C') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id IN (SELECT id FROM assets_handover WHERE employee_id = NEW.id UNION SELECT id FROM '
+            'assets_handover WHERE employee_id = OLD.id); RETURN NULL; END $$'
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_asset_update() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT handover_id FROM '
+            'assets_handoverasset WHERE asset_id = NEW.id UNION SELECT handover_id FROM assets_handoverasset '
+            'WHERE asset_id = OLD.id); INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'B') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'C') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id IN (SELECT handover_id FROM assets_handoverasset WHERE asset_id = NEW.id UNION SELECT '
+            'handover_id FROM assets_handoverasset WHERE asset_id = OLD.id); RETURN NULL; END $$'
+        ),
+    ],
+}
+
+PREVIOUS_WEIGHTS_SQL = {
+    'sqlite': [
+        (
+            "INSERT INTO assets_handover_search_fts (assets_handover_search_fts, rank) VALUES ('rank', "
+            "'bm25(10.0, 10.0, 4.0, 1.0)')"
+        ),
+    ],
+    'postgresql': [
+        'DELETE FROM assets_handover_search',
+        (
+            'INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t"
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handover_insert() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handover_update() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = NEW.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handover_delete() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = OLD.id; INSERT INTO '
+            "assets_handover_search (object_id, document) SELECT t.id, setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE "
+            "e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id = OLD.id; RETURN NULL; END $$"
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handoverasset_insert() RETURNS trigger '
+            'LANGUAGE plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = NEW.handover_id; '
+            'INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id = NEW.handover_id; RETURN NULL; END $$'
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handoverasset_update() RETURNS trigger '
+            'LANGUAGE plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT '
+            'NEW.handover_id UNION SELECT OLD.handover_id); INSERT INTO assets_handover_search (object_id, '
+            "document) SELECT t.id, setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT e.name FROM assets_employee e WHERE e.id = t.employee_id), ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'A') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM assets_handoverasset ha JOIN "
+            "assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'B') || setweight(to_tsvector('simple', regexp_replace(coalesce(t.notes, ''), "
+            "'[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t WHERE t.id IN (SELECT NEW.handover_id "
+            'UNION SELECT OLD.handover_id); RETURN NULL; END $$'
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_handoverasset_delete() RETURNS trigger '
+            'LANGUAGE plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id = OLD.handover_id; '
+            'INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id = OLD.handover_id; RETURN NULL; END $$'
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_employee_update() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT id FROM '
+            'assets_handover WHERE employee_id = NEW.id UNION SELECT id FROM assets_handover WHERE employee_id = '
+            'OLD.id); INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id IN (SELECT id FROM assets_handover WHERE employee_id = NEW.id UNION SELECT id FROM '
+            'assets_handover WHERE employee_id = OLD.id); RETURN NULL; END $$'
+        ),
+        (
+            'CREATE OR REPLACE FUNCTION assets_handover_search_assets_asset_update() RETURNS trigger LANGUAGE '
+            'plpgsql AS $$ BEGIN DELETE FROM assets_handover_search WHERE object_id IN (SELECT handover_id FROM '
+            'assets_handoverasset WHERE asset_id = NEW.id UNION SELECT handover_id FROM assets_handoverasset '
+            'WHERE asset_id = OLD.id); INSERT INTO assets_handover_search (object_id, document) SELECT t.id, '
+            "setweight(to_tsvector('simple', regexp_replace(coalesce(t.handover_id, ''), '[^[:alnum:]]+', ' ', "
+            "'g')), 'A') || setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT e.name FROM "
+            "assets_employee e WHERE e.id = t.employee_id), ''), '[^[:alnum:]]+', ' ', 'g')), 'A') || "
+            "setweight(to_tsvector('simple', regexp_replace(coalesce((SELECT string_agg(a.name, ' ') FROM "
+            'assets_handoverasset ha JOIN assets_asset a ON a.id = ha.asset_id WHERE ha.handover_id = t.id), '
+            "''), '[^[:alnum:]]+', ' ', 'g')), 'B') || setweight(to_tsvector('simple', "
+            "regexp_replace(coalesce(t.notes, ''), '[^[:alnum:]]+', ' ', 'g')), 'D') FROM assets_handover t "
+            'WHERE t.id IN (SELECT handover_id FROM assets_handoverasset WHERE asset_id = NEW.id UNION SELECT '
+            'handover_id FROM assets_handoverasset WHERE asset_id = OLD.id); RETURN NULL; END $$'
+        ),
+    ],
+}
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0019_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sql(WEIGHTS_SQL), run_sql(PREVIOUS_WEIGHTS_SQL)),
+    ]
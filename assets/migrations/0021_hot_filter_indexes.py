@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0020_search_handover_weights'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['status', 'asset_type'], name='asset_status_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['assigned_to', 'status'], name='asset_assignee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['purchase_date', 'id'], name='asset_purchase_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(condition=models.Q(('assigned_to__isnull', True)), fields=['status', '-created_at', '-id'], name='asset_unassigned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name'], name='employee_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['status'], name='employee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['department'], name='employee_department_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='handover',
+            index=models.Index(fields=['created_at'], name='handover_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='handover',
+            index=models.Index(fields=['status', 'created_at'], name='handover_status_created_idx'),
+        ),
+    ]
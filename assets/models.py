@@ -1,8 +1,125 @@
 from django.db import models
+from django.db.models import Case, Q, Value, When
+from django.db.models.query import ModelIterable
 from django.contrib.auth.models import User
 from django.utils import timezone
+from datetime import date, datetime, time as datetime_time, timedelta, timezone as dt_timezone
 import uuid
 
+# Asset health score by age in days: (age below, score), older assets score HEALTH_SCORE_OLDEST
+HEALTH_SCORE_BANDS = [
+    (30, 100),    # Less than 1 month
+    (90, 95),     # Less than 3 months
+    (180, 90),    # Less than 6 months
+    (365, 85),    # Less than 1 year
+    (730, 75),    # Less than 2 years
+    (1095, 65),   # Less than 3 years
+    (1460, 55),   # Less than 4 years
+    (1825, 45),   # Less than 5 years
+]
+HEALTH_SCORE_OLDEST = 35
+HEALTH_SCORE_UNKNOWN_AGE = 50
+
+# Fields the health score is derived from, saving any of them recomputes it
+HEALTH_SCORE_SOURCE_FIELDS = {'azure_ad_id', 'last_azure_sync', 'azure_last_signin', 'purchase_date'}
+
+# AzureSyncState key holding the date recompute_health_scores last ran
+HEALTH_SCORES_DATE_KEY = 'health_scores_computed_on'
+
+
+def health_score_for_age(age_days):
+    """Health score of an asset age_days old"""
+    for max_age, score in HEALTH_SCORE_BANDS:
+        if age_days < max_age:
+            return score
+    return HEALTH_SCORE_OLDEST
+
+
+def day_start(day):
+    """Midnight UTC at the start of a date, for comparing dates with datetime columns"""
+    return datetime.combine(day, datetime_time.min, dt_timezone.utc)
+
+
+def health_band_expression(field, today, is_datetime=False):
+    """Case scoring the age of one date or datetime field against HEALTH_SCORE_BANDS
+    
+    A date younger than max_age days is on or after today - (max_age - 1) days.
+    Datetimes are compared with the start of that day in UTC, matching
+    calculate_health_score's use of .date(), so the column can use its index.
+    """
+    whens = []
+    for max_age, score in HEALTH_SCORE_BANDS:
+        cutoff = today - timedelta(days=max_age - 1)
+        if is_datetime:
+            cutoff = day_start(cutoff)
+        whens.append(When(**{f'{field}__gte': cutoff}, then=Value(score)))
+    return Case(*whens, default=Value(HEALTH_SCORE_OLDEST), output_field=models.IntegerField())
+
+
+def health_score_expression(today=None):
+    """SQL version of calculate_health_score, as of today
+    
+    Azure AD assets are aged from when they were synced (or last signed in),
+    manually added assets from their purchase date.
+    """
+    today = today or date.today()
+    is_azure = Q(azure_ad_id__isnull=False) & ~Q(azure_ad_id='')
+    return Case(
+        When(is_azure & Q(last_azure_sync__isnull=False), then=health_band_expression('last_azure_sync', today, True)),
+        When(is_azure & Q(azure_last_signin__isnull=False), then=health_band_expression('azure_last_signin', today, True)),
+        When(purchase_date__isnull=False, then=health_band_expression('purchase_date', today)),
+        When(last_azure_sync__isnull=False, then=health_band_expression('last_azure_sync', today, True)),
+        default=Value(HEALTH_SCORE_UNKNOWN_AGE),
+        output_field=models.IntegerField(),
+    )
+
+
+class HealthScoreIterable(ModelIterable):
+    """Yield assets with health_score set from the current_health_score annotation"""
+    
+    def __iter__(self):
+        for asset in super().__iter__():
+            asset.health_score = asset.current_health_score
+            yield asset
+
+
+class AssetQuerySet(models.QuerySet):
+    def with_health_score(self, today=None):
+        """Compute health scores in SQL for the rows fetched
+        
+        The score is annotated as current_health_score, which can be filtered and
+        ordered on, and copied to health_score on each asset returned.
+        """
+        queryset = self.annotate(current_health_score=health_score_expression(today))
+        queryset._iterable_class = HealthScoreIterable
+        return queryset
+    
+    def refresh_health_scores(self, today=None):
+        """Store current health scores in one UPDATE, returning how many assets changed
+        
+        Only rows whose stored score is missing or out of date are written.
+        """
+        score = health_score_expression(today)
+        return self.filter(Q(health_score__isnull=True) | ~Q(health_score=score)).update(health_score=score)
+    
+    def crossing_health_bands(self, since, today=None):
+        """Assets whose score may have moved to another band between since and today
+        
+        An asset leaves a band of max_age days once its reference date is max_age
+        days old, so only reference dates in [since, today) - (max_age - 1) days can
+        have changed band. Assets never scored are included too.
+        """
+        today = today or date.today()
+        crossing = Q(health_score__isnull=True)
+        for max_age, _ in HEALTH_SCORE_BANDS:
+            start = since - timedelta(days=max_age - 1)
+            end = today - timedelta(days=max_age - 1)
+            crossing |= Q(purchase_date__gte=start, purchase_date__lt=end)
+            crossing |= Q(last_azure_sync__gte=day_start(start), last_azure_sync__lt=day_start(end))
+            crossing |= Q(azure_last_signin__gte=day_start(start), azure_last_signin__lt=day_start(end))
+        return self.filter(crossing)
+
+
 class Employee(models.Model):
     DEPARTMENTS = [
         ('Engineering', 'Engineering'),
@@ -45,6 +162,13 @@ class Employee(models.Model):
     
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Active employee pickers, ordered by name (the filter renders as a bare WHERE is_active)
+            models.Index(fields=['name'], condition=models.Q(is_active=True), name='employee_active_name_idx'),
+            models.Index(fields=['status'], name='employee_status_idx'),
+            # Department listings join assets through this
+            models.Index(fields=['department'], name='employee_department_idx'),
+        ]
 
 class Asset(models.Model):
     ASSET_TYPES = [
@@ -127,11 +251,58 @@ class Asset(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = AssetQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.name} - {self.serial_number}"
     
+    def save(self, *args, **kwargs):
+        self.health_score = self.calculate_health_score()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and HEALTH_SCORE_SOURCE_FIELDS.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'health_score'}
+        super().save(*args, **kwargs)
+    
+    def health_reference_date(self):
+        """Date the asset's age is measured from: Azure sync date for Azure assets, purchase date for others"""
+        # For Azure AD assets, prioritize Azure sync date over purchase date
+        if self.azure_ad_id and self.last_azure_sync:
+            # Asset came from Azure AD - use sync date as reference (when it was discovered)
+            return self.last_azure_sync.date()
+        elif self.azure_ad_id and self.azure_last_signin:
+            # Use Azure last sign-in date if available
+            return self.azure_last_signin.date()
+        elif self.purchase_date:
+            # Manually added asset - use purchase date
+            return self.purchase_date
+        elif self.last_azure_sync:
+            # Fallback to Azure sync date if no other date available
+            return self.last_azure_sync.date()
+        return None
+    
+    def calculate_health_score(self, today=None):
+        """Health score (0-100) from the asset's age, see health_score_expression for the SQL version"""
+        reference_date = self.health_reference_date()
+        if not reference_date:
+            return HEALTH_SCORE_UNKNOWN_AGE  # Unknown age - assume moderate health
+        return health_score_for_age(((today or date.today()) - reference_date).days)
+    
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['health_score'], name='asset_health_score_idx'),
+            models.Index(fields=['status', 'asset_type'], name='asset_status_type_idx'),
+            models.Index(fields=['assigned_to', 'status'], name='asset_assignee_status_idx'),
+            # Age cut-offs, in the attention listing's (purchase_date, id) page order
+            models.Index(fields=['purchase_date', 'id'], name='asset_purchase_date_idx'),
+            # Unassigned stock by status, newest first for the new assets listing. Partial
+            # conditions stay parameter-free (IS NULL) so SQLite can match them too
+            models.Index(
+                fields=['status', '-created_at', '-id'],
+                condition=models.Q(assigned_to__isnull=True),
+                name='asset_unassigned_idx',
+            ),
+        ]
 
 class Handover(models.Model):
     MODE_CHOICES = [
@@ -193,6 +364,10 @@ class Handover(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='handover_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='handover_status_created_idx'),
+        ]
 
 class HandoverAsset(models.Model):
     handover = models.ForeignKey(Handover, on_delete=models.CASCADE)
@@ -249,3 +424,143 @@ class WelcomePack(models.Model):
     
     class Meta:
         ordering = ['-generated_at']
+
+class AzureSyncState(models.Model):
+    """Key-value store for Azure AD sync bookkeeping, such as Graph delta links"""
+    key = models.CharField(max_length=100, unique=True)
+    value = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return self.key
+    
+    @classmethod
+    def get_value(cls, key, default=None):
+        state = cls.objects.filter(key=key).first()
+        return state.value if state else default
+    
+    @classmethod
+    def set_value(cls, key, value):
+        cls.objects.update_or_create(key=key, defaults={'value': value})
+    
+    class Meta:
+        ordering = ['key']
+
+
+class AzureSyncRun(models.Model):
+    """A full Azure AD sync, checkpointed after every phase and page so an interrupted run can resume"""
+    PHASES = [
+        ('employees', 'Employees and user devices'),
+        ('devices', 'Standalone devices'),
+        ('assignments', 'Device assignments'),
+        ('cleanup', 'Orphaned asset cleanup'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('abandoned', 'Abandoned'),
+    ]
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    phase = models.CharField(max_length=20, choices=PHASES, default='employees', help_text="Phase currently running, or the phase to resume from")
+    cursor = models.TextField(blank=True, help_text="Graph page link to resume the current phase from")
+    counts = models.JSONField(default=dict, blank=True, help_text="Running totals, keyed like the full_sync results")
+    phase_durations = models.JSONField(default=dict, blank=True, help_text="Seconds spent in each phase, across resumes")
+    attempts = models.PositiveIntegerField(default=1)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Azure AD sync {self.started_at:%Y-%m-%d %H:%M} ({self.get_status_display()})"
+    
+    @classmethod
+    def phase_names(cls):
+        return [phase for phase, _ in cls.PHASES]
+    
+    def checkpoint(self, cursor='', **counts):
+        """Record progress within the current phase: the page link to resume from and counts to add"""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+        self.cursor = cursor or ''
+        self.save(update_fields=['cursor', 'counts', 'updated_at'])
+    
+    def add_duration(self, phase, seconds):
+        self.phase_durations[phase] = round(self.phase_durations.get(phase, 0) + seconds, 2)
+        self.save(update_fields=['phase_durations', 'updated_at'])
+    
+    @property
+    def total_duration(self):
+        return round(sum(self.phase_durations.values()), 2)
+    
+    def phase_timings(self):
+        """Return [(phase label, seconds)] in phase order for phases that have run"""
+        return [(label, self.phase_durations[phase]) for phase, label in self.PHASES if phase in self.phase_durations]
+    
+    class Meta:
+        ordering = ['-started_at']
+
+
+class AzureSyncJob(models.Model):
+    """A queued Azure AD full sync, run out of process by the run_sync_worker command"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    is_active = models.BooleanField(default=True, help_text="Queued or running; at most one job can be active")
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='azure_sync_jobs')
+    sync_run = models.ForeignKey(AzureSyncRun, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    results = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Azure AD sync job #{self.id} ({self.get_status_display()})"
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # Deduplicates concurrent sync requests at the database level
+            models.UniqueConstraint(fields=['is_active'], condition=models.Q(is_active=True), name='unique_active_azure_sync_job'),
+        ]
+
+
+class AssetCleanupRecord(models.Model):
+    """Audit trail of assets unassigned from inactive or deleted employees by the Azure AD sync"""
+    asset = models.ForeignKey(Asset, on_delete=models.SET_NULL, null=True, blank=True, related_name='cleanup_records')
+    asset_name = models.CharField(max_length=200)
+    previous_status = models.CharField(max_length=20)
+    employee = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, blank=True, related_name='asset_cleanup_records')
+    employee_name = models.CharField(max_length=200)
+    employee_status = models.CharField(max_length=20, help_text="Why the asset was unassigned: the employee's Azure AD status")
+    sync_run = models.ForeignKey(AzureSyncRun, on_delete=models.SET_NULL, null=True, blank=True, related_name='cleanup_records')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.asset_name} unassigned from {self.employee_name}"
+    
+    class Meta:
+        ordering = ['-created_at']
+
+
+class DashboardSnapshot(models.Model):
+    """Dashboard counter values at the end of a day, the baseline for the dashboard's trends"""
+    date = models.DateField(unique=True)
+    counters = models.JSONField(default=dict, blank=True, help_text="Counter values keyed by dashboard counter name")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Dashboard snapshot {self.date}"
+    
+    class Meta:
+        ordering = ['-date']
@@ -0,0 +1,141 @@
+"""
+Keyset (cursor) pagination for list pages
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator, compatible with the templates' use of Django's Page"""
+
+    def __init__(self, object_list, paginator, position, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.position = position
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def start_index(self):
+        return self.position + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.position + len(self.object_list)
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], self.end_index(), before=False)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(
+            self.object_list[0], max(self.position - self.paginator.per_page, 0), before=True
+        )
+
+
+class KeysetPaginator:
+    """Page through a queryset by the values of its ordering instead of by OFFSET
+
+    The ordering must end in a unique, non-null field (usually the primary key) so
+    every row has a distinct position. Cursors are opaque URL-safe tokens holding
+    the ordering values of the row a page starts after (or ends before) plus the
+    page's position, so templates can still show "Showing 11 to 20 of N" without
+    counting the rows in front of it. Pass count when the total is already known
+    (e.g. from cached statistics) to save the COUNT query.
+    """
+
+    def __init__(self, queryset, ordering, per_page=10, count=None):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self._count = count
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = self.queryset.count()
+        return self._count
+
+    def encode_cursor(self, obj, position, before):
+        values = []
+        for field in self.fields:
+            value = getattr(obj, field.attname)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        token = json.dumps({'v': values, 'p': position, 'b': before}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(token.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return (values, position, before) for a cursor, or None if it is missing or malformed"""
+        if not cursor:
+            return None
+        try:
+            token = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            values = [field.to_python(value) for field, value in zip(self.fields, token['v'], strict=True)]
+            return values, max(int(token['p']), 0), bool(token['b'])
+        except (binascii.Error, ValidationError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+    def seek_filter(self, values, before):
+        """Q for the rows after (or before) the given ordering values"""
+        seek = Q()
+        for i, (name, value) in enumerate(zip(self.ordering, values)):
+            descending = name.startswith('-')
+            lookup = 'gt' if descending == before else 'lt'
+            condition = Q(**{f'{name.lstrip("-")}__{lookup}': value})
+            for earlier_name, earlier_value in zip(self.ordering[:i], values[:i]):
+                condition &= Q(**{earlier_name.lstrip('-'): earlier_value})
+            seek |= condition
+        return seek
+
+    def get_page(self, cursor=None):
+        """Return the page a cursor points to, or the first page for a missing, malformed or stale cursor"""
+        decoded = self.decode_cursor(cursor)
+        if decoded is None:
+            return self.first_page()
+
+        values, position, before = decoded
+        if before:
+            reversed_ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+            rows = list(self.queryset.filter(self.seek_filter(values, before)).order_by(*reversed_ordering)[:self.per_page + 1])
+            if not rows:
+                return self.first_page()
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            # Reaching the start corrects any drift in the position carried by the cursor
+            return KeysetPage(rows, self, position if has_previous else 0, True, has_previous)
+
+        rows = list(self.queryset.filter(self.seek_filter(values, before)).order_by(*self.ordering)[:self.per_page + 1])
+        if not rows:
+            return self.first_page()
+        return KeysetPage(rows[:self.per_page], self, position, len(rows) > self.per_page, True)
+
+    def first_page(self):
+        rows = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page], self, 0, len(rows) > self.per_page, False)
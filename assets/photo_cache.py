@@ -0,0 +1,335 @@
+"""
+On-disk cache of employee profile photos downloaded from Azure AD
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+
+from django.conf import settings
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is in requirements.txt, without it only full-size photos are served
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Longest a request waits for another request's first fetch of the same photo before giving up on it
+FIRST_FETCH_WAIT_SECONDS = 30
+
+
+@functools.cache
+def warn_missing_pillow():
+    """Log once per process that thumbnails are skipped, as every ?size= request then gets the full photo"""
+    logger.warning("Pillow is not installed, employee photo thumbnails are disabled and full-size photos are served")
+
+
+@dataclass
+class CachedPhoto:
+    """Photo bytes plus the metadata needed to serve them"""
+    data: bytes
+    etag: str
+    content_type: str = 'image/jpeg'
+
+
+class PhotoCache:
+    """Disk cache of Azure AD profile photos keyed by azure_ad_id
+
+    Each photo is stored as a data file and a small JSON metadata file holding a
+    strong ETag (SHA-256 of the bytes), the Graph ETag used for conditional
+    refreshes and the time it was fetched. Users without a photo are cached as
+    misses so they do not cost a Graph call on every page view. Expired entries
+    are served immediately and refreshed in the background. Data file mtimes
+    track last access, and the least recently used entries are evicted once
+    the cache grows past its size cap.
+    """
+
+    def __init__(self, directory=None, ttl=None, max_bytes=None, thumbnail_sizes=None, refresh_workers=2):
+        self.directory = directory or settings.EMPLOYEE_PHOTO_CACHE_DIR
+        self.thumbnail_sizes = settings.EMPLOYEE_PHOTO_THUMBNAIL_SIZES if thumbnail_sizes is None else thumbnail_sizes
+        self.ttl = settings.EMPLOYEE_PHOTO_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = settings.EMPLOYEE_PHOTO_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.refresh_workers = refresh_workers
+        self.lock = threading.Lock()
+        # azure_ad_id -> Event set once the fetch in flight for that user is done
+        self.refreshing = {}
+        self.refresher = None
+        # Bytes written since the last eviction scan, so the directory is not rescanned on every write
+        self.written_bytes = 0
+
+    def key(self, azure_ad_id):
+        return hashlib.sha256(azure_ad_id.encode()).hexdigest()
+
+    def data_path(self, key):
+        return os.path.join(self.directory, f'{key}.bin')
+
+    def meta_path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def thumbnail_path(self, key, size):
+        return os.path.join(self.directory, f'{key}.{size}.jpg')
+
+    def get(self, azure_ad_id, azure_ad=None, size=None):
+        """Return the CachedPhoto for a user, or None if the user has no photo
+
+        Only a user never seen before triggers a synchronous Graph call, and only
+        one at a time per user. Pass an AzureADIntegration to reuse its session and
+        token. A size returns the matching thumbnail when one was generated,
+        otherwise the full photo.
+        """
+        key = self.key(azure_ad_id)
+        meta = self.read_meta(key)
+        if meta is None:
+            photo = self.fetch_once(azure_ad_id, azure_ad)
+            if photo and size:
+                photo = self.load_thumbnail(key, self.read_meta(key), size) or photo
+            return photo
+
+        if meta.get('missing'):
+            photo = None
+        else:
+            photo = self.load(key, meta)
+            if photo is None:
+                return self.fetch_once(azure_ad_id, azure_ad)
+            self.touch(key)
+            if size:
+                photo = self.load_thumbnail(key, meta, size) or photo
+
+        if time.time() - meta['fetched_at'] > self.ttl:
+            self.schedule_refresh(azure_ad_id)
+
+        return photo
+
+    def load(self, key, meta):
+        """Read a cached photo from disk, or None if its data file is gone"""
+        try:
+            with open(self.data_path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return CachedPhoto(data=data, etag=meta['etag'], content_type=meta.get('content_type', 'image/jpeg'))
+
+    def load_thumbnail(self, key, meta, size):
+        """Read a cached thumbnail from disk, or None if it was not generated"""
+        if not meta or size not in meta.get('thumbnails', []):
+            return None
+        try:
+            with open(self.thumbnail_path(key, size), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return CachedPhoto(data=data, etag=f'{meta["etag"][:-1]}-{size}"', content_type='image/jpeg')
+
+    def fetch_once(self, azure_ad_id, azure_ad=None):
+        """Fetch a photo that is not cached, concurrent requests for it wait for the fetch in flight"""
+        with self.lock:
+            in_flight = self.refreshing.get(azure_ad_id)
+            if in_flight is None:
+                self.refreshing[azure_ad_id] = threading.Event()
+
+        if in_flight is not None:
+            in_flight.wait(FIRST_FETCH_WAIT_SECONDS)
+            key = self.key(azure_ad_id)
+            meta = self.read_meta(key)
+            return self.load(key, meta) if meta and not meta.get('missing') else None
+
+        try:
+            return self.refresh(azure_ad_id, azure_ad)
+        finally:
+            self.finish_refresh(azure_ad_id)
+
+    def refresh(self, azure_ad_id, azure_ad=None):
+        """Fetch a user's photo from Graph, revalidating with the stored Graph ETag if there is one"""
+        from .azure_ad_integration import AzureADIntegration
+
+        azure_ad = azure_ad or AzureADIntegration()
+        key = self.key(azure_ad_id)
+        meta = self.read_meta(key)
+        cached = self.load(key, meta) if meta and not meta.get('missing') else None
+
+        result = azure_ad.get_user_photo(azure_ad_id, etag=cached and meta.get('graph_etag'))
+        if result is None:
+            # Graph failed, keep serving whatever we already have
+            return cached
+
+        status, data, graph_etag, content_type = result
+
+        if status == 304 and cached:
+            meta['fetched_at'] = time.time()
+            self.write_meta(key, meta)
+            return cached
+
+        if status == 404 or not data:
+            self.remove(key)
+            self.write_meta(key, {'missing': True, 'fetched_at': time.time()})
+            return None
+
+        return self.store(azure_ad_id, data, graph_etag=graph_etag, content_type=content_type)
+
+    def store(self, azure_ad_id, data, graph_etag=None, content_type='image/jpeg'):
+        """Write photo bytes to the cache and return the resulting CachedPhoto"""
+        key = self.key(azure_ad_id)
+        etag = f'"{hashlib.sha256(data).hexdigest()}"'
+
+        self.write_file(self.data_path(key), data)
+        self.written_bytes += len(data)
+
+        thumbnails = self.make_thumbnails(data)
+        for size, thumbnail in thumbnails.items():
+            self.write_file(self.thumbnail_path(key, size), thumbnail)
+            self.written_bytes += len(thumbnail)
+
+        self.write_meta(key, {
+            'etag': etag,
+            'graph_etag': graph_etag,
+            'content_type': content_type or 'image/jpeg',
+            'thumbnails': sorted(thumbnails),
+            'fetched_at': time.time(),
+        })
+        if self.written_bytes > self.max_bytes // 10:
+            self.evict()
+        return CachedPhoto(data=data, etag=etag, content_type=content_type or 'image/jpeg')
+
+    def make_thumbnails(self, data):
+        """Return {size: JPEG bytes} of square thumbnails, or {} if Pillow is unavailable or the image is unreadable"""
+        if not self.thumbnail_sizes:
+            return {}
+        if Image is None:
+            warn_missing_pillow()
+            return {}
+
+        try:
+            with Image.open(BytesIO(data)) as image:
+                image = image.convert('RGB')
+                # Crop to a centred square so avatars are not distorted
+                side = min(image.size)
+                left = (image.width - side) // 2
+                top = (image.height - side) // 2
+                square = image.crop((left, top, left + side, top + side))
+
+                thumbnails = {}
+                for size in self.thumbnail_sizes:
+                    output = BytesIO()
+                    square.resize((size, size), Image.LANCZOS).save(output, format='JPEG', quality=85, optimize=True)
+                    thumbnails[size] = output.getvalue()
+                return thumbnails
+        except Exception as e:
+            logger.warning(f"Could not generate photo thumbnails: {e}")
+            return {}
+
+    def is_fresh(self, azure_ad_id):
+        """Return True if the user's photo (or known absence of one) was fetched within the TTL"""
+        meta = self.read_meta(self.key(azure_ad_id))
+        return bool(meta) and time.time() - meta['fetched_at'] <= self.ttl
+
+    def schedule_refresh(self, azure_ad_id):
+        """Refresh an expired entry on a background thread, at most once at a time per user"""
+        with self.lock:
+            if azure_ad_id in self.refreshing:
+                return
+            self.refreshing[azure_ad_id] = threading.Event()
+            if self.refresher is None:
+                self.refresher = ThreadPoolExecutor(max_workers=self.refresh_workers, thread_name_prefix='photo-refresh')
+
+        self.refresher.submit(self.background_refresh, azure_ad_id)
+
+    def background_refresh(self, azure_ad_id):
+        try:
+            self.refresh(azure_ad_id)
+        except Exception as e:
+            logger.error(f"Background refresh of photo for user {azure_ad_id} failed: {e}")
+        finally:
+            self.finish_refresh(azure_ad_id)
+
+    def finish_refresh(self, azure_ad_id):
+        """Release a user's fetch guard and wake the requests waiting on it"""
+        with self.lock:
+            done = self.refreshing.pop(azure_ad_id, None)
+        if done:
+            done.set()
+
+    def read_meta(self, key):
+        try:
+            with open(self.meta_path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write_meta(self, key, meta):
+        self.write_file(self.meta_path(key), json.dumps(meta).encode())
+
+    def write_file(self, path, content):
+        """Write a file atomically so concurrent readers never see a partial photo"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def touch(self, key):
+        """Mark an entry as recently used for LRU eviction"""
+        try:
+            os.utime(self.data_path(key))
+        except OSError:
+            pass
+
+    def remove(self, key):
+        paths = [self.data_path(key), self.meta_path(key)]
+        paths += [self.thumbnail_path(key, size) for size in self.thumbnail_sizes]
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        """Delete least recently used photos until the cache fits in max_bytes"""
+        self.written_bytes = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+
+        # A photo's size includes its thumbnails, its last access is the data file mtime
+        sizes = {}
+        last_used = {}
+        for entry in entries:
+            if entry.name.endswith('.json') or entry.name.endswith('.tmp'):
+                continue
+            key = entry.name.split('.', 1)[0]
+            stat = entry.stat()
+            sizes[key] = sizes.get(key, 0) + stat.st_size
+            if entry.name.endswith('.bin'):
+                last_used[key] = stat.st_mtime
+
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        for _, size, key in sorted((last_used.get(key, 0), size, key) for key, size in sizes.items()):
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
+            evicted += 1
+
+        logger.info(f"Evicted {evicted} photos from the photo cache")
+        return evicted
+
+
+photo_cache = PhotoCache()
@@ -0,0 +1,424 @@
+"""
+Full-text search over assets, employees and handovers
+
+Each searchable model has a search document table holding the text it is
+found by, kept current by database triggers so bulk updates from the Azure AD
+sync are covered as well as saves. On SQLite the documents are indexed with
+an FTS5 table, on PostgreSQL with a GIN-indexed tsvector. Other databases
+fall back to icontains predicates. Every search term is matched as a word
+prefix, and all terms must match.
+"""
+
+import logging
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Asset, Employee, Handover, HandoverAsset
+
+logger = logging.getLogger(__name__)
+
+# Relative importance of document columns, as PostgreSQL weights and FTS5 bm25 column weights
+SEARCH_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+
+def search_terms(text):
+    """Split search text into the lower-case words it is matched by"""
+    return re.findall(r'[^\W_]+', (text or '').lower())
+
+
+class SearchIndex:
+    """The search document of one model
+
+    columns are (name, weight, expression) triples, where the expression is SQL
+    over the model's table aliased as t, or a dict of SQL per database vendor.
+    refresh_on lists (table, event, changed columns, ids) entries: a change to
+    table refreshes the documents whose ids the SQL in ids selects, with {row}
+    standing for the NEW or OLD row. fallback_fields are the icontains lookups
+    used on databases without full-text support.
+    """
+
+    def __init__(self, model, columns, refresh_on, fallback_fields):
+        self.model = model
+        self.columns = columns
+        self.refresh_on = refresh_on
+        self.fallback_fields = fallback_fields
+
+    @property
+    def table(self):
+        return f'{self.model._meta.db_table}_search'
+
+    @property
+    def fts_table(self):
+        return f'{self.table}_fts'
+
+    def column_names(self):
+        return [name for name, weight, expression in self.columns]
+
+    def expressions(self, vendor):
+        return [
+            expression[vendor] if isinstance(expression, dict) else expression
+            for name, weight, expression in self.columns
+        ]
+
+    def document_select(self, vendor, ids=None):
+        """SELECT producing the document rows of the given ids (SQL), or of every object"""
+        expressions = self.expressions(vendor)
+        if vendor == 'postgresql':
+            # The simple parser keeps emails, hostnames and dotted serials whole, so split them
+            # into words first, as FTS5's unicode61 tokenizer and search_terms() do
+            document = ' || '.join(
+                f"setweight(to_tsvector('simple', regexp_replace(coalesce({expression}, ''), "
+                f"'[^[:alnum:]]+', ' ', 'g')), '{weight}')"
+                for (name, weight, _), expression in zip(self.columns, expressions)
+            )
+            select = f'SELECT t.id, {document} FROM {self.model._meta.db_table} t'
+        else:
+            values = ', '.join(f"coalesce({expression}, '')" for expression in expressions)
+            select = f'SELECT t.id, {values} FROM {self.model._meta.db_table} t'
+        return f'{select} WHERE t.id IN ({ids})' if ids else select
+
+    def refresh_sql(self, vendor, ids):
+        """Statements replacing the documents of the given ids (SQL)"""
+        if vendor == 'postgresql':
+            insert = f'INSERT INTO {self.table} (object_id, document) '
+        else:
+            insert = f'INSERT INTO {self.table} (object_id, {", ".join(self.column_names())}) '
+        row_id = re.fullmatch(r'SELECT ((?:NEW|OLD)\.\w+)', ids)
+        if row_id:
+            # Compare with the row's value directly, which SQLite plans better than IN (SELECT NEW.id)
+            return [
+                f'DELETE FROM {self.table} WHERE object_id = {row_id[1]}',
+                insert + self.document_select(vendor) + f' WHERE t.id = {row_id[1]}',
+            ]
+        return [
+            f'DELETE FROM {self.table} WHERE object_id IN ({ids})',
+            insert + self.document_select(vendor, ids),
+        ]
+
+    def triggers(self):
+        """(name, table, event, columns, ids) for every trigger maintaining the documents"""
+        for table, event, columns, ids in self.refresh_on:
+            name = f'{self.table}_{table}_{event.lower()}'
+            if event == 'INSERT':
+                yield name, table, event, columns, ids.format(row='NEW')
+            elif event == 'DELETE':
+                yield name, table, event, columns, ids.format(row='OLD')
+            elif table == self.model._meta.db_table and ids == 'SELECT {row}.id':
+                yield name, table, event, columns, ids.format(row='NEW')
+            else:
+                # A changed row can move documents as well as change them (e.g. an asset changing handover)
+                yield name, table, event, columns, f'{ids.format(row="NEW")} UNION {ids.format(row="OLD")}'
+
+    def create_sql(self, vendor):
+        """Statements creating, filling and maintaining the search documents"""
+        if vendor == 'sqlite':
+            names = self.column_names()
+            weights = ', '.join(str(SEARCH_WEIGHTS[weight]) for name, weight, expression in self.columns)
+            statements = [
+                f'CREATE TABLE {self.table} (id INTEGER PRIMARY KEY, object_id char(32) NOT NULL UNIQUE, '
+                + ', '.join(f'{name} TEXT NOT NULL' for name in names) + ')',
+                f"CREATE VIRTUAL TABLE {self.fts_table} USING fts5({', '.join(names)}, content='{self.table}', "
+                f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+                f"INSERT INTO {self.fts_table} ({self.fts_table}, rank) VALUES ('rank', 'bm25({weights})')",
+                f'INSERT INTO {self.table} (object_id, {", ".join(names)}) {self.document_select(vendor)}',
+                f"INSERT INTO {self.fts_table} ({self.fts_table}) VALUES ('rebuild')",
+                # Keep the FTS index in step with the document table
+                f'CREATE TRIGGER {self.table}_insert AFTER INSERT ON {self.table} BEGIN '
+                f'INSERT INTO {self.fts_table} (rowid, {", ".join(names)}) '
+                f'VALUES (NEW.id, {", ".join(f"NEW.{name}" for name in names)}); END',
+                f'CREATE TRIGGER {self.table}_delete AFTER DELETE ON {self.table} BEGIN '
+                f'INSERT INTO {self.fts_table} ({self.fts_table}, rowid, {", ".join(names)}) '
+                f"VALUES ('delete', OLD.id, {', '.join(f'OLD.{name}' for name in names)}); END",
+            ]
+            for name, table, event, columns, ids in self.triggers():
+                on = f'UPDATE OF {", ".join(columns)}' if event == 'UPDATE' else event
+                body = ' '.join(f'{statement};' for statement in self.refresh_sql(vendor, ids))
+                statements.append(f'CREATE TRIGGER {name} AFTER {on} ON {table} FOR EACH ROW BEGIN {body} END')
+            return statements
+
+        if vendor == 'postgresql':
+            statements = [
+                f'CREATE TABLE {self.table} (object_id uuid PRIMARY KEY, document tsvector NOT NULL)',
+                f'INSERT INTO {self.table} (object_id, document) {self.document_select(vendor)}',
+                f'CREATE INDEX {self.table}_document ON {self.table} USING GIN (document)',
+            ]
+            for name, table, event, columns, ids in self.triggers():
+                on = f'UPDATE OF {", ".join(columns)}' if event == 'UPDATE' else event
+                body = ' '.join(f'{statement};' for statement in self.refresh_sql(vendor, ids))
+                statements += [
+                    f'CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$ '
+                    f'BEGIN {body} RETURN NULL; END $$',
+                    f'CREATE TRIGGER {name} AFTER {on} ON {table} FOR EACH ROW EXECUTE FUNCTION {name}()',
+                ]
+            return statements
+
+        return []
+
+    def drop_sql(self, vendor):
+        if vendor == 'sqlite':
+            return [f'DROP TABLE IF EXISTS {self.fts_table}', f'DROP TABLE IF EXISTS {self.table}'] + [
+                f'DROP TRIGGER IF EXISTS {name}' for name, *_ in self.triggers()
+            ]
+        if vendor == 'postgresql':
+            return [f'DROP TABLE IF EXISTS {self.table}'] + [
+                statement
+                for name, table, *_ in self.triggers()
+                for statement in (f'DROP TRIGGER IF EXISTS {name} ON {table}', f'DROP FUNCTION IF EXISTS {name}()')
+            ]
+        return []
+
+    def match_query(self, vendor, terms, columns=None):
+        """The backend's full-text query for terms, optionally only matching the given columns"""
+        if vendor == 'postgresql':
+            # PostgreSQL restricts matches by weight, so restricted columns must not share weights with the rest
+            weights = ''.join(sorted({weight for name, weight, _ in self.columns if name in columns})) if columns else ''
+            return ' & '.join(f'{term}:*{weights}' for term in terms)
+        query = ' '.join(f'"{term}"*' for term in terms)
+        return f'{{{" ".join(columns)}}} : ({query})' if columns else query
+
+    def match_sql(self, vendor, terms):
+        """(SQL, params) selecting the ids of the documents matching every term"""
+        if vendor == 'postgresql':
+            return (
+                f"SELECT object_id FROM {self.table} WHERE document @@ to_tsquery('simple', %s)",
+                [self.match_query(vendor, terms)],
+            )
+        return (
+            f'SELECT object_id FROM {self.table} WHERE id IN '
+            f'(SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s)',
+            [self.match_query(vendor, terms)],
+        )
+
+    def ranked_sql(self, vendor, terms, scope_sql, limit, columns=None, candidates=None):
+        """(SQL, params) selecting the ids of up to limit matching documents within scope_sql, best first
+
+        Without scope_sql every document is in scope. With candidates only that
+        many matches are ranked, which bounds the cost of very common prefixes.
+        """
+        query = self.match_query(vendor, terms, columns)
+        scope = f'AND object_id IN ({scope_sql})' if scope_sql else ''
+        cap = f'LIMIT {int(candidates)}' if candidates else ''
+        if vendor == 'postgresql':
+            return (
+                f"SELECT object_id FROM (SELECT object_id, document FROM {self.table} "
+                f"WHERE document @@ to_tsquery('simple', %s) {scope} {cap}) matches "
+                f"ORDER BY ts_rank(document, to_tsquery('simple', %s)) DESC LIMIT %s",
+                [query, query, limit],
+            )
+        return (
+            f'SELECT object_id FROM (SELECT d.object_id, {self.fts_table}.rank AS rank FROM {self.fts_table} '
+            f'JOIN {self.table} d ON d.id = {self.fts_table}.rowid WHERE {self.fts_table} MATCH %s {scope} {cap}) matches '
+            f'ORDER BY rank LIMIT %s',
+            [query, limit],
+        )
+
+    def filter(self, text, fields=None):
+        """Q matching the objects found by text"""
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            match = Q()
+            for field in fields or self.fallback_fields:
+                match |= Q(**{f'{field}__icontains': text})
+            # A subquery rather than a join, so multi-valued fields need no distinct()
+            return Q(pk__in=self.model.objects.filter(match).values('pk'))
+
+        terms = search_terms(text)
+        if not terms:
+            return Q(pk__in=[])
+        return Q(pk__in=RawSQL(*self.match_sql(connection.vendor, terms)))
+
+    def ranked(self, queryset, text, limit, columns=None, candidates=None):
+        """Up to limit objects of queryset found by text, best matches first
+
+        columns restricts matching to some document columns; on databases
+        without full-text support they are used as the model fields to match.
+        candidates caps how many matches are ranked (see ranked_sql).
+        """
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            return list(queryset.filter(self.filter(text, columns))[:limit])
+
+        terms = search_terms(text)
+        if not terms:
+            return []
+
+        scope_sql, scope_params = None, []
+        if queryset.query.has_filters():
+            scope_sql, scope_params = queryset.order_by().values('pk').query.sql_with_params()
+        sql, params = self.ranked_sql(connection.vendor, terms, scope_sql, limit, columns, candidates)
+        # The scope's placeholders follow the match query in both backends' SQL
+        params = [params[0], *scope_params, *params[1:]]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            ids = [self.model._meta.pk.to_python(row[0]) for row in cursor.fetchall()]
+
+        objects = queryset.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+ASSET_TABLE = Asset._meta.db_table
+EMPLOYEE_TABLE = Employee._meta.db_table
+HANDOVER_TABLE = Handover._meta.db_table
+HANDOVER_ASSET_TABLE = HandoverAsset._meta.db_table
+
+SEARCH_INDEXES = {
+    Asset: SearchIndex(
+        Asset,
+        columns=[
+            ('name', 'A', 't.name'),
+            ('serial_number', 'A', 't.serial_number'),
+            ('model', 'B', 't.model'),
+            ('manufacturer', 'B', 't.manufacturer'),
+            ('asset_type', 'C', 't.asset_type'),
+            ('owner', 'D', f"(SELECT e.name || ' ' || e.email || ' ' || e.department FROM {EMPLOYEE_TABLE} e "
+                           f"WHERE e.id = t.assigned_to_id)"),
+        ],
+        refresh_on=[
+            (ASSET_TABLE, 'INSERT', None, 'SELECT {row}.id'),
+            (ASSET_TABLE, 'UPDATE', ['name', 'serial_number', 'model', 'manufacturer', 'asset_type', 'assigned_to_id'],
+             'SELECT {row}.id'),
+            (ASSET_TABLE, 'DELETE', None, 'SELECT {row}.id'),
+            (EMPLOYEE_TABLE, 'UPDATE', ['name', 'email', 'department'],
+             f'SELECT id FROM {ASSET_TABLE} WHERE assigned_to_id = {{row}}.id'),
+        ],
+        fallback_fields=['name', 'serial_number', 'model', 'manufacturer', 'asset_type',
+                         'assigned_to__name', 'assigned_to__email', 'assigned_to__department'],
+    ),
+    Employee: SearchIndex(
+        Employee,
+        columns=[
+            ('name', 'A', 't.name'),
+            ('email', 'A', 't.email'),
+            ('department', 'C', 't.department'),
+            ('phone', 'C', 't.phone'),
+        ],
+        refresh_on=[
+            (EMPLOYEE_TABLE, 'INSERT', None, 'SELECT {row}.id'),
+            (EMPLOYEE_TABLE, 'UPDATE', ['name', 'email', 'department', 'phone'], 'SELECT {row}.id'),
+            (EMPLOYEE_TABLE, 'DELETE', None, 'SELECT {row}.id'),
+        ],
+        fallback_fields=['name', 'email', 'department', 'phone'],
+    ),
+    Handover: SearchIndex(
+        Handover,
+        columns=[
+            ('handover_id', 'A', 't.handover_id'),
+            ('employee', 'B', f'(SELECT e.name FROM {EMPLOYEE_TABLE} e WHERE e.id = t.employee_id)'),
+            ('assets', 'C', {
+                'sqlite': f"(SELECT group_concat(a.name, ' ') FROM {HANDOVER_ASSET_TABLE} ha "
+                          f"JOIN {ASSET_TABLE} a ON a.id = ha.asset_id WHERE ha.handover_id = t.id)",
+                'postgresql': f"(SELECT string_agg(a.name, ' ') FROM {HANDOVER_ASSET_TABLE} ha "
+                              f"JOIN {ASSET_TABLE} a ON a.id = ha.asset_id WHERE ha.handover_id = t.id)",
+            }),
+            ('notes', 'D', 't.notes'),
+        ],
+        refresh_on=[
+            (HANDOVER_TABLE, 'INSERT', None, 'SELECT {row}.id'),
+            (HANDOVER_TABLE, 'UPDATE', ['handover_id', 'employee_id', 'notes'], 'SELECT {row}.id'),
+            (HANDOVER_TABLE, 'DELETE', None, 'SELECT {row}.id'),
+            (HANDOVER_ASSET_TABLE, 'INSERT', None, 'SELECT {row}.handover_id'),
+            (HANDOVER_ASSET_TABLE, 'UPDATE', ['handover_id', 'asset_id'], 'SELECT {row}.handover_id'),
+            (HANDOVER_ASSET_TABLE, 'DELETE', None, 'SELECT {row}.handover_id'),
+            (EMPLOYEE_TABLE, 'UPDATE', ['name'], f'SELECT id FROM {HANDOVER_TABLE} WHERE employee_id = {{row}}.id'),
+            (ASSET_TABLE, 'UPDATE', ['name'],
+             f'SELECT handover_id FROM {HANDOVER_ASSET_TABLE} WHERE asset_id = {{row}}.id'),
+        ],
+        fallback_fields=['handover_id', 'employee__name', 'notes', 'assets__name'],
+    ),
+}
+
+
+def search_filter(model, text):
+    """Q matching the objects of model found by text, for narrowing any queryset of that model"""
+    return SEARCH_INDEXES[model].filter(text)
+
+
+def search(queryset, text, limit=20):
+    """Up to limit objects of queryset found by text, best matches first"""
+    return SEARCH_INDEXES[queryset.model].ranked(queryset, text, limit)
+
+
+# Document columns each model is suggested by while typing, and the relations its suggestions show
+TYPEAHEAD_MODELS = {
+    Asset: (['name', 'serial_number'], ['assigned_to']),
+    Employee: (['name', 'email'], []),
+    Handover: (['handover_id'], ['employee']),
+}
+
+# Shorter prefixes match too much of the index to be worth ranking
+TYPEAHEAD_MIN_LENGTH = 2
+
+# Suggestions are the best of this many matches, so common prefixes cost the same as rare ones
+TYPEAHEAD_CANDIDATES = 200
+
+
+def typeahead(text, limit=5, models=None):
+    """The best limit matches of text for each model, for suggestions while typing
+
+    An asset whose serial number is exactly text, as from a barcode scan, comes first.
+    """
+    text = (text or '').strip()
+    results = {}
+    for model in models or TYPEAHEAD_MODELS:
+        columns, related = TYPEAHEAD_MODELS[model]
+        if len(text) < TYPEAHEAD_MIN_LENGTH:
+            results[model] = []
+            continue
+
+        queryset = model.objects.select_related(*related)
+        matches = SEARCH_INDEXES[model].ranked(queryset, text, limit, columns, TYPEAHEAD_CANDIDATES)
+        if model is Asset:
+            exact = queryset.filter(serial_number=text).first()
+            if exact:
+                matches = [exact] + [asset for asset in matches if asset.pk != exact.pk][:limit - 1]
+        results[model] = matches
+    return results
+
+
+def create_search_indexes(schema_editor):
+    """Create, fill and start maintaining every search document table"""
+    for index in SEARCH_INDEXES.values():
+        for statement in index.create_sql(schema_editor.connection.vendor):
+            schema_editor.execute(statement, params=None)
+
+
+def drop_search_indexes(schema_editor):
+    for index in SEARCH_INDEXES.values():
+        for statement in index.drop_sql(schema_editor.connection.vendor):
+            schema_editor.execute(statement, params=None)
+
+
+def rebuild_search_indexes(using=DEFAULT_DB_ALIAS):
+    """Rebuild every search document table from scratch"""
+    with connections[using].schema_editor() as schema_editor:
+        drop_search_indexes(schema_editor)
+        create_search_indexes(schema_editor)
+
+
+def ensure_search_indexes(sender=None, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate receiver rebuilding the search documents if a migration dropped their triggers
+
+    SQLite alters a table by copying it to a new one, which drops the triggers
+    defined on the old table.
+    """
+    db = connections[using]
+    if db.vendor not in ('sqlite', 'postgresql'):
+        return
+
+    tables = db.introspection.table_names()
+    if not all(index.table in tables for index in SEARCH_INDEXES.values()):
+        # The search migration has not been applied (or was rolled back)
+        return
+
+    with db.cursor() as cursor:
+        if db.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        else:
+            cursor.execute('SELECT tgname FROM pg_trigger')
+        existing = {row[0] for row in cursor.fetchall()}
+
+    expected = {name for index in SEARCH_INDEXES.values() for name, *_ in index.triggers()}
+    if not expected <= existing:
+        logger.warning(f"Rebuilding search indexes, {len(expected - existing)} search triggers were missing")
+        rebuild_search_indexes(using)
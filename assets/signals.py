@@ -0,0 +1,57 @@
+"""
+Signal receivers keeping cached asset data in step with the database
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .asset_stats import invalidate_asset_stats
+from .dashboard_counters import (
+    adjust_counters, counted_fields, counted_keys, forget_scan, note_scan, refresh_dashboard_counters,
+    stored_counted_keys,
+)
+from .models import Asset, Employee, Handover
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def asset_changed(sender, **kwargs):
+    invalidate_asset_stats()
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def employee_changed(sender, **kwargs):
+    # Departments feed the asset statistics, and deleting an employee unassigns their assets
+    invalidate_asset_stats()
+
+
+@receiver(pre_save, sender=Asset)
+@receiver(pre_save, sender=Handover)
+def remember_dashboard_counts(sender, instance, **kwargs):
+    # The counters the stored row counted towards, to adjust by the difference once saved
+    now = timezone.now()
+    instance._dashboard_counts = (now, stored_counted_keys(instance, now))
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_save, sender=Handover)
+def update_dashboard_counts(sender, instance, **kwargs):
+    now, before = getattr(instance, '_dashboard_counts', None) or (timezone.now(), set())
+    adjust_counters(before, counted_keys(instance, now))
+    if sender is Handover:
+        note_scan(instance)
+
+
+@receiver(post_delete, sender=Asset)
+@receiver(post_delete, sender=Handover)
+def remove_dashboard_counts(sender, instance, **kwargs):
+    if counted_fields(sender) & instance.get_deferred_fields():
+        # The row is gone, so deferred values can't be loaded to tell what it counted
+        transaction.on_commit(lambda: refresh_dashboard_counters(sender))
+        return
+    adjust_counters(counted_keys(instance, timezone.now()), set())
+    if sender is Handover:
+        forget_scan(instance)
@@ -0,0 +1,137 @@
+"""
+Database-backed queue for running Azure AD syncs outside the web request
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .azure_ad_integration import AzureADIntegration
+from .models import AzureSyncJob, AzureSyncRun
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_sync(user=None):
+    """Queue a full sync, or return the job already queued or running
+
+    Returns (job, created). The unique constraint on active jobs makes this safe
+    against concurrent requests.
+    """
+    fail_stale_jobs()
+
+    active = AzureSyncJob.objects.filter(is_active=True).first()
+    if active:
+        return active, False
+
+    try:
+        with transaction.atomic():
+            job = AzureSyncJob.objects.create(requested_by=user if user and user.is_authenticated else None)
+    except IntegrityError:
+        # Another request queued a job between our check and insert
+        return AzureSyncJob.objects.get(is_active=True), False
+
+    logger.info(f"Queued Azure AD sync job {job.id}")
+    return job, True
+
+
+def claim_next_job():
+    """Mark the oldest queued job as running and return it, or None if there is nothing to run"""
+    fail_stale_jobs()
+
+    job = AzureSyncJob.objects.filter(status='queued').order_by('created_at').first()
+    if not job:
+        return None
+
+    # Only one worker wins the update if several poll at once
+    claimed = AzureSyncJob.objects.filter(pk=job.pk, status='queued').update(
+        status='running', started_at=timezone.now(), updated_at=timezone.now()
+    )
+    if not claimed:
+        return None
+
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job):
+    """Run a claimed job's full sync and record its outcome"""
+    def attach_run(run):
+        job.sync_run = run
+        job.save(update_fields=['sync_run', 'updated_at'])
+
+    logger.info(f"Running Azure AD sync job {job.id}")
+    try:
+        results = AzureADIntegration().full_sync(on_start=attach_run)
+        job.status = 'completed'
+        job.results = results
+    except Exception as e:
+        logger.error(f"Azure AD sync job {job.id} failed: {e}")
+        job.status = 'failed'
+        job.error = str(e)
+    finally:
+        job.is_active = False
+        job.finished_at = timezone.now()
+        job.save()
+
+    return job
+
+
+def fail_stale_jobs():
+    """Fail running jobs whose worker has made no progress for AZURE_SYNC_JOB_TIMEOUT minutes
+
+    Every checkpoint of the job's sync run counts as progress, so long syncs are
+    not mistaken for dead ones. Failed jobs free the queue for a new request, and
+    the next sync resumes from the stale job's last checkpoint.
+    """
+    cutoff = timezone.now() - timedelta(minutes=settings.AZURE_SYNC_JOB_TIMEOUT)
+    stale = AzureSyncJob.objects.filter(status='running', updated_at__lt=cutoff).filter(
+        Q(sync_run__isnull=True) | Q(sync_run__updated_at__lt=cutoff)
+    )
+
+    count = stale.update(
+        status='failed', is_active=False, error='The sync worker stopped responding',
+        finished_at=timezone.now(), updated_at=timezone.now(),
+    )
+    if count:
+        logger.warning(f"Marked {count} stale Azure AD sync jobs as failed")
+    return count
+
+
+def job_progress(job):
+    """Return a JSON-serializable snapshot of a job and the sync run it is driving"""
+    progress = {
+        'id': job.id,
+        'status': job.status,
+        'is_active': job.is_active,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'error': job.error,
+        'phase': None,
+        'phase_label': None,
+        'phases_completed': 0,
+        'phases_total': len(AzureSyncRun.PHASES),
+        'counts': {},
+        'phase_timings': [],
+    }
+
+    run = job.sync_run
+    if run:
+        phase_names = AzureSyncRun.phase_names()
+        progress.update({
+            'phase': run.phase,
+            'phase_label': run.get_phase_display(),
+            'phases_completed': len(phase_names) if run.status == 'completed' else phase_names.index(run.phase),
+            'counts': run.counts,
+            'phase_timings': run.phase_timings(),
+        })
+
+    if job.status == 'completed':
+        progress['results'] = {key: value for key, value in job.results.items() if key != 'request_stats'}
+
+    return progress
@@ -6,10 +6,11 @@ from datetime import date
 register = template.Library()
 
 @register.filter
-def employee_avatar_url(employee):
+def employee_avatar_url(employee, size=None):
     """
     Get the appropriate avatar URL for an employee.
     Always returns a working, professional avatar URL.
+    An optional pixel size (e.g. employee|employee_avatar_url:48) selects a cached thumbnail of the Azure AD photo.
     """
     if not employee:
         return get_professional_avatar_url(employee)
@@ -18,13 +19,14 @@ def employee_avatar_url(employee):
     if employee.avatar_url and 'dicebear.com' in employee.avatar_url:
         return employee.avatar_url
     
-    # Priority 2: Use stored non-generic avatar if available
-    if employee.avatar_url and not is_generic_avatar(employee.avatar_url):
-        return employee.avatar_url
+    # Priority 2: Serve Azure AD photos through the cached proxy, Graph URLs need a token the browser doesn't have
+    if employee.azure_ad_id and (not employee.avatar_url or is_azure_photo_url(employee.avatar_url)):
+        photo_url = reverse('assets:employee_photo', kwargs={'employee_id': employee.id})
+        return f"{photo_url}?size={size}" if size else photo_url
     
-    # Priority 3: Use Azure AD photo if employee has Azure AD ID and no stored avatar
-    if employee.azure_ad_id and not employee.avatar_url:
-        return reverse('assets:employee_photo', kwargs={'employee_id': employee.id})
+    # Priority 3: Use stored non-generic avatar if available
+    if employee.avatar_url and not is_generic_avatar(employee.avatar_url) and not is_azure_photo_url(employee.avatar_url):
+        return employee.avatar_url
     
     # Priority 4: Always fall back to professional placeholder
     return get_professional_avatar_url(employee)
@@ -92,6 +94,12 @@ def is_generic_avatar(avatar_url):
     
     return any(pattern in avatar_url.lower() for pattern in generic_patterns)
 
+def is_azure_photo_url(avatar_url):
+    """
+    Check if the avatar URL points at a Microsoft Graph photo, which browsers can't load without a token.
+    """
+    return bool(avatar_url) and '/photo/$value' in avatar_url
+
 @register.filter
 def user_avatar_url(user):
     """
@@ -144,19 +152,4 @@ def health_reference_date(asset):
     """
     if not asset:
         return None
-    
-    # For Azure AD assets, prioritize Azure sync date over purchase date
-    if asset.azure_ad_id and asset.last_azure_sync:
-        # Asset came from Azure AD - use sync date as reference (when it was discovered)
-        return asset.last_azure_sync.date()
-    elif asset.azure_ad_id and asset.azure_last_signin:
-        # Use Azure last sign-in date if available
-        return asset.azure_last_signin.date()
-    elif asset.purchase_date:
-        # Manually added asset - use purchase date
-        return asset.purchase_date
-    elif asset.last_azure_sync:
-        # Fallback to Azure sync date if no other date available
-        return asset.last_azure_sync.date()
-    else:
-        return None
+    return asset.health_reference_date()
@@ -1,3 +1,1186 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, time as datetime_time, timedelta, timezone as dt_timezone
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+import requests
+
+from .asset_listing import ASSET_LISTINGS
+from .azure_ad_integration import (
+    DEVICE_SELECT, DEVICES_DELTA_KEY, USER_DEVICE_SELECT, USER_SELECT, USERS_DELTA_KEY,
+    AzureADIntegration, DeltaTokenExpired, GraphTokenProvider, SyncInProgress,
+)
+from .checks import check_shared_cache
+from .dashboard_counters import DASHBOARD_COUNTERS, compute_counters, get_dashboard_counters
+from .graph_stub import GraphFixtures, GraphStubServer
+from .models import (
+    HEALTH_SCORE_BANDS, HEALTH_SCORE_OLDEST, HEALTH_SCORE_UNKNOWN_AGE, HEALTH_SCORES_DATE_KEY,
+    Asset, AssetCleanupRecord, AzureSyncJob, AzureSyncRun, AzureSyncState, Employee, Handover,
+)
+from .pagination import KeysetPaginator
+from .photo_cache import Image, PhotoCache
+from .search import search, search_filter, typeahead
+from .sync_jobs import claim_next_job, enqueue_sync, fail_stale_jobs, run_job
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are checked against SQLite')
+class QueryPlanTests(TestCase):
+    """The hot list and dashboard queries read through their indexes instead of scanning"""
+
+    def assertUsesIndex(self, queryset, index_name, sorted_by_index=False):
+        plan = queryset.explain()
+        self.assertIn(f'INDEX {index_name}', plan)
+        if sorted_by_index:
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_asset_status_filters(self):
+        self.assertUsesIndex(Asset.objects.filter(status='available'), 'asset_status_type_idx')
+        self.assertUsesIndex(
+            Asset.objects.filter(status='maintenance', asset_type='laptop'), 'asset_status_type_idx'
+        )
+        self.assertUsesIndex(ASSET_LISTINGS['assigned'].get_queryset({}), 'asset_status_type_idx')
+
+    def test_employee_assets(self):
+        employee = Employee.objects.create(name='Plan Check', email='plan@example.com', department='IT')
+        self.assertUsesIndex(
+            Asset.objects.filter(assigned_to=employee, status='assigned'), 'asset_assignee_status_idx'
+        )
+
+    def test_age_listings(self):
+        self.assertUsesIndex(ASSET_LISTINGS['old'].get_queryset({}), 'asset_purchase_date_idx')
+        attention = ASSET_LISTINGS['attention']
+        self.assertUsesIndex(
+            attention.get_queryset({}).order_by(*attention.ordering)[:11],
+            'asset_purchase_date_idx', sorted_by_index=True,
+        )
+
+    def test_new_assets_listing(self):
+        new = ASSET_LISTINGS['new']
+        self.assertUsesIndex(
+            new.get_queryset({}).order_by(*new.ordering)[:11], 'asset_unassigned_idx', sorted_by_index=True
+        )
+
+    def test_handover_filters(self):
+        self.assertUsesIndex(Handover.objects.filter(status='Pending'), 'handover_status_created_idx')
+        self.assertUsesIndex(
+            Handover.objects.filter(status='Completed').order_by('-created_at')[:10],
+            'handover_status_created_idx', sorted_by_index=True,
+        )
+        now = timezone.now()
+        self.assertUsesIndex(
+            Handover.objects.filter(created_at__gte=now, created_at__lt=now + timedelta(days=1)),
+            'handover_created_idx',
+        )
+
+    def test_employee_filters(self):
+        self.assertUsesIndex(
+            Employee.objects.filter(is_active=True).order_by('name'), 'employee_active_name_idx', sorted_by_index=True
+        )
+        self.assertUsesIndex(Employee.objects.filter(status='terminated'), 'employee_status_idx')
+
+
+class DashboardCounterTests(TestCase):
+    """Signals move the cached dashboard counters once a write commits, and a cache miss recounts"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('counters', 'counters@example.com', 'pw')
+        self.employee = Employee.objects.create(name='Counter Check', email='counter@example.com', department='IT')
+
+    def assertCountersMatchDatabase(self):
+        now = timezone.now()
+        counters = get_dashboard_counters(now)
+        expected = compute_counters(DASHBOARD_COUNTERS, now)
+        self.assertEqual({name: counters[name] for name in expected}, expected)
+
+    def create_asset(self, serial, **fields):
+        return Asset.objects.create(name=f'Asset {serial}', asset_type='laptop', serial_number=serial, **fields)
+
+    def test_save_and_delete_move_counters_on_commit(self):
+        in_stock = get_dashboard_counters()['assets_in_stock']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = self.create_asset('CNT-1')
+        self.assertEqual(get_dashboard_counters()['assets_in_stock'], in_stock + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            asset.status = 'assigned'
+            asset.assigned_to = self.employee
+            asset.save()
+        self.assertEqual(get_dashboard_counters()['assets_in_stock'], in_stock)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            handover = Handover.objects.create(employee=self.employee, created_by=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            handover.status = 'Completed'
+            handover.save()
+        self.assertCountersMatchDatabase()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            handover.delete()
+            Asset.objects.only('name').get(pk=asset.pk).delete()
+        self.assertCountersMatchDatabase()
+
+    def test_uncommitted_writes_leave_counters_alone(self):
+        in_stock = get_dashboard_counters()['assets_in_stock']
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_asset('CNT-2')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_dashboard_counters()['assets_in_stock'], in_stock)
+
+    def test_cache_miss_recounts(self):
+        get_dashboard_counters()
+        # Bulk writes skip the signals, expiring the counters brings them back in step
+        Asset.objects.bulk_create([Asset(name='Bulk', asset_type='laptop', serial_number='CNT-3')])
+        cache.delete_many([counter.cache_key(timezone.now()) for counter in DASHBOARD_COUNTERS])
+        self.assertCountersMatchDatabase()
+
+    def test_process_local_cache_fails_the_check(self):
+        self.assertEqual(check_shared_cache(None), [])
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=locmem):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['assets.E001'])
+
+
+class HealthScoreTests(TestCase):
+    """The SQL and stored health scores match Asset.calculate_health_score, and the daily recompute writes only changed bands"""
+
+    today = date(2026, 3, 15)
+
+    def ages(self):
+        """Ages in days on both sides of every band boundary"""
+        ages = {0, 1, HEALTH_SCORE_BANDS[-1][0] + 400}
+        for max_age, _ in HEALTH_SCORE_BANDS:
+            ages.update([max_age - 1, max_age])
+        return sorted(ages)
+
+    def at(self, age, clock):
+        """A datetime on the day age days before today, at clock UTC"""
+        return datetime.combine(self.today - timedelta(days=age), clock, dt_timezone.utc)
+
+    def build_grid(self):
+        """Unsaved assets covering each reference date source, status, age and time of day"""
+        statuses = [status for status, _ in Asset.STATUS_CHOICES]
+        sources = {
+            'azure sync': lambda age, clock: {'azure_ad_id': 'sync', 'last_azure_sync': self.at(age, clock),
+                                              'azure_last_signin': self.at(0, clock), 'purchase_date': self.today},
+            'azure signin': lambda age, clock: {'azure_ad_id': 'signin', 'azure_last_signin': self.at(age, clock),
+                                                'purchase_date': self.today},
+            'purchase': lambda age, clock: {'purchase_date': self.today - timedelta(days=age),
+                                            'last_azure_sync': self.at(0, clock)},
+            'manual sync': lambda age, clock: {'last_azure_sync': self.at(age, clock),
+                                               'azure_last_signin': self.at(0, clock)},
+        }
+        assets = []
+        for name, fields in sources.items():
+            for age in self.ages():
+                for clock in [datetime_time.min, datetime_time(23, 59, 59)]:
+                    values = fields(age, clock)
+                    if values.get('azure_ad_id'):
+                        values['azure_ad_id'] = f'{values["azure_ad_id"]}-{len(assets)}'
+                    assets.append(Asset(
+                        name=f'{name} {age}', asset_type='laptop', serial_number=f'HS-{len(assets)}',
+                        status=statuses[len(assets) % len(statuses)], **values,
+                    ))
+        assets.append(Asset(name='unknown age', asset_type='laptop', serial_number='HS-unknown'))
+        assets.append(Asset(name='unknown azure age', asset_type='laptop', serial_number='HS-unknown-azure',
+                            azure_ad_id='unknown-azure'))
+        # A blank Azure AD ID is not an Azure asset, so the purchase date wins over the sync date
+        assets.append(Asset(name='blank azure id', asset_type='laptop', serial_number='HS-blank-azure', azure_ad_id='',
+                            purchase_date=self.today - timedelta(days=HEALTH_SCORE_BANDS[-1][0]),
+                            last_azure_sync=self.at(0, datetime_time.min)))
+        return assets
+
+    def test_expression_matches_python_score(self):
+        Asset.objects.bulk_create(self.build_grid())
+
+        expected = {}
+        for asset in Asset.objects.all():
+            expected[asset.pk] = asset.calculate_health_score(self.today)
+        actual = {asset.pk: asset.health_score for asset in Asset.objects.with_health_score(self.today)}
+
+        self.assertEqual(actual, expected)
+        # The grid reaches every band, the oldest score and the unknown age score
+        all_scores = {score for _, score in HEALTH_SCORE_BANDS} | {HEALTH_SCORE_OLDEST, HEALTH_SCORE_UNKNOWN_AGE}
+        self.assertEqual(set(expected.values()), all_scores)
+
+    def stored_scores(self):
+        return dict(Asset.objects.values_list('pk', 'health_score'))
+
+    def expression_scores(self, today):
+        return {asset.pk: asset.health_score for asset in Asset.objects.with_health_score(today)}
+
+    def test_save_stores_expression_score(self):
+        for asset in self.build_grid():
+            asset.save()
+        self.assertEqual(self.stored_scores(), self.expression_scores(date.today()))
+
+    def test_refresh_writes_only_stale_scores(self):
+        assets = self.build_grid()
+        for index, asset in enumerate(assets):
+            asset.health_score = asset.calculate_health_score(self.today) if index % 2 else None
+        Asset.objects.bulk_create(assets)
+
+        self.assertEqual(Asset.objects.refresh_health_scores(self.today), len(assets[::2]))
+        self.assertEqual(self.stored_scores(), self.expression_scores(self.today))
+        self.assertEqual(Asset.objects.refresh_health_scores(self.today), 0)
+
+    def test_crossing_health_bands_updates_only_changed_bands(self):
+        yesterday = self.today - timedelta(days=1)
+        Asset.objects.bulk_create(self.build_grid())
+        Asset.objects.refresh_health_scores(yesterday)
+        previous = self.stored_scores()
+        changed = {pk for pk, score in self.expression_scores(self.today).items() if score != previous[pk]}
+        self.assertTrue(changed)
+
+        crossing = Asset.objects.crossing_health_bands(yesterday, self.today)
+        self.assertLessEqual(changed, set(crossing.values_list('pk', flat=True)))
+        self.assertEqual(crossing.refresh_health_scores(self.today), len(changed))
+        self.assertEqual(self.stored_scores(), self.expression_scores(self.today))
+
+    def test_recompute_command_checks_assets_crossing_bands_since_last_run(self):
+        test_case = self
+
+        class FixedDate(date):
+            @classmethod
+            def today(cls):
+                return test_case.today
+
+        yesterday = self.today - timedelta(days=1)
+        Asset.objects.bulk_create(self.build_grid())
+        Asset.objects.refresh_health_scores(yesterday)
+        changed = Asset.objects.refresh_health_scores(self.today)
+        Asset.objects.refresh_health_scores(yesterday)
+        # A wrong score on an asset mid-band is left alone by the daily run, --full corrects it
+        Asset.objects.filter(name='purchase 89').update(health_score=0)
+        AzureSyncState.set_value(HEALTH_SCORES_DATE_KEY, yesterday.isoformat())
+
+        out = StringIO()
+        with mock.patch('assets.management.commands.recompute_health_scores.date', FixedDate):
+            call_command('recompute_health_scores', stdout=out)
+            self.assertIn(f'Updated {changed} health scores', out.getvalue())
+            self.assertEqual(AzureSyncState.get_value(HEALTH_SCORES_DATE_KEY), self.today.isoformat())
+            self.assertEqual(set(Asset.objects.filter(name='purchase 89').values_list('health_score', flat=True)), {0})
+
+            call_command('recompute_health_scores', full=True, stdout=StringIO())
+        self.assertEqual(self.stored_scores(), self.expression_scores(self.today))
+
+
+class SyncRunTests(TestCase):
+    """A new full sync resumes or abandons unfinished runs, and refuses to start beside one still in progress"""
+
+    def setUp(self):
+        self.stale = AzureSyncRun.objects.create(phase='devices')
+        AzureSyncRun.objects.filter(pk=self.stale.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def test_resume_picks_up_stale_run(self):
+        run = AzureADIntegration().start_sync_run()
+        self.assertEqual(run, self.stale)
+        self.assertEqual(run.attempts, 2)
+
+    def test_restart_abandons_stale_run(self):
+        run = AzureADIntegration().start_sync_run(resume=False)
+        self.assertNotEqual(run, self.stale)
+        self.stale.refresh_from_db()
+        self.assertEqual(self.stale.status, 'abandoned')
+
+    def test_live_run_blocks_a_second_sync(self):
+        live = AzureSyncRun.objects.create(phase='devices')
+
+        for resume in (True, False):
+            with self.assertRaises(SyncInProgress):
+                AzureADIntegration().start_sync_run(resume)
+        with self.assertRaisesMessage(CommandError, f'run {live.id} is still in progress'):
+            call_command('sync_azure_ad', stdout=StringIO())
+
+        self.assertEqual(AzureSyncRun.objects.count(), 2)
+        self.assertEqual(set(AzureSyncRun.objects.values_list('status', flat=True)), {'running'})
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'Search documents are only indexed on SQLite and PostgreSQL')
+class SearchTests(TestCase):
+    """Search documents match every term as a word prefix and rank name matches first"""
+
+    def setUp(self):
+        self.employee = Employee.objects.create(
+            name='Alice Fernsby', email='alice.fernsby@contoso-labs.com', department='IT'
+        )
+        self.laptop = Asset.objects.create(
+            name='Latitude 5520', asset_type='laptop', serial_number='SN-LAT-0001', manufacturer='Dell',
+            assigned_to=self.employee,
+        )
+        self.dock = Asset.objects.create(
+            name='USB-C Dock', asset_type='other', serial_number='DK-19-0002', model='Latitude Dock WD19',
+            manufacturer='Dell',
+        )
+        self.phone = Asset.objects.create(name='Galaxy S23', asset_type='phone', serial_number='PH-0003')
+
+    def found(self, model, text):
+        return set(model.objects.filter(search_filter(model, text)))
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.found(Asset, 'latitude'), {self.laptop, self.dock})
+        self.assertEqual(self.found(Asset, 'latitude dock'), {self.dock})
+        self.assertEqual(self.found(Asset, 'DELL'), {self.laptop, self.dock})
+        self.assertEqual(self.found(Asset, 'lati'), {self.laptop, self.dock})
+        self.assertEqual(self.found(Asset, 'latitude galaxy'), set())
+        self.assertEqual(self.found(Asset, '  '), set())
+
+    def test_punctuated_values_match_by_their_parts(self):
+        # Both backends split emails and dotted or dashed serials into words
+        self.assertEqual(self.found(Employee, 'contoso'), {self.employee})
+        self.assertEqual(self.found(Employee, 'fernsby@contoso-labs.com'), {self.employee})
+        self.assertEqual(self.found(Asset, 'contoso labs'), {self.laptop})
+        self.assertEqual(self.found(Asset, '0001'), {self.laptop})
+
+    def test_name_matches_rank_first(self):
+        self.assertEqual(search(Asset.objects.all(), 'latitude'), [self.laptop, self.dock])
+        self.assertEqual(search(Asset.objects.all(), 'latitude', limit=1), [self.laptop])
+        self.assertEqual(search(Asset.objects.filter(asset_type='other'), 'latitude'), [self.dock])
+
+    def test_documents_follow_writes(self):
+        self.phone.name = 'Pixel 8'
+        self.phone.save()
+        self.assertEqual(self.found(Asset, 'galaxy'), set())
+        self.assertEqual(self.found(Asset, 'pixel'), {self.phone})
+
+        # The owner's details are part of the asset's document
+        Employee.objects.filter(pk=self.employee.pk).update(email='alice@fabrikam.com')
+        self.assertEqual(self.found(Asset, 'fabrikam'), {self.laptop})
+        self.assertEqual(self.found(Asset, 'contoso'), set())
+
+        self.dock.delete()
+        self.assertEqual(self.found(Asset, 'dock'), set())
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'Search documents are only indexed on SQLite and PostgreSQL')
+class TypeaheadTests(TestCase):
+    """Suggestions match prefixes of each model's typeahead columns only"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('typeahead', 'typeahead@example.com', 'pw')
+        self.employee = Employee.objects.create(
+            name='Alice Fernsby', email='alice.fernsby@contoso-labs.com', department='IT'
+        )
+        self.laptop = Asset.objects.create(
+            name='Latitude 5520', asset_type='laptop', serial_number='SN-LAT-0001', assigned_to=self.employee
+        )
+        self.dock = Asset.objects.create(
+            name='USB-C Dock', asset_type='other', serial_number='DK-19-0002', model='Latitude Dock WD19'
+        )
+        self.phone = Asset.objects.create(name='Galaxy S23', asset_type='phone', serial_number='PH-0003')
+        self.case = Asset.objects.create(name='Case for PH-0003', asset_type='other', serial_number='CS-0004')
+        self.handover = Handover.objects.create(employee=self.employee, created_by=self.user, notes='Latitude')
+
+    def test_prefixes_match_typeahead_columns(self):
+        results = typeahead('lat')
+        # The dock only mentions Latitude in its model, the handover in its notes
+        self.assertEqual(results[Asset], [self.laptop])
+        self.assertEqual(results[Handover], [])
+        self.assertEqual(typeahead('fern')[Employee], [self.employee])
+        self.assertEqual(typeahead('contoso')[Employee], [self.employee])
+        self.assertEqual(typeahead('alice')[Handover], [])
+
+    def test_handover_ids_match_alone(self):
+        self.assertEqual(typeahead('hov')[Handover], [self.handover])
+        self.assertEqual(typeahead(self.handover.handover_id)[Handover], [self.handover])
+
+    def test_short_text_suggests_nothing(self):
+        self.assertEqual(typeahead('l'), {Asset: [], Employee: [], Handover: []})
+
+    def test_exact_serial_comes_first(self):
+        self.assertEqual(typeahead('PH-0003')[Asset], [self.phone, self.case])
+        self.assertEqual(typeahead('PH-0003', limit=1)[Asset], [self.phone])
+
+    def test_api(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('assets:typeahead'), {'q': ' lat ', 'limit': 'x'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['query'], 'lat')
+        self.assertEqual([asset['name'] for asset in data['assets']], ['Latitude 5520'])
+        self.assertEqual(data['assets'][0]['assigned_to'], 'Alice Fernsby')
+
+
+class OrphanCleanupTests(TestCase):
+    """Assets of inactive and deleted employees are unassigned and recorded, a dry run only counts them"""
+
+    def setUp(self):
+        self.active = Employee.objects.create(name='Active', email='active@example.com', department='IT')
+        self.inactive = Employee.objects.create(
+            name='Inactive', email='inactive@example.com', department='IT', status='inactive'
+        )
+        self.deleted = Employee.objects.create(
+            name='Deleted', email='deleted@example.com', department='IT', status='deleted'
+        )
+        self.kept = self.create_asset('CLN-1', 'assigned', self.active)
+        self.orphans = {
+            self.create_asset('CLN-2', 'assigned', self.inactive): self.inactive,
+            self.create_asset('CLN-3', 'maintenance', self.deleted): self.deleted,
+        }
+
+    def create_asset(self, serial, status, employee):
+        return Asset.objects.create(
+            name=f'Asset {serial}', asset_type='laptop', serial_number=serial, status=status, assigned_to=employee
+        )
+
+    def test_dry_run_writes_nothing(self):
+        # One plain read: no transaction, no row locks
+        with self.assertNumQueries(1):
+            self.assertEqual(AzureADIntegration().cleanup_orphaned_assets(dry_run=True), 2)
+
+        self.assertFalse(AssetCleanupRecord.objects.exists())
+        for asset, employee in self.orphans.items():
+            asset.refresh_from_db()
+            self.assertEqual(asset.assigned_to, employee)
+
+    def test_records_match_update(self):
+        run = AzureSyncRun.objects.create(phase='cleanup')
+        self.assertEqual(AzureADIntegration().cleanup_orphaned_assets(run=run), 2)
+
+        records = {
+            (record.asset, record.asset_name, record.previous_status, record.employee, record.employee_status,
+             record.sync_run)
+            for record in AssetCleanupRecord.objects.all()
+        }
+        self.assertEqual(records, {
+            (asset, asset.name, asset.status, employee, employee.status, run)
+            for asset, employee in self.orphans.items()
+        })
+        for asset in self.orphans:
+            asset.refresh_from_db()
+            self.assertEqual((asset.status, asset.assigned_to), ('available', None))
+        self.kept.refresh_from_db()
+        self.assertEqual(self.kept.assigned_to, self.active)
+
+        self.assertEqual(AzureADIntegration().cleanup_orphaned_assets(), 0)
+        self.assertEqual(AssetCleanupRecord.objects.count(), 2)
+
+
+class SyncJobTests(TestCase):
+    """The sync job queue runs one job at a time and frees itself from dead workers"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('syncjobs', 'syncjobs@example.com', 'pw')
+
+    def make_stale(self, job):
+        stale_at = timezone.now() - timedelta(minutes=settings.AZURE_SYNC_JOB_TIMEOUT + 1)
+        AzureSyncJob.objects.filter(pk=job.pk).update(updated_at=stale_at)
+
+    def test_second_request_gets_the_active_job(self):
+        job, created = enqueue_sync(self.user)
+        self.assertTrue(created)
+        self.assertEqual(job.requested_by, self.user)
+        self.assertEqual(enqueue_sync(self.user), (job, False))
+
+        # A request racing past the check is stopped by the unique active job constraint
+        with mock.patch.object(QuerySet, 'first', return_value=None):
+            self.assertEqual(enqueue_sync(self.user), (job, False))
+        self.assertEqual(AzureSyncJob.objects.count(), 1)
+
+    def test_claims_oldest_queued_job_once(self):
+        job, _ = enqueue_sync()
+        older = AzureSyncJob.objects.create(is_active=False)
+        AzureSyncJob.objects.filter(pk=older.pk).update(created_at=job.created_at - timedelta(minutes=1))
+
+        self.assertEqual(claim_next_job(), older)
+        claimed = claim_next_job()
+        self.assertEqual(claimed, job)
+        self.assertEqual(claimed.status, 'running')
+        self.assertIsNotNone(claimed.started_at)
+        self.assertIsNone(claim_next_job())
+
+    def test_stale_running_job_is_failed(self):
+        enqueue_sync()
+        job = claim_next_job()
+
+        self.assertEqual(fail_stale_jobs(), 0)
+        # A recent checkpoint of its sync run keeps a job alive
+        job.sync_run = AzureSyncRun.objects.create()
+        job.save()
+        self.make_stale(job)
+        self.assertEqual(fail_stale_jobs(), 0)
+
+        AzureSyncRun.objects.filter(pk=job.sync_run.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(fail_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.is_active), ('failed', False))
+        self.assertEqual(enqueue_sync()[1], True)
+
+    def test_job_fails_while_another_sync_runs(self):
+        live = AzureSyncRun.objects.create()
+        enqueue_sync()
+        with self.assertLogs('assets.sync_jobs', 'ERROR'):
+            job = run_job(claim_next_job())
+
+        self.assertEqual((job.status, job.is_active), ('failed', False))
+        self.assertIn(f'run {live.id} is still in progress', job.error)
+        self.assertEqual(list(AzureSyncRun.objects.all()), [live])
+
+
+class StubPhotoGraph:
+    """Stands in for AzureADIntegration's photo download, serving {azure_ad_id: (data, graph_etag)} from memory"""
+
+    def __init__(self, photos):
+        self.photos = photos
+        self.calls = []
+        self.started = threading.Event()
+        self.release = None
+
+    def get_access_token(self):
+        return 'stub-token'
+
+    def get_user_photo(self, user_id, etag=None):
+        self.calls.append((user_id, etag))
+        self.started.set()
+        if self.release:
+            self.release.wait(5)
+        if user_id not in self.photos:
+            return 404, None, None, None
+        data, graph_etag = self.photos[user_id]
+        if etag == graph_etag:
+            return 304, None, etag, None
+        return 200, data, graph_etag, 'image/jpeg'
+
+
+class PhotoCacheTests(TestCase):
+    """Photos are fetched from Graph once, then served from disk and revalidated in the background"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.cache = PhotoCache(directory, ttl=3600, max_bytes=10 ** 6, thumbnail_sizes=[])
+        self.graph = StubPhotoGraph({'user-1': (b'photo-1', 'W/"graph-1"')})
+        patcher = mock.patch('assets.azure_ad_integration.AzureADIntegration', return_value=self.graph)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def expire(self, azure_ad_id):
+        key = self.cache.key(azure_ad_id)
+        meta = self.cache.read_meta(key)
+        meta['fetched_at'] -= self.cache.ttl + 1
+        self.cache.write_meta(key, meta)
+
+    def wait_for_refreshes(self):
+        if self.cache.refresher:
+            self.cache.refresher.shutdown(wait=True)
+            self.cache.refresher = None
+
+    def test_first_fetch_is_cached(self):
+        photo = self.cache.get('user-1')
+        self.assertEqual(photo.data, b'photo-1')
+        self.assertEqual(self.cache.get('user-1'), photo)
+        self.assertEqual(self.graph.calls, [('user-1', None)])
+
+    def test_missing_photo_is_cached(self):
+        self.assertIsNone(self.cache.get('user-2'))
+        self.assertIsNone(self.cache.get('user-2'))
+        self.assertEqual(self.graph.calls, [('user-2', None)])
+
+    def test_concurrent_first_requests_fetch_once(self):
+        self.graph.release = threading.Event()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get('user-1'))) for _ in range(4)]
+        threads[0].start()
+        self.graph.started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.2)
+        self.graph.release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(self.graph.calls, [('user-1', None)])
+        self.assertEqual([photo.data for photo in results], [b'photo-1'] * 4)
+
+    def test_expired_photo_is_served_and_revalidated_in_background(self):
+        photo = self.cache.get('user-1')
+        self.expire('user-1')
+
+        self.assertEqual(self.cache.get('user-1'), photo)
+        self.wait_for_refreshes()
+        # Graph answered 304 to the stored Graph ETag, the photo is fresh again and unchanged
+        self.assertEqual(self.graph.calls[1:], [('user-1', 'W/"graph-1"')])
+        self.assertTrue(self.cache.is_fresh('user-1'))
+        self.assertEqual(self.cache.get('user-1'), photo)
+        self.assertEqual(len(self.graph.calls), 2)
+
+    def test_changed_photo_replaces_cached_one(self):
+        old = self.cache.get('user-1')
+        self.graph.photos['user-1'] = (b'photo-1b', 'W/"graph-2"')
+
+        new = self.cache.refresh('user-1')
+        self.assertEqual(new.data, b'photo-1b')
+        self.assertNotEqual(new.etag, old.etag)
+        self.assertEqual(self.cache.get('user-1'), new)
+
+    def test_least_recently_used_photos_are_evicted(self):
+        self.cache.max_bytes = 250
+        self.cache.store('user-a', b'a' * 100)
+        self.cache.store('user-b', b'b' * 100)
+        now = time.time()
+        os.utime(self.cache.data_path(self.cache.key('user-a')), (now - 100, now - 100))
+        os.utime(self.cache.data_path(self.cache.key('user-b')), (now - 50, now - 50))
+
+        # Reading user-a makes user-b the least recently used
+        self.cache.get('user-a')
+        self.cache.store('user-c', b'c' * 100)
+
+        cached = {user for user in ['user-a', 'user-b', 'user-c'] if self.cache.read_meta(self.cache.key(user))}
+        self.assertEqual(cached, {'user-a', 'user-c'})
+        self.assertEqual(self.graph.calls, [])
+
+    def test_view_answers_matching_etag_with_not_modified(self):
+        user = User.objects.create_user('photos', 'photos@example.com', 'pw')
+        employee = Employee.objects.create(
+            name='Photo Check', email='photo@example.com', department='IT', azure_ad_id='user-1'
+        )
+        url = reverse('assets:employee_photo', args=[employee.id])
+        self.client.force_login(user)
+
+        with mock.patch('assets.photo_cache.photo_cache', self.cache):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, b'photo-1')
+            etag = response['ETag']
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+
+            employee.azure_ad_id = 'user-2'
+            employee.save()
+            self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(len(self.graph.calls), 2)
+
+
+@skipUnless(Image is not None, 'Pillow is not installed')
+class PhotoThumbnailTests(TestCase):
+    """Thumbnails are centred squares at each configured size, served by ?size= with their own ETag"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(EMPLOYEE_PHOTO_THUMBNAIL_SIZES=[16, 40]):
+            self.cache = PhotoCache(directory, ttl=3600, max_bytes=10 ** 6)
+        self.graph = StubPhotoGraph({'user-1': (self.banded_photo(), 'W/"graph-1"')})
+        patcher = mock.patch('assets.azure_ad_integration.AzureADIntegration', return_value=self.graph)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def banded_photo(self):
+        """A 90x30 JPEG of red, green and blue thirds, so only the green centre survives a square crop"""
+        image = Image.new('RGB', (90, 30), (255, 0, 0))
+        image.paste((0, 255, 0), (30, 0, 60, 30))
+        image.paste((0, 0, 255), (60, 0, 90, 30))
+        output = BytesIO()
+        image.save(output, format='JPEG', quality=95)
+        return output.getvalue()
+
+    def assert_green_square(self, data, size):
+        with Image.open(BytesIO(data)) as image:
+            self.assertEqual(image.size, (size, size))
+            for point in [(0, 0), (size - 1, 0), (size // 2, size // 2), (0, size - 1), (size - 1, size - 1)]:
+                red, green, blue = image.convert('RGB').getpixel(point)
+                self.assertGreater(green, 180, point)
+                self.assertLess(max(red, blue), 80, point)
+
+    def test_thumbnails_are_centre_cropped_at_configured_sizes(self):
+        self.cache.get('user-1')
+        key = self.cache.key('user-1')
+
+        self.assertEqual(self.cache.read_meta(key)['thumbnails'], [16, 40])
+        for size in [16, 40]:
+            with open(self.cache.thumbnail_path(key, size), 'rb') as f:
+                self.assert_green_square(f.read(), size)
+
+    def test_size_parameter_serves_thumbnail_with_its_own_etag(self):
+        user = User.objects.create_user('photos', 'photos@example.com', 'pw')
+        employee = Employee.objects.create(
+            name='Photo Check', email='photo@example.com', department='IT', azure_ad_id='user-1'
+        )
+        url = reverse('assets:employee_photo', args=[employee.id])
+        self.client.force_login(user)
+
+        with mock.patch('assets.photo_cache.photo_cache', self.cache):
+            full = self.client.get(url)
+            thumbnail = self.client.get(url, {'size': 40})
+            self.assertEqual(thumbnail.status_code, 200)
+            self.assert_green_square(thumbnail.content, 40)
+            self.assertEqual(thumbnail['ETag'], full['ETag'][:-1] + '-40"')
+
+            # Each ETag only revalidates its own representation
+            self.assertEqual(self.client.get(url, {'size': 40}, HTTP_IF_NONE_MATCH=thumbnail['ETag']).status_code, 304)
+            self.assertEqual(self.client.get(url, {'size': 16}, HTTP_IF_NONE_MATCH=thumbnail['ETag']).status_code, 200)
+
+            # A size that was not generated falls back to the full photo
+            response = self.client.get(url, {'size': 99})
+            self.assertEqual(response['ETag'], full['ETag'])
+            self.assertEqual(response.content, self.graph.photos['user-1'][0])
+        self.assertEqual(len(self.graph.calls), 1)
+
+    def test_prefetch_command_generates_thumbnails(self):
+        Employee.objects.create(name='Photo Check', email='photo@example.com', department='IT', azure_ad_id='user-1')
+        Employee.objects.create(name='No Photo', email='nophoto@example.com', department='IT', azure_ad_id='user-2')
+
+        out = StringIO()
+        with mock.patch('assets.management.commands.sync_azure_photos.photo_cache', self.cache), \
+                mock.patch('assets.management.commands.sync_azure_photos.AzureADIntegration', return_value=self.graph):
+            call_command('sync_azure_photos', workers=2, stdout=out)
+
+        self.assertIn('Downloaded: 1', out.getvalue())
+        self.assertIn('No photo: 1', out.getvalue())
+        for size in [16, 40]:
+            self.assert_green_square(self.cache.get('user-1', size=size).data, size)
+        self.assertEqual(sorted(user for user, etag in self.graph.calls), ['user-1', 'user-2'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class GraphStubTestCase(TestCase):
+    """Runs an AzureADIntegration against a local GraphStubServer with a fresh token cache"""
+
+    recorded_graph_url = 'https://graph.example.com/v1.0'
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('assets.azure_ad_integration.token_provider', GraphTokenProvider())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start_stub(self, responses=None, **options):
+        """Serve {path: (status, body)} as recorded fixtures, or the synthetic tenant without responses"""
+        fixtures = None
+        if responses is not None:
+            fixtures = GraphFixtures(self.recorded_graph_url)
+            for path, (status, body) in responses.items():
+                fixtures.add(f'{self.recorded_graph_url}{path}', status, {'Content-Type': 'application/json'},
+                             json.dumps(body).encode())
+        server = GraphStubServer(fixtures=fixtures, **options).start()
+        self.addCleanup(server.stop)
+        self.azure_ad = server.connect(AzureADIntegration(max_workers=2))
+        return server
+
+    def throttle(self, server, *decisions):
+        """Answer the next requests and $batch sub-requests with a 429 where decisions is True"""
+        decisions = iter(decisions)
+        server.httpd.should_throttle = lambda: next(decisions, False)
+
+
+class GraphBatchTests(GraphStubTestCase):
+    """$batch responses are matched to users by sub-request ID, failed sub-requests are retried singly"""
+
+    def setUp(self):
+        super().setUp()
+        self.server = self.start_stub({
+            '/users/alice/photo': (200, {'@odata.mediaContentType': 'image/jpeg'}),
+            f'/users/alice/registeredDevices?$select={USER_DEVICE_SELECT}': (200, {'value': [{'id': 'laptop-1'}]}),
+            '/users/bob/photo': (404, {'error': {'code': 'ImageNotFound'}}),
+            f'/users/bob/registeredDevices?$select={USER_DEVICE_SELECT}': (200, {'value': []}),
+        })
+        self.expected = {
+            'alice': {'photo_url': f'{self.server.graph_url}/users/alice/photo/$value', 'devices': [{'id': 'laptop-1'}]},
+            'bob': {'photo_url': None, 'devices': []},
+        }
+
+    def test_batch_responses_are_demultiplexed(self):
+        self.assertEqual(self.azure_ad.fetch_user_details_batch(['alice', 'bob']), self.expected)
+        # One token request and one $batch call
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_failed_sub_requests_fall_back_to_single_calls(self):
+        # The $batch call succeeds, alice's photo and bob's devices sub-requests are throttled
+        self.throttle(self.server, False, True, False, False, True)
+
+        self.assertEqual(self.azure_ad.fetch_user_details_batch(['alice', 'bob']), self.expected)
+        # Token, $batch, then a single call for each throttled sub-request
+        self.assertEqual(self.server.request_count, 4)
+
+    def test_failed_batch_falls_back_to_single_calls(self):
+        self.azure_ad.max_retries = 0
+        self.throttle(self.server, True)
+
+        with self.assertLogs('assets.azure_ad_integration', 'ERROR'):
+            self.assertEqual(self.azure_ad.fetch_user_details_batch(['alice', 'bob']), self.expected)
+        # Token, the throttled $batch, then every sub-request singly
+        self.assertEqual(self.server.request_count, 6)
+
+    def test_fetch_user_details_batches_users_concurrently(self):
+        server = self.start_stub(user_count=25, devices_per_user=2)
+        users = [server.tenant.user(index) for index in range(25)]
+
+        details = self.azure_ad.fetch_user_details(users)
+
+        self.assertEqual(set(details), {user['id'] for user in users})
+        for index, user in enumerate(users):
+            self.assertEqual(details[user['id']]['devices'], server.tenant.user_devices(index))
+            self.assertIsNone(details[user['id']]['photo_url'])
+        # Token plus one $batch call per ten users
+        self.assertEqual(server.request_count, 4)
+
+
+class DeltaSyncTests(GraphStubTestCase):
+    """Incremental syncs follow stored delta links, and resync from scratch once Graph rejects them"""
+
+    def start_delta_stub(self, users_delta_response):
+        recorded = self.recorded_graph_url
+        server = self.start_stub({
+            '/users/delta?$deltatoken=stored': users_delta_response,
+            '/devices/delta?$deltatoken=stored': (200, {'value': [], '@odata.deltaLink': f'{recorded}/devices/delta?$deltatoken=next'}),
+            f'/users/delta?$deltatoken=latest&$select={USER_SELECT}': (200, {'@odata.deltaLink': f'{recorded}/users/delta?$deltatoken=fresh'}),
+            f'/devices/delta?$deltatoken=latest&$select={DEVICE_SELECT}': (200, {'@odata.deltaLink': f'{recorded}/devices/delta?$deltatoken=fresh'}),
+        })
+        AzureSyncState.set_value(USERS_DELTA_KEY, f'{server.graph_url}/users/delta?$deltatoken=stored')
+        AzureSyncState.set_value(DEVICES_DELTA_KEY, f'{server.graph_url}/devices/delta?$deltatoken=stored')
+        return server
+
+    def assert_resyncs(self, users_delta_response):
+        server = self.start_delta_stub(users_delta_response)
+
+        with mock.patch.object(self.azure_ad, 'full_sync', return_value={'mode': 'full'}) as full_sync:
+            with self.assertLogs('assets.azure_ad_integration', 'WARNING'):
+                self.assertEqual(self.azure_ad.incremental_sync(), {'mode': 'full'})
+
+        full_sync.assert_called_once_with(resume=False)
+        # Fresh links taken before the full sync replace the rejected ones
+        self.assertEqual(AzureSyncState.get_value(USERS_DELTA_KEY), f'{server.graph_url}/users/delta?$deltatoken=fresh')
+        self.assertEqual(AzureSyncState.get_value(DEVICES_DELTA_KEY), f'{server.graph_url}/devices/delta?$deltatoken=fresh')
+
+    def test_expired_delta_link_resyncs(self):
+        self.assert_resyncs((410, {'error': {'code': 'syncStateNotFound'}}))
+
+    def test_invalid_delta_token_resyncs(self):
+        self.assert_resyncs((400, {'error': {'code': 'syncStateNotFound'}}))
+
+    def test_delta_changes_follow_next_links(self):
+        recorded = self.recorded_graph_url
+        server = self.start_stub({
+            '/users/delta?$deltatoken=stored': (200, {'value': [{'id': 'alice'}], '@odata.nextLink': f'{recorded}/users/delta?$skiptoken=2'}),
+            '/users/delta?$skiptoken=2': (200, {'value': [{'id': 'bob'}], '@odata.deltaLink': f'{recorded}/users/delta?$deltatoken=next'}),
+        })
+
+        changes, delta_link = self.azure_ad.get_delta_changes(f'{server.graph_url}/users/delta?$deltatoken=stored')
+        self.assertEqual(changes, [{'id': 'alice'}, {'id': 'bob'}])
+        self.assertEqual(delta_link, f'{server.graph_url}/users/delta?$deltatoken=next')
+
+        server.httpd.fixtures.add(f'{recorded}/users/delta?$deltatoken=stored', 410, {},
+                                  json.dumps({'error': {'code': 'syncStateNotFound'}}).encode())
+        with self.assertRaises(DeltaTokenExpired):
+            self.azure_ad.get_delta_changes(f'{server.graph_url}/users/delta?$deltatoken=stored')
+
+    def test_server_error_keeps_delta_links(self):
+        server = self.start_delta_stub((503, {'error': {'code': 'serviceNotAvailable'}}))
+        self.azure_ad.max_retries = 0
+
+        with mock.patch.object(self.azure_ad, 'full_sync') as full_sync:
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.azure_ad.incremental_sync()
+
+        full_sync.assert_not_called()
+        self.assertEqual(AzureSyncState.get_value(USERS_DELTA_KEY), f'{server.graph_url}/users/delta?$deltatoken=stored')
+
+
+class GraphRetryTests(GraphStubTestCase):
+    """Throttled and failing Graph requests are retried after Retry-After or an exponential backoff"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('assets.azure_ad_integration.time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+        # The longest delay full jitter allows
+        patcher = mock.patch('assets.azure_ad_integration.random.uniform', side_effect=lambda low, high: high)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def endpoint_stats(self, endpoint):
+        return next(stats for stats in self.azure_ad.request_stats.summary() if stats['endpoint'] == endpoint)
+
+    def slept(self):
+        return [call.args[0] for call in self.sleep.call_args_list]
+
+    def test_throttled_request_waits_for_retry_after(self):
+        server = self.start_stub(user_count=3, retry_after=7)
+        self.throttle(server, True, True)
+
+        self.assertEqual(self.azure_ad.get_users(), [server.tenant.user(index) for index in range(3)])
+        self.assertEqual(self.slept(), [7.0, 7.0])
+        stats = self.endpoint_stats('/users')
+        self.assertEqual((stats['calls'], stats['retries'], stats['errors']), (1, 2, 0))
+
+    def test_server_errors_back_off_exponentially(self):
+        server = self.start_stub({'/users/alice/photo': (503, {'error': {'code': 'serviceNotAvailable'}})})
+        self.azure_ad.max_retries = 6
+
+        with self.assertLogs('assets.azure_ad_integration', 'WARNING'):
+            self.assertIsNone(self.azure_ad.get_user_photo_url('alice'))
+
+        # Doubling from BACKOFF_BASE_SECONDS, capped at BACKOFF_MAX_SECONDS
+        self.assertEqual(self.slept(), [1, 2, 4, 8, 16, 30])
+        # The token request, then the first attempt and six retries
+        self.assertEqual(server.request_count, 8)
+        stats = self.endpoint_stats('/users/{id}/photo')
+        self.assertEqual((stats['calls'], stats['retries'], stats['errors']), (1, 6, 1))
+
+    def test_connection_errors_are_retried_then_raised(self):
+        server = self.start_stub(user_count=1)
+        server.stop()
+        self.azure_ad.max_retries = 2
+
+        with self.assertLogs('assets.azure_ad_integration', 'WARNING'):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self.azure_ad.graph_get(f'{server.graph_url}/users', {})
+
+        self.assertEqual(self.slept(), [1, 2])
+        stats = self.endpoint_stats('/users')
+        self.assertEqual((stats['calls'], stats['retries'], stats['errors']), (1, 2, 1))
+
+
+class GraphTokenProviderTests(GraphStubTestCase):
+    """One worker refreshes the Graph token while every other thread, instance and process waits for it"""
+
+    key = 'azure_ad_token:stub-tenant:stub-client'
+
+    def slow_token_request(self, calls):
+        def request_token():
+            calls.append(threading.current_thread().name)
+            time.sleep(0.3)
+            return {'access_token': f'token-{len(calls)}', 'expires_in': 3600}
+        return request_token
+
+    def run_concurrently(self, targets):
+        barrier = threading.Barrier(len(targets))
+        results = []
+
+        def run(target):
+            barrier.wait(5)
+            results.append(target())
+
+        threads = [threading.Thread(target=run, args=[target]) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return results
+
+    def test_integrations_share_one_token_request(self):
+        server = self.start_stub(user_count=1)
+        integrations = [server.connect(AzureADIntegration()) for _ in range(2)]
+        original = AzureADIntegration.request_access_token
+
+        def slow_request(azure_ad):
+            time.sleep(0.3)
+            return original(azure_ad)
+
+        with mock.patch.object(AzureADIntegration, 'request_access_token', autospec=True, side_effect=slow_request):
+            tokens = self.run_concurrently([integration.get_access_token for integration in integrations * 4])
+
+        self.assertEqual(tokens, ['stub-token'] * 8)
+        self.assertEqual(server.request_count, 1)
+
+    def test_providers_in_other_processes_wait_for_one_refresh(self):
+        # Separate providers only share the Django cache, like workers in different processes
+        providers = [GraphTokenProvider(), GraphTokenProvider()]
+        calls = []
+        request_token = self.slow_token_request(calls)
+
+        tokens = self.run_concurrently([
+            lambda provider=provider: provider.get_token(self.key, request_token) for provider in providers * 3
+        ])
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(tokens, ['token-1'] * 6)
+
+    def test_expiring_token_is_used_while_another_process_refreshes(self):
+        cache.set(self.key, {'access_token': 'old-token', 'expires_at': time.time() + 60})
+        cache.add(f'{self.key}:refresh', True)
+        calls = []
+
+        self.assertEqual(GraphTokenProvider().get_token(self.key, self.slow_token_request(calls)), 'old-token')
+        self.assertEqual(calls, [])
+
+        cache.delete(f'{self.key}:refresh')
+        self.assertEqual(GraphTokenProvider().get_token(self.key, self.slow_token_request(calls)), 'token-1')
+        self.assertFalse(cache.get(f'{self.key}:refresh'))
+
+
+class KeysetPaginatorTests(TestCase):
+    """Cursors walk every row exactly once in both directions, and bad cursors fall back to the first page"""
+
+    def setUp(self):
+        created_at = timezone.now()
+        assets = []
+        for index in range(23):
+            assets.append(Asset(
+                name=['Dell', 'HP', 'Lenovo'][index % 3], asset_type='laptop', serial_number=f'KP-{index}',
+                purchase_date=date(2024, 1, 1) + timedelta(days=index // 5),
+            ))
+        Asset.objects.bulk_create(assets)
+        # Ties on created_at too, which bulk_create stamps one by one
+        for index, asset in enumerate(Asset.objects.order_by('serial_number')):
+            Asset.objects.filter(pk=asset.pk).update(created_at=created_at - timedelta(hours=index // 4))
+
+    def paginator(self, ordering):
+        return KeysetPaginator(Asset.objects.all(), ordering, per_page=5)
+
+    def expected_ids(self, ordering):
+        return list(Asset.objects.order_by(*ordering).values_list('id', flat=True))
+
+    def walk_forward(self, paginator):
+        pages = [paginator.get_page(None)]
+        while pages[-1].next_cursor:
+            self.assertLess(len(pages), paginator.count, 'the next cursors are not advancing')
+            page = paginator.get_page(pages[-1].next_cursor)
+            self.assertEqual(page.start_index(), pages[-1].end_index() + 1)
+            pages.append(page)
+        return pages
+
+    def walk_back(self, paginator, page):
+        pages = [page]
+        while pages[0].previous_cursor:
+            self.assertLess(len(pages), paginator.count, 'the previous cursors are not advancing')
+            page = paginator.get_page(pages[0].previous_cursor)
+            self.assertEqual(page.end_index(), pages[0].start_index() - 1)
+            pages.insert(0, page)
+        return pages
+
+    def test_walk_forward_and_back_through_ties(self):
+        for ordering in [('name', 'id'), ('-created_at', '-id'), ('purchase_date', 'id')]:
+            with self.subTest(ordering=ordering):
+                paginator = self.paginator(ordering)
+                expected = self.expected_ids(ordering)
+
+                forward = self.walk_forward(paginator)
+                self.assertEqual([asset.id for page in forward for asset in page], expected)
+                self.assertEqual([len(page) for page in forward], [5, 5, 5, 5, 3])
+                self.assertFalse(forward[-1].has_next())
+
+                back = self.walk_back(paginator, forward[-1])
+                self.assertEqual([asset.id for page in back for asset in page], expected)
+                self.assertEqual(back[0].start_index(), 1)
+                self.assertFalse(back[0].has_previous())
+
+    def encode(self, token):
+        return base64.urlsafe_b64encode(json.dumps(token).encode()).decode()
+
+    def test_bad_cursors_return_first_page(self):
+        paginator = self.paginator(('name', 'id'))
+        first = [asset.id for asset in paginator.get_page(None)]
+        cursors = [
+            'not-a-cursor', '%%%', self.encode([1, 2]), self.encode({'v': ['Dell'], 'p': 5, 'b': False}),
+            self.encode({'v': ['Dell', 'not-a-uuid'], 'p': 5, 'b': False}),
+            self.encode({'v': ['Dell', str(first[0])], 'p': 'x'}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                page = paginator.get_page(cursor)
+                self.assertEqual([asset.id for asset in page], first)
+                self.assertEqual(page.start_index(), 1)
+                self.assertFalse(page.has_previous())
+
+    def test_foreign_and_stale_cursors_return_first_page(self):
+        by_name = self.paginator(('name', 'id'))
+        newest_first = self.paginator(('-created_at', '-id'))
+        newest = [asset.id for asset in newest_first.get_page(None)]
+
+        # A cursor from a list ordered by other fields does not decode
+        self.assertEqual([asset.id for asset in newest_first.get_page(by_name.get_page(None).next_cursor)], newest)
+
+        # Nothing is left after a stale cursor's row
+        cursor = newest_first.get_page(None).next_cursor
+        Asset.objects.exclude(pk__in=newest).delete()
+        self.assertEqual([asset.id for asset in newest_first.get_page(cursor)], newest)
+
+    def test_list_views_ignore_bad_cursors(self):
+        user = User.objects.create_user('pages', 'pages@example.com', 'pw')
+        self.client.force_login(user)
+        for name in ['assets', 'handovers']:
+            with self.subTest(view=name):
+                response = self.client.get(reverse(f'assets:{name}'), {'cursor': 'not-a-cursor'})
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.context['assets' if name == 'assets' else 'handovers'].has_previous())
+
+
+class AssetListingTests(TestCase):
+    """Category pages list each of their assets once whichever way they are paged, and ignore foreign cursors"""
+
+    pages = {'unassigned': 'assets:unassigned_assets', 'new': 'assets:new_assets', 'attention': 'assets:attention_assets'}
+
+    def setUp(self):
+        user = User.objects.create_user('listings', 'listings@example.com', 'pw')
+        self.client.force_login(user)
+        employee = Employee.objects.create(name='Listing Check', email='listing@example.com', department='IT')
+        created_at = timezone.now()
+        old = date.today() - timedelta(days=365 * 3)
+
+        assets = []
+        for index in range(27):
+            assigned = index % 4 == 0
+            assets.append(Asset(
+                name=['Dell', 'HP', 'Lenovo'][index % 3], asset_type=['laptop', 'monitor'][index % 2],
+                serial_number=f'AL-{index}', status='assigned' if assigned else 'available',
+                assigned_to=employee if assigned else None, purchase_date=old + timedelta(days=index // 6),
+            ))
+        Asset.objects.bulk_create(assets)
+        for index, asset in enumerate(Asset.objects.order_by('serial_number')):
+            Asset.objects.filter(pk=asset.pk).update(created_at=created_at - timedelta(hours=index // 5))
+
+    def get_page(self, name, params=None):
+        response = self.client.get(reverse(self.pages[name]), params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.context['assets']
+
+    def expected_ids(self, name, filters=None):
+        listing = ASSET_LISTINGS[name]
+        return list(listing.get_queryset(filters or {}).order_by(*listing.ordering).values_list('id', flat=True))
+
+    def walk(self, name, params=None):
+        """Follow next cursors from the first page, then previous cursors back, returning both id lists"""
+        params = params or {}
+        pages = [self.get_page(name, params)]
+        while pages[-1].next_cursor:
+            self.assertLess(len(pages), pages[0].paginator.count, 'the next cursors are not advancing')
+            pages.append(self.get_page(name, {**params, 'cursor': pages[-1].next_cursor}))
+        forward = [asset.id for page in pages for asset in page]
+
+        pages = pages[-1:]
+        while pages[0].previous_cursor:
+            self.assertLess(len(pages), pages[-1].paginator.count, 'the previous cursors are not advancing')
+            pages.insert(0, self.get_page(name, {**params, 'cursor': pages[0].previous_cursor}))
+        self.assertEqual(pages[0].start_index(), 1)
+        return forward, [asset.id for page in pages for asset in page]
+
+    def test_pages_walk_every_asset_once(self):
+        for name in self.pages:
+            with self.subTest(listing=name):
+                expected = self.expected_ids(name)
+                self.assertGreater(len(expected), ASSET_LISTINGS[name].per_page)
+                self.assertEqual(self.walk(name), (expected, expected))
+
+    def test_filtered_pages_walk_every_matching_asset_once(self):
+        expected = self.expected_ids('unassigned', {'asset_type': 'laptop'})
+        self.assertEqual(self.walk('unassigned', {'asset_type': 'laptop'}), (expected, expected))
+
+    def test_foreign_cursor_returns_first_page(self):
+        first_new = [asset.id for asset in self.get_page('new')]
+        first_attention = [asset.id for asset in self.get_page('attention')]
+        cursor = self.get_page('unassigned').next_cursor
+
+        # Names do not decode as the created_at or purchase_date the other listings are ordered by
+        self.assertEqual([asset.id for asset in self.get_page('new', {'cursor': cursor})], first_new)
+        self.assertEqual([asset.id for asset in self.get_page('attention', {'cursor': cursor})], first_attention)
+        self.assertEqual([asset.id for asset in self.get_page('new', {'cursor': 'not-a-cursor'})], first_new)
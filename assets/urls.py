@@ -24,6 +24,7 @@ urlpatterns = [
     
     # Asset management
     path('assets/', views.assets, name='assets'),
+    path('assets/stats/', views.asset_stats_api, name='asset_stats_api'),
     path('assets/unassigned/', views.unassigned_assets, name='unassigned_assets'),
     path('assets/assigned/', views.assigned_assets, name='assigned_assets'),
     path('assets/maintenance/', views.maintenance_assets, name='maintenance_assets'),
@@ -46,6 +47,7 @@ urlpatterns = [
     path('assets/<uuid:asset_id>/delete/', views.delete_asset, name='delete_asset'),
 
     path('api/barcode-lookup/', views.barcode_lookup, name='barcode_lookup'),
+    path('api/typeahead/', views.typeahead_api, name='typeahead'),
     path('api/ai-recognition/', views.ai_product_recognition, name='ai_product_recognition'),
     
     # Handover management
@@ -68,6 +70,7 @@ urlpatterns = [
     
     # Azure AD Integration
     path('azure-sync/', views.azure_ad_sync, name='azure_ad_sync'),
+    path('azure-sync/jobs/<int:job_id>/', views.azure_sync_job_status, name='azure_sync_job_status'),
     path('azure-status/', views.azure_ad_status_api, name='azure_ad_status_api'),
     
     # API endpoints
@@ -4,63 +4,32 @@ from django.contrib import messages
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.forms import PasswordChangeForm
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
+from django.utils.timesince import timesince
 from django.db.models import Q, Count
 from datetime import datetime, timedelta, date
 from django.core.mail import send_mail, EmailMultiAlternatives
 from django.urls import reverse
 from django.conf import settings
 import json
+import logging
 import random
 
-from .models import Employee, Asset, Handover, WelcomePack
+from .models import Employee, Asset, Handover, WelcomePack, AzureSyncRun, AzureSyncJob
 from .azure_ad_integration import AzureADIntegration
+from .asset_stats import filter_assets, get_asset_stats, stats_filters
+from .asset_listing import ASSET_LISTINGS
+from .dashboard_counters import counter_trend, get_dashboard_counters, trend_baseline
+from .pagination import KeysetPaginator
+from .search import search, search_filter, typeahead
+
+logger = logging.getLogger(__name__)
 
 def calculate_health_score(asset):
     """Calculate asset health score based on Azure AD sync date for Azure assets, purchase date for others"""
-    reference_date = None
-    
-    # For Azure AD assets, prioritize Azure sync date over purchase date
-    if asset.azure_ad_id and asset.last_azure_sync:
-        # Asset came from Azure AD - use sync date as reference (when it was discovered)
-        reference_date = asset.last_azure_sync.date()
-    elif asset.azure_ad_id and asset.azure_last_signin:
-        # Use Azure last sign-in date if available
-        reference_date = asset.azure_last_signin.date()
-    elif asset.purchase_date:
-        # Manually added asset - use purchase date
-        reference_date = asset.purchase_date
-    elif asset.last_azure_sync:
-        # Fallback to Azure sync date if no other date available
-        reference_date = asset.last_azure_sync.date()
-    
-    if not reference_date:
-        return 50  # Unknown age - assume moderate health
-    
-    today = date.today()
-    age_days = (today - reference_date).days
-    
-    # Health calculation based on when asset was discovered in Azure AD
-    if age_days < 30:  # Less than 1 month
-        return 100
-    elif age_days < 90:  # Less than 3 months
-        return 95
-    elif age_days < 180:  # Less than 6 months
-        return 90
-    elif age_days < 365:  # Less than 1 year
-        return 85
-    elif age_days < 730:  # Less than 2 years
-        return 75
-    elif age_days < 1095:  # Less than 3 years
-        return 65
-    elif age_days < 1460:  # Less than 4 years
-        return 55
-    elif age_days < 1825:  # Less than 5 years
-        return 45
-    else:  # 5+ years
-        return 35
+    return asset.calculate_health_score()
 
 @login_required
 def admin_dashboard(request):
@@ -120,35 +89,33 @@ def admin_dashboard(request):
 
 @login_required
 def azure_ad_sync(request):
-    """Azure AD sync view with full change detection"""
-    if request.method == 'POST':
-        try:
-            azure_ad = AzureADIntegration()
-            results = azure_ad.full_sync()
-            
-            messages.success(
-                request, 
-                f'Azure AD sync completed successfully! '
-                f'Employees: {results["employees_synced"]} new, {results["employees_updated"]} updated, {results["employees_disabled"]} disabled, {results["employees_deleted"]} deleted. '
-                f'User Devices: {results["user_devices_synced"]} synced, {results["user_devices_assigned"]} assigned. '
-                f'Standalone Devices: {results["standalone_devices_synced"]} synced, {results["standalone_devices_updated"]} updated. '
-                f'Assignments: {results["assignments_updated"]} updated. '
-                f'Assets cleaned up: {results["assets_cleaned_up"]}.'
-            )
-            
-        except Exception as e:
-            messages.error(request, f'Azure AD sync failed: {str(e)}')
-            
-        return redirect('assets:dashboard')
+    """Azure AD sync view, syncs are queued and run by the run_sync_worker command"""
+    from .sync_jobs import enqueue_sync
     
-    # Get sync statistics with status breakdown
-    azure_ad = AzureADIntegration()
-    summary = azure_ad.get_sync_summary()
+    if request.method == 'POST':
+        job, created = enqueue_sync(request.user)
+        
+        if request.headers.get('Accept') == 'application/json':
+            return JsonResponse({
+                'job_id': job.id,
+                'status': job.status,
+                'created': created,
+                'status_url': reverse('assets:azure_sync_job_status', kwargs={'job_id': job.id}),
+            }, status=202)
+        
+        if created:
+            messages.success(request, f'Azure AD sync queued (job #{job.id}). Progress is shown below.')
+        else:
+            messages.info(request, f'An Azure AD sync is already {job.get_status_display().lower()} (job #{job.id}).')
+        
+        return redirect('assets:azure_ad_sync')
     
-    employees_with_azure = Employee.objects.filter(azure_ad_id__isnull=False).count()
-    assets_with_azure = Asset.objects.filter(azure_ad_id__isnull=False).count()
-    total_employees = Employee.objects.count()
-    total_assets = Asset.objects.count()
+    # Counts come from the snapshot saved at the end of the last sync
+    summary = AzureADIntegration().get_sync_summary()
+    employees_with_azure = summary['azure_synced_employees']
+    assets_with_azure = summary['azure_synced_assets']
+    total_employees = summary['local_employees']
+    total_assets = summary['local_assets']
     
     context = {
         'employees_with_azure': employees_with_azure,
@@ -161,14 +128,24 @@ def azure_ad_sync(request):
         },
         'sync_summary': summary,
         'employee_status_breakdown': {
-            'active': Employee.objects.filter(status='active').count(),
-            'inactive': Employee.objects.filter(status='inactive').count(),
-            'deleted': Employee.objects.filter(status='deleted').count(),
-        }
+            'active': summary['active_employees'],
+            'inactive': summary['inactive_employees'],
+            'deleted': summary['deleted_employees'],
+        },
+        'last_sync_run': AzureSyncRun.objects.first(),
+        'active_sync_job': AzureSyncJob.objects.filter(is_active=True).select_related('sync_run').first(),
     }
     
     return render(request, 'azure_ad_sync.html', context)
 
+@login_required
+def azure_sync_job_status(request, job_id):
+    """JSON progress of a queued or running Azure AD sync job"""
+    from .sync_jobs import job_progress
+    
+    job = get_object_or_404(AzureSyncJob.objects.select_related('sync_run'), id=job_id)
+    return JsonResponse(job_progress(job))
+
 @login_required
 def azure_ad_status_api(request):
     """API endpoint to view Azure AD integration status and data"""
@@ -266,33 +243,29 @@ def dashboard(request):
         messages.success(request, '🎉 Welcome to AssetTrack! Message system is working perfectly!')
         request.session['test_message_shown'] = True
     
-    # Calculate statistics
-    assets_in_stock = Asset.objects.filter(status='available').count()
-    pending_signatures = Handover.objects.filter(status='Pending').count()
-    pending_scans = Handover.objects.filter(status='Pending Scan').count()
-    recent_handovers_count = Handover.objects.count()
+    # Counters come from the cache, kept current by signals and reconciled periodically
+    counters = get_dashboard_counters()
     
-    # Calculate trends (simplified for demo)
-    assets_trend = 12  # Mock data
-    overdue_signatures = 3  # Mock data
-    last_scan_time = "15 min ago"  # Mock data
-    today_handovers = Handover.objects.filter(created_at__date=timezone.now().date()).count()
+    # Trends against the daily snapshot from a month ago
+    baseline = trend_baseline()
+    assets_trend = counter_trend('assets_in_stock', counters['assets_in_stock'], baseline)
+    last_scan_time = f"{timesince(counters['last_scan_at'])} ago" if counters['last_scan_at'] else 'never'
     
-    # Get recent handovers with pagination
-    recent_handovers_list = Handover.objects.select_related('employee').prefetch_related('assets')[:10]
+    # Get recent handovers with pagination, as a list so the paginator doesn't count them
+    recent_handovers_list = list(Handover.objects.select_related('employee').prefetch_related('assets')[:10])
     paginator = Paginator(recent_handovers_list, 5)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     context = {
-        'assets_in_stock': assets_in_stock,
-        'pending_signatures': pending_signatures,
-        'pending_scans': pending_scans,
-        'recent_handovers': recent_handovers_count,
+        'assets_in_stock': counters['assets_in_stock'],
+        'pending_signatures': counters['pending_signatures'],
+        'pending_scans': counters['pending_scans'],
+        'recent_handovers': counters['total_handovers'],
         'assets_trend': assets_trend,
-        'overdue_signatures': overdue_signatures,
+        'overdue_signatures': counters['overdue_signatures'],
         'last_scan_time': last_scan_time,
-        'today_handovers': today_handovers,
+        'today_handovers': counters['today_handovers'],
         'recent_handovers_list': page_obj,
     }
     
@@ -306,12 +279,7 @@ def employees(request):
     # Handle search
     search_query = request.GET.get('search', '')
     if search_query:
-        employees = employees.filter(
-            Q(name__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(department__icontains=search_query) |
-            Q(phone__icontains=search_query)
-        )
+        employees = employees.filter(search_filter(Employee, search_query))
     
     context = {
         'employees': employees,
@@ -415,158 +383,38 @@ def assets(request):
     # Get all assets with related data
     assets = Asset.objects.select_related('assigned_to').all()
     
-    # Filter by status if provided
-    status_filter = request.GET.get('status')
-    if status_filter:
-        assets = assets.filter(status=status_filter)
+    # Filter by status, asset type and search query if provided
+    filters = stats_filters(request.GET)
+    assets = filter_assets(assets, filters)
+    status_filter = filters.get('status')
+    asset_type_filter = filters.get('asset_type')
+    search_query = filters.get('search')
     
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        assets = assets.filter(asset_type=asset_type_filter)
+    # Analytics cover all assets and are cached until an asset changes
+    stats = get_asset_stats()
     
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        assets = assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query)
-        )
-    
-    # Calculate analytics
-    total_assets = Asset.objects.count()
-    available_assets = Asset.objects.filter(status='available').count()
-    assigned_assets = Asset.objects.filter(status='assigned').count()
-    maintenance_assets = Asset.objects.filter(status='maintenance').count()
-    lost_assets = Asset.objects.filter(status='lost').count()
-    
-    # Calculate asset age and health
-    today = date.today()
-    new_assets = Asset.objects.filter(
-        assigned_to__isnull=True,
-        status='available'
-    ).count()
-    
-    old_assets = Asset.objects.filter(
-        purchase_date__lte=today - timedelta(days=365*3)  # 3+ years old
-    ).count()
-    
-    # Department distribution
-    department_stats = Asset.objects.filter(
-        assigned_to__isnull=False
-    ).values(
-        'assigned_to__department'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Asset type distribution
-    asset_type_stats = Asset.objects.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Maintenance alerts (assets older than 3 years)
-    maintenance_alerts = Asset.objects.filter(
-        purchase_date__lte=today - timedelta(days=365*3)
-    ).count()
-    
-    # Recently added assets (last 7 days)
-    recent_assets = Asset.objects.filter(
-        created_at__gte=today - timedelta(days=7)
-    ).count()
-    
-    # Add health scores to assets using the main function
-    for asset in assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination; the unfiltered total comes from the cached stats
+    paginator = KeysetPaginator(assets, ('name', 'id'), 10, count=None if filters else stats['total_assets'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'assets': page_obj,
-        'total_assets': total_assets,
-        'available_assets': available_assets,
-        'assigned_assets': assigned_assets,
-        'maintenance_assets': maintenance_assets,
-        'lost_assets': lost_assets,
-        'new_assets': new_assets,
-        'old_assets': old_assets,
-        'maintenance_alerts': maintenance_alerts,
-        'recent_assets': recent_assets,
-        'department_stats': department_stats,
-        'asset_type_stats': asset_type_stats,
+        **stats,
         'status_filter': status_filter,
         'asset_type_filter': asset_type_filter,
         'search_query': search_query,
     }
     return render(request, 'assets.html', context)
 
+@login_required
+def asset_stats_api(request):
+    """Asset list statistics as JSON, optionally narrowed by the status, asset_type and search filters"""
+    return JsonResponse(get_asset_stats(stats_filters(request.GET)))
+
 @login_required
 def unassigned_assets(request):
     """Unassigned assets view - shows assets not assigned to any employee"""
-    
-    # Get unassigned assets (assets with no assigned_to or status = available)
-    unassigned_assets = Asset.objects.filter(
-        Q(assigned_to__isnull=True) | Q(status='available')
-    ).select_related('assigned_to').distinct()
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        unassigned_assets = unassigned_assets.filter(asset_type=asset_type_filter)
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        unassigned_assets = unassigned_assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query)
-        )
-    
-    # Calculate analytics for unassigned assets
-    total_unassigned = unassigned_assets.count()
-    available_unassigned = unassigned_assets.filter(status='available').count()
-    maintenance_unassigned = unassigned_assets.filter(status='maintenance').count()
-    lost_unassigned = unassigned_assets.filter(status='lost').count()
-    
-    # Asset type distribution for unassigned assets
-    asset_type_stats = unassigned_assets.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Calculate asset age and health
-    today = date.today()
-    
-    # Add health scores to assets using the main function
-    for asset in unassigned_assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(unassigned_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'assets': page_obj,
-        'total_unassigned': total_unassigned,
-        'available_unassigned': available_unassigned,
-        'maintenance_unassigned': maintenance_unassigned,
-        'lost_unassigned': lost_unassigned,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
+    context = ASSET_LISTINGS['unassigned'].get_context(request)
     return render(request, 'unassigned_assets.html', context)
 
 @login_required
@@ -579,22 +427,15 @@ def search_assets_for_missing(request):
         # Build the query
         assets = Asset.objects.exclude(status='lost').exclude(status='retired')
         
-        if search_query:
-            assets = assets.filter(
-                Q(name__icontains=search_query) |
-                Q(serial_number__icontains=search_query) |
-                Q(model__icontains=search_query) |
-                Q(manufacturer__icontains=search_query)
-            )
-        
         if employee_query:
-            assets = assets.filter(
-                Q(assigned_to__name__icontains=employee_query) |
-                Q(assigned_to__email__icontains=employee_query)
-            )
+            assets = assets.filter(assigned_to__in=Employee.objects.filter(search_filter(Employee, employee_query)))
         
-        # Limit results and add health scores
-        assets = assets.select_related('assigned_to')[:20]
+        # Limit results, best search matches first, and add health scores
+        assets = assets.select_related('assigned_to')
+        if search_query:
+            assets = search(assets, search_query, limit=20)
+        else:
+            assets = assets[:20]
         
         # Calculate health scores
         today = date.today()
@@ -1046,6 +887,9 @@ def barcode_lookup(request):
         if not barcode:
             return JsonResponse({'error': 'Barcode parameter required'}, status=400)
         
+        # Assets already registered under this serial number (or close to it)
+        existing_assets = [typeahead_asset(asset) for asset in typeahead(barcode, 5, [Asset])[Asset]]
+        
         # Smart barcode lookup system
         def smart_barcode_lookup(barcode):
             # 1. Check local database first
@@ -1181,7 +1025,8 @@ def barcode_lookup(request):
                 return JsonResponse({
                     'success': True,
                     'data': barcode_database[barcode],
-                    'source': 'local_database'
+                    'source': 'local_database',
+                    'existing_assets': existing_assets,
                 })
             else:
                 # Generate smart suggestions for new products
@@ -1191,13 +1036,60 @@ def barcode_lookup(request):
                     'data': smart_data,
                     'source': 'smart_prediction',
                     'message': 'Product not in database. Smart prediction applied. Please verify details.',
-                    'is_new_product': True
+                    'is_new_product': True,
+                    'existing_assets': existing_assets,
                 })
         
         return smart_barcode_lookup(barcode)
     
     return JsonResponse({'error': 'GET method required'}, status=405)
 
+def typeahead_asset(asset):
+    return {
+        'id': str(asset.id),
+        'name': asset.name,
+        'serial_number': asset.serial_number,
+        'asset_type': asset.get_asset_type_display(),
+        'status': asset.get_status_display(),
+        'assigned_to': asset.assigned_to.name if asset.assigned_to else None,
+        'url': reverse('assets:assets_detail', args=[asset.id]),
+    }
+
+@login_required
+def typeahead_api(request):
+    """Search-as-you-type suggestions: top assets by name or serial, employees by name or email, handovers by ID"""
+    query = request.GET.get('q', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', 5)), 1), 20)
+    except ValueError:
+        limit = 5
+    
+    results = typeahead(query, limit)
+    return JsonResponse({
+        'query': query.strip(),
+        'assets': [typeahead_asset(asset) for asset in results[Asset]],
+        'employees': [
+            {
+                'id': str(employee.id),
+                'name': employee.name,
+                'email': employee.email,
+                'department': employee.department,
+                'url': reverse('assets:employees_detail', args=[employee.id]),
+            }
+            for employee in results[Employee]
+        ],
+        'handovers': [
+            {
+                'id': str(handover.id),
+                'handover_id': handover.handover_id,
+                'employee': handover.employee.name,
+                'status': handover.status,
+                'url': reverse('assets:handover_detail', args=[handover.id]),
+            }
+            for handover in results[Handover]
+        ],
+    })
+
 @login_required
 def ai_product_recognition(request):
     """AI-powered product recognition from camera image"""
@@ -1316,32 +1208,26 @@ def handovers(request):
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
-        handovers = handovers.filter(
-            Q(employee__name__icontains=search_query) |
-            Q(notes__icontains=search_query) |
-            Q(assets__name__icontains=search_query)
-        ).distinct()
+        handovers = handovers.filter(search_filter(Handover, search_query))
     
-    # Pagination
-    paginator = Paginator(handovers, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Get statistics in one query, the total doubles as the pagination count
+    counts = handovers.aggregate(
+        total_handovers=Count('id'),
+        pending_handovers=Count('id', filter=Q(status='Pending')),
+        completed_handovers=Count('id', filter=Q(status='Completed')),
+        pending_scan_handovers=Count('id', filter=Q(status='Pending Scan')),
+    )
     
-    # Get statistics
-    total_handovers = handovers.count()
-    pending_handovers = handovers.filter(status='Pending').count()
-    completed_handovers = handovers.filter(status='Completed').count()
-    pending_scan_handovers = handovers.filter(status='Pending Scan').count()
+    # Keyset pagination, newest first
+    paginator = KeysetPaginator(handovers, ('-created_at', '-id'), 10, count=counts['total_handovers'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     # Get unique employees for filter dropdown
     employees = Employee.objects.filter(is_active=True).order_by('name')
     
     context = {
         'handovers': page_obj,
-        'total_handovers': total_handovers,
-        'pending_handovers': pending_handovers,
-        'completed_handovers': completed_handovers,
-        'pending_scan_handovers': pending_scan_handovers,
+        **counts,
         'employees': employees,
         'status_filter': status_filter,
         'employee_filter': employee_filter,
@@ -1795,25 +1681,24 @@ def employee_handovers(request, employee_id):
     # Get all handovers for this employee
     handovers = Handover.objects.filter(employee=employee).prefetch_related('assets').order_by('-created_at')
     
-    # Calculate handover status counts
-    total_handovers = handovers.count()
-    pending_signatures = handovers.filter(status='Pending').count()
-    completed_handovers = handovers.filter(status='Completed').count()
+    # Calculate handover status counts in one query
+    counts = handovers.aggregate(
+        total_handovers=Count('id'),
+        pending_signatures=Count('id', filter=Q(status='Pending')),
+        completed_handovers=Count('id', filter=Q(status='Completed')),
+    )
     
     # Get employee's assigned assets count
     assigned_assets = Asset.objects.filter(assigned_to=employee).count()
     
-    # Paginate the results
-    paginator = Paginator(handovers, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination, newest first
+    paginator = KeysetPaginator(handovers, ('-created_at', '-id'), 10, count=counts['total_handovers'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'employee': employee,
         'handovers': page_obj,
-        'total_handovers': total_handovers,
-        'pending_signatures': pending_signatures,
-        'completed_handovers': completed_handovers,
+        **counts,
         'assigned_assets': assigned_assets,
     }
     return render(request, 'employee_handovers.html', context)
@@ -1945,509 +1830,59 @@ def approve_handover(request, handover_id):
 @login_required
 def assigned_assets(request):
     """Assigned assets view - shows assets assigned to employees"""
-    
-    # Get assigned assets (assets with assigned_to not null and status = assigned)
-    assigned_assets = Asset.objects.filter(
-        assigned_to__isnull=False,
-        status='assigned'
-    ).select_related('assigned_to').distinct()
-    
-    # Filter by employee if provided
-    employee_filter = request.GET.get('employee')
-    if employee_filter:
-        assigned_assets = assigned_assets.filter(assigned_to__id=employee_filter)
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        assigned_assets = assigned_assets.filter(asset_type=asset_type_filter)
-    
-    # Filter by department if provided
-    department_filter = request.GET.get('department')
-    if department_filter:
-        assigned_assets = assigned_assets.filter(assigned_to__department=department_filter)
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        assigned_assets = assigned_assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query) |
-            Q(assigned_to__department__icontains=search_query)
-        )
-    
-    # Calculate analytics for assigned assets
-    total_assigned = assigned_assets.count()
-    
-    # Department distribution for assigned assets
-    department_stats = assigned_assets.values(
-        'assigned_to__department'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Asset type distribution for assigned assets
-    asset_type_stats = assigned_assets.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Calculate asset age and health
-    today = date.today()
-    
-    # Add health scores to assets using the main function
-    for asset in assigned_assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(assigned_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    context = ASSET_LISTINGS['assigned'].get_context(request)
     
     # Get employee info if filtering by employee
     employee = None
-    if employee_filter:
+    if context['employee_filter']:
         try:
-            employee = Employee.objects.get(id=employee_filter)
+            employee = Employee.objects.get(id=context['employee_filter'])
         except Employee.DoesNotExist:
             pass
+    context['employee'] = employee
     
-    context = {
-        'assets': page_obj,
-        'total_assigned': total_assigned,
-        'department_stats': department_stats,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'department_filter': department_filter,
-        'employee_filter': employee_filter,
-        'employee': employee,
-        'search_query': search_query,
-    }
     return render(request, 'assigned_assets.html', context)
 
 @login_required
 def maintenance_assets(request):
     """Maintenance assets view - shows assets under maintenance"""
-    
-    # Get maintenance assets (status = maintenance)
-    maintenance_assets = Asset.objects.filter(
-        status='maintenance'
-    ).select_related('assigned_to').distinct()
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        maintenance_assets = maintenance_assets.filter(asset_type=asset_type_filter)
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        maintenance_assets = maintenance_assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query)
-        )
-    
-    # Calculate analytics for maintenance assets
-    total_maintenance = maintenance_assets.count()
-    assigned_maintenance = maintenance_assets.filter(assigned_to__isnull=False).count()
-    unassigned_maintenance = maintenance_assets.filter(assigned_to__isnull=True).count()
-    
-    # Asset type distribution for maintenance assets
-    asset_type_stats = maintenance_assets.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Calculate asset age and health
-    today = date.today()
-    
-    # Add health scores to assets using the main function
-    for asset in maintenance_assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(maintenance_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'assets': page_obj,
-        'total_maintenance': total_maintenance,
-        'assigned_maintenance': assigned_maintenance,
-        'unassigned_maintenance': unassigned_maintenance,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
+    context = ASSET_LISTINGS['maintenance'].get_context(request)
     return render(request, 'maintenance_assets.html', context)
 
 @login_required
 def lost_assets(request):
     """Lost assets view - shows assets marked as lost"""
-    
-    # Get lost assets (status = lost)
-    lost_assets = Asset.objects.filter(
-        status='lost'
-    ).select_related('assigned_to').distinct()
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        lost_assets = lost_assets.filter(asset_type=asset_type_filter)
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        lost_assets = lost_assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query)
-        )
-    
-    # Calculate analytics for lost assets
-    total_lost = lost_assets.count()
-    assigned_lost = lost_assets.filter(assigned_to__isnull=False).count()
-    unassigned_lost = lost_assets.filter(assigned_to__isnull=True).count()
-    
-    # Asset type distribution for lost assets
-    asset_type_stats = lost_assets.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Calculate asset age and health
-    today = date.today()
-    
-    # Add health scores to assets using the main function
-    for asset in lost_assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(lost_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'assets': page_obj,
-        'total_lost': total_lost,
-        'assigned_lost': assigned_lost,
-        'unassigned_lost': unassigned_lost,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
+    context = ASSET_LISTINGS['lost'].get_context(request)
     return render(request, 'lost_assets.html', context)
 
 @login_required
 def retired_assets(request):
     """Retired assets view - shows assets marked as retired"""
-    
-    # Get retired assets (status = retired)
-    retired_assets = Asset.objects.filter(
-        status='retired'
-    ).select_related('assigned_to').distinct()
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        retired_assets = retired_assets.filter(asset_type=asset_type_filter)
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        retired_assets = retired_assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query)
-        )
-    
-    # Calculate analytics for retired assets
-    total_retired = retired_assets.count()
-    assigned_retired = retired_assets.filter(assigned_to__isnull=False).count()
-    unassigned_retired = retired_assets.filter(assigned_to__isnull=True).count()
-    
-    # Asset type distribution for retired assets
-    asset_type_stats = retired_assets.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Calculate asset age and health
-    today = date.today()
-    
-    # Add health scores to assets using the main function
-    for asset in retired_assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(retired_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'assets': page_obj,
-        'total_retired': total_retired,
-        'assigned_retired': assigned_retired,
-        'unassigned_retired': unassigned_retired,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
+    context = ASSET_LISTINGS['retired'].get_context(request)
     return render(request, 'retired_assets.html', context)
 
 @login_required
 def old_assets(request):
     """Old assets view - shows assets older than 3 years"""
-    
-    # Get old assets (3+ years old)
-    today = date.today()
-    old_assets = Asset.objects.filter(
-        purchase_date__lte=today - timedelta(days=365*3)  # 3+ years old
-    ).select_related('assigned_to').distinct()
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        old_assets = old_assets.filter(asset_type=asset_type_filter)
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        old_assets = old_assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query)
-        )
-    
-    # Calculate analytics for old assets
-    total_old = old_assets.count()
-    assigned_old = old_assets.filter(assigned_to__isnull=False).count()
-    unassigned_old = old_assets.filter(assigned_to__isnull=True).count()
-    
-    # Asset type distribution for old assets
-    asset_type_stats = old_assets.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Add health scores to assets using the main function
-    for asset in old_assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(old_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'assets': page_obj,
-        'total_old': total_old,
-        'assigned_old': assigned_old,
-        'unassigned_old': unassigned_old,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
+    context = ASSET_LISTINGS['old'].get_context(request)
     return render(request, 'old_assets.html', context)
 
 @login_required
 def healthy_assets(request):
     """Healthy assets view - shows assets with good health scores (80%+)"""
-    
-    # Get assets with good health scores (80%+)
-    today = date.today()
-    
-    # Use the main health calculation function
-    
-    # Get all assets and filter by health score
-    all_assets = Asset.objects.select_related('assigned_to').all()
-    healthy_assets = []
-    
-    for asset in all_assets:
-        asset.health_score = calculate_health_score(asset)
-        if asset.health_score >= 80:  # 80%+ health score
-            healthy_assets.append(asset)
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        healthy_assets = [asset for asset in healthy_assets if asset.asset_type == asset_type_filter]
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        healthy_assets = [asset for asset in healthy_assets if 
-            search_query.lower() in asset.name.lower() or
-            search_query.lower() in asset.serial_number.lower() or
-            search_query.lower() in (asset.model or '').lower() or
-            search_query.lower() in (asset.manufacturer or '').lower() or
-            (asset.assigned_to and search_query.lower() in asset.assigned_to.name.lower())
-        ]
-    
-    # Calculate analytics
-    total_healthy = len(healthy_assets)
-    assigned_healthy = len([asset for asset in healthy_assets if asset.assigned_to])
-    unassigned_healthy = len([asset for asset in healthy_assets if not asset.assigned_to])
-    
-    # Asset type distribution
-    asset_type_stats = {}
-    for asset in healthy_assets:
-        asset_type_stats[asset.asset_type] = asset_type_stats.get(asset.asset_type, 0) + 1
-    
-    # Pagination
-    paginator = Paginator(healthy_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'assets': page_obj,
-        'total_healthy': total_healthy,
-        'assigned_healthy': assigned_healthy,
-        'unassigned_healthy': unassigned_healthy,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
+    context = ASSET_LISTINGS['healthy'].get_context(request)
     return render(request, 'healthy_assets.html', context)
 
 @login_required
 def new_assets_view(request):
     """New assets view - shows unassigned assets (not assigned to anyone)"""
-    
-    # Get unassigned assets (not assigned to anyone)
-    new_assets = Asset.objects.filter(
-        assigned_to__isnull=True,
-        status='available'
-    ).select_related('assigned_to').order_by('-created_at')
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        new_assets = new_assets.filter(asset_type=asset_type_filter)
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        new_assets = new_assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query)
-        )
-    
-    # Calculate analytics
-    total_new = new_assets.count()  # All unassigned assets
-    assigned_new = 0  # No assigned assets in this view (all are unassigned)
-    unassigned_new = total_new  # All assets in this view are unassigned
-    
-    # Asset type distribution
-    asset_type_stats = new_assets.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Calculate health scores
-    today = date.today()
-    
-    # Use the main health calculation function
-    
-    for asset in new_assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(new_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'assets': page_obj,
-        'total_new': total_new,
-        'assigned_new': assigned_new,
-        'unassigned_new': unassigned_new,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
+    context = ASSET_LISTINGS['new'].get_context(request)
     return render(request, 'new_assets.html', context)
 
 @login_required
 def attention_assets(request):
     """Assets that need attention - shows assets 2+ years old"""
-    
-    # Get assets 2+ years old (based on purchase date)
-    today = date.today()
-    two_years_ago = today - timedelta(days=365*2)
-    
-    attention_assets = Asset.objects.filter(
-        purchase_date__lte=two_years_ago
-    ).select_related('assigned_to').order_by('purchase_date')
-    
-    # Filter by asset type if provided
-    asset_type_filter = request.GET.get('asset_type')
-    if asset_type_filter:
-        attention_assets = attention_assets.filter(asset_type=asset_type_filter)
-    
-    # Search functionality
-    search_query = request.GET.get('search')
-    if search_query:
-        attention_assets = attention_assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(manufacturer__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query)
-        )
-    
-    # Calculate analytics
-    total_attention = attention_assets.count()
-    assigned_attention = attention_assets.filter(assigned_to__isnull=False).count()
-    unassigned_attention = attention_assets.filter(assigned_to__isnull=True).count()
-    
-    # Asset type distribution
-    asset_type_stats = attention_assets.values(
-        'asset_type'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Use the main health calculation function
-    
-    for asset in attention_assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(attention_assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'assets': page_obj,
-        'total_attention': total_attention,
-        'assigned_attention': assigned_attention,
-        'unassigned_attention': unassigned_attention,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
+    context = ASSET_LISTINGS['attention'].get_context(request)
     return render(request, 'attention_assets.html', context)
 
 @login_required
@@ -2501,9 +1936,10 @@ def user_profile(request):
 
 @login_required
 def employee_photo(request, employee_id):
-    """Proxy view to serve employee photos from Azure AD"""
-    from django.http import HttpResponse
-    from .azure_ad_integration import AzureADIntegration
+    """Proxy view to serve employee photos from Azure AD through the on-disk photo cache"""
+    from django.http import HttpResponse, HttpResponseNotModified
+    from django.utils.http import parse_etags
+    from .photo_cache import photo_cache
     
     try:
         employee = get_object_or_404(Employee, id=employee_id)
@@ -2512,17 +1948,27 @@ def employee_photo(request, employee_id):
             # Return default avatar if no Azure AD ID
             return HttpResponse(status=404)
         
-        # Get photo data from Azure AD
-        azure_ad = AzureADIntegration()
-        photo_data = azure_ad.get_user_photo_data(employee.azure_ad_id)
+        # Optional thumbnail size, e.g. ?size=48 for list avatars
+        size = request.GET.get('size')
+        size = int(size) if size and size.isdigit() else None
         
-        if photo_data:
-            response = HttpResponse(photo_data, content_type='image/jpeg')
-            response['Cache-Control'] = 'public, max-age=3600'  # Cache for 1 hour
-            return response
-        else:
+        # Served from disk, Graph is only called for users never fetched before
+        photo = photo_cache.get(employee.azure_ad_id, size=size)
+        
+        if not photo:
             return HttpResponse(status=404)
+        
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if photo.etag in if_none_match or '*' in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(photo.data, content_type=photo.content_type)
+        response['ETag'] = photo.etag
+        response['Cache-Control'] = 'private, max-age=3600'  # Cache for 1 hour, then revalidate with the ETag
+        return response
             
+    except Http404:
+        raise
     except Exception as e:
         logger.error(f"Error serving photo for employee {employee_id}: {e}")
         return HttpResponse(status=500)
@@ -2604,55 +2050,5 @@ def change_password(request):
 @login_required
 def department_assets(request, department):
     """Department-specific assets view"""
-    # Get all assets assigned to employees in the specified department
-    assets = Asset.objects.filter(
-        assigned_to__department=department,
-        status__in=['assigned', 'maintenance']
-    ).select_related('assigned_to')
-    
-    # Handle search
-    search_query = request.GET.get('search', '')
-    if search_query:
-        assets = assets.filter(
-            Q(name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(assigned_to__name__icontains=search_query) |
-            Q(asset_type__icontains=search_query)
-        )
-    
-    # Handle asset type filter
-    asset_type_filter = request.GET.get('asset_type', '')
-    if asset_type_filter:
-        assets = assets.filter(asset_type=asset_type_filter)
-    
-    # Calculate department statistics
-    total_assets = assets.count()
-    assigned_assets = assets.filter(status='assigned').count()
-    maintenance_assets = assets.filter(status='maintenance').count()
-    
-    # Get asset type distribution for this department
-    asset_type_stats = assets.values('asset_type').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Calculate health scores for all assets
-    for asset in assets:
-        asset.health_score = calculate_health_score(asset)
-    
-    # Pagination
-    paginator = Paginator(assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'department': department,
-        'assets': page_obj,
-        'total_assets': total_assets,
-        'assigned_assets': assigned_assets,
-        'maintenance_assets': maintenance_assets,
-        'asset_type_stats': asset_type_stats,
-        'asset_type_filter': asset_type_filter,
-        'search_query': search_query,
-    }
-    
+    context = ASSET_LISTINGS['department'].get_context(request, department=department)
     return render(request, 'department_assets.html', context)
@@ -98,6 +98,28 @@ DATABASES = {
     }
 }
 
+# Cache
+# Dashboard counters and the asset statistics version (bumped on every asset write) are
+# written by every gunicorn worker, the sync worker and the timers, so the cache must be
+# shared between processes or those writes never reach the workers serving requests:
+# Redis when REDIS_URL is set, otherwise a database table (created on migrate). A
+# per-process LocMemCache fails the assets.E001 system check.
+REDIS_URL = os.getenv('REDIS_URL', '')  # e.g. redis://127.0.0.1:6379/1
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'assettrack_cache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -203,6 +225,31 @@ AZURE_TENANT_ID = os.getenv('AZURE_TENANT_ID')
 AZURE_CLIENT_ID = os.getenv('AZURE_CLIENT_ID')
 AZURE_CLIENT_SECRET = os.getenv('AZURE_CLIENT_SECRET')
 
+# Azure AD sync tuning
+AZURE_GRAPH_URL = os.getenv('AZURE_GRAPH_URL', 'https://graph.microsoft.com/v1.0')  # Point at a local fake Graph server for testing
+AZURE_LOGIN_URL = os.getenv('AZURE_LOGIN_URL', 'https://login.microsoftonline.com')
+AZURE_SYNC_WORKERS = int(os.getenv('AZURE_SYNC_WORKERS', '8'))  # Concurrent per-user Graph lookups
+AZURE_SYNC_MAX_RETRIES = int(os.getenv('AZURE_SYNC_MAX_RETRIES', '5'))  # Retries for throttled (429) Graph calls
+AZURE_SYNC_USE_BATCH = os.getenv('AZURE_SYNC_USE_BATCH', 'True') == 'True'  # Coalesce per-user lookups into Graph $batch calls
+AZURE_SYNC_BULK_BATCH_SIZE = int(os.getenv('AZURE_SYNC_BULK_BATCH_SIZE', '500'))  # Rows per bulk_create/bulk_update query
+AZURE_GRAPH_CONNECT_TIMEOUT = float(os.getenv('AZURE_GRAPH_CONNECT_TIMEOUT', '5'))  # Seconds
+AZURE_GRAPH_READ_TIMEOUT = float(os.getenv('AZURE_GRAPH_READ_TIMEOUT', '30'))  # Seconds
+AZURE_SYNC_RESUME_MAX_AGE = int(os.getenv('AZURE_SYNC_RESUME_MAX_AGE', '24'))  # Hours an interrupted full sync can still be resumed
+AZURE_SYNC_JOB_TIMEOUT = int(os.getenv('AZURE_SYNC_JOB_TIMEOUT', '30'))  # Minutes without progress before a running sync job is considered dead
+
+# Employee photo cache
+EMPLOYEE_PHOTO_CACHE_DIR = os.getenv('EMPLOYEE_PHOTO_CACHE_DIR', os.path.join(BASE_DIR, 'photo_cache'))
+EMPLOYEE_PHOTO_CACHE_TTL = int(os.getenv('EMPLOYEE_PHOTO_CACHE_TTL', '86400'))  # Seconds before a cached photo is refreshed in the background
+EMPLOYEE_PHOTO_CACHE_MAX_BYTES = int(os.getenv('EMPLOYEE_PHOTO_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))  # Least recently used photos are evicted past this size
+EMPLOYEE_PHOTO_THUMBNAIL_SIZES = [int(size) for size in os.getenv('EMPLOYEE_PHOTO_THUMBNAIL_SIZES', '48,128').split(',') if size]  # Square JPEG thumbnails in pixels, generated when Pillow is installed
+
+# Asset list statistics
+ASSET_STATS_CACHE_TTL = int(os.getenv('ASSET_STATS_CACHE_TTL', '300'))  # Seconds cached asset statistics are kept, asset changes in any process also expire them through the shared cache
+
+# Dashboard counters
+DASHBOARD_SIGNATURE_OVERDUE_DAYS = int(os.getenv('DASHBOARD_SIGNATURE_OVERDUE_DAYS', '7'))  # Days a handover can wait for signatures before the dashboard counts it as overdue
+DASHBOARD_COUNTERS_CACHE_TTL = int(os.getenv('DASHBOARD_COUNTERS_CACHE_TTL', '900'))  # Seconds a cached counter lives, so a missed update heals by the next recount
+
 # Microsoft Azure AD (Entra ID) settings
 SOCIALACCOUNT_PROVIDERS = {
     'microsoft': {